@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy import select, delete, func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import List, Optional
-from backend.database.database import get_db
-from backend.database.models import User, Property, Inspection, Room
+from backend.database.database import get_async_db, get_read_db
+from backend.database.models import User, Property, Inspection, Photo, DailyStat, UserStat
 from backend.auth.auth import get_current_active_user, require_admin
+from backend.auth.principal_cache import PrincipalCache
+from backend.auth.password_hasher import PasswordHasher
+from backend.services.pagination_service import PaginationService, NEXT_CURSOR_HEADER
+from backend.services.admin_stats_service import AdminStatsService
 from backend.schemas.admin import (
     DashboardStats,
     UserListResponse,
@@ -21,133 +25,113 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
-    """Get dashboard overview statistics."""
+    """Get dashboard overview statistics from the daily rollups."""
+    today = datetime.utcnow().date()
+    totals = await AdminStatsService.totals(db)
+    last_30_days = await AdminStatsService.totals(db, since=today - timedelta(days=30))
+    last_7_days = await AdminStatsService.totals(db, since=today - timedelta(days=7))
+
+    def count(stats, metric, key=""):
+        return stats.get((metric, key), [0, 0])[0]
     
     # Total counts
-    total_users = db.query(func.count(User.id)).scalar()
-    total_properties = db.query(func.count(Property.id)).scalar()
-    total_inspections = db.query(func.count(Inspection.id)).scalar()
-    # Count photos (stored as JSON arrays in rooms)
-    rooms = db.query(Room).all()
-    total_photos = sum(len(room.photo_urls or []) for room in rooms)
-    
-    # Active users (logged in last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    active_users = db.query(func.count(User.id)).filter(
-        User.created_at >= thirty_days_ago
-    ).scalar()
-    
-    # Inspections by status
-    completed_inspections = db.query(func.count(Inspection.id)).filter(
-        Inspection.status == "completed"
-    ).scalar()
-    
-    pending_inspections = db.query(func.count(Inspection.id)).filter(
-        Inspection.status == "pending"
-    ).scalar()
-    
-    # Recent activity (last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    new_users_week = db.query(func.count(User.id)).filter(
-        User.created_at >= seven_days_ago
-    ).scalar()
-    
-    new_inspections_week = db.query(func.count(Inspection.id)).filter(
-        Inspection.created_at >= seven_days_ago
-    ).scalar()
+    total_users = count(totals, "users")
+    total_inspections = count(totals, "inspections")
     
     # Average inspections per user
     avg_inspections = total_inspections / total_users if total_users > 0 else 0
     
     return {
         "total_users": total_users,
-        "active_users": active_users,
-        "total_properties": total_properties,
+        # Active users (joined in the last 30 days)
+        "active_users": count(last_30_days, "users"),
+        "total_properties": count(totals, "properties"),
         "total_inspections": total_inspections,
-        "completed_inspections": completed_inspections,
-        "pending_inspections": pending_inspections,
-        "total_photos": total_photos,
-        "new_users_this_week": new_users_week,
-        "new_inspections_this_week": new_inspections_week,
+        "completed_inspections": count(totals, "inspections.status", "completed"),
+        "pending_inspections": count(totals, "inspections.status", "pending"),
+        "total_photos": count(totals, "photos"),
+        "new_users_this_week": count(last_7_days, "users"),
+        "new_inspections_this_week": count(last_7_days, "inspections"),
         "avg_inspections_per_user": round(avg_inspections, 2)
     }
 
 
 @router.get("/users", response_model=List[UserListResponse])
 async def get_all_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     role: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
-    """Get list of all users with filtering."""
-    query = db.query(User)
+    """
+    Get list of all users with filtering (next page cursor in X-Next-Cursor).
+    
+    Search matches the start of the email or name, which the lower(email) and
+    lower(name) indexes can serve; counts come from the user_stats rollup.
+    """
+    query = select(
+        User.id,
+        User.email,
+        User.name,
+        User.role,
+        User.is_active,
+        User.created_at,
+        func.coalesce(UserStat.property_count, 0).label("property_count"),
+        func.coalesce(UserStat.inspection_count, 0).label("inspection_count")
+    ).outerjoin(UserStat, UserStat.user_id == User.id)
     
     if search:
-        query = query.filter(
-            (User.email.ilike(f"%{search}%")) | 
-            (User.name.ilike(f"%{search}%"))
+        prefix = search.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = query.where(
+            func.lower(User.email).like(prefix, escape="\\") |
+            func.lower(User.name).like(prefix, escape="\\")
         )
     
     if role:
-        query = query.filter(User.role == role)
-    
-    users = query.order_by(desc(User.created_at)).offset(skip).limit(limit).all()
-    
-    # Add inspection count for each user
-    result = []
-    for user in users:
-        inspection_count = db.query(func.count(Inspection.id)).join(
-            Property
-        ).filter(Property.owner_id == user.id).scalar()
-        
-        property_count = db.query(func.count(Property.id)).filter(
-            Property.owner_id == user.id
-        ).scalar()
-        
-        result.append({
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at,
-            "property_count": property_count,
-            "inspection_count": inspection_count
-        })
-    
-    return result
+        query = query.where(User.role == role)
+    
+    try:
+        users, next_cursor = await PaginationService.paginate(db, query, User, limit, cursor, skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    return [user._asdict() for user in users]
 
 
 @router.get("/users/{user_id}", response_model=UserDetailResponse)
 async def get_user_detail(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
     """Get detailed information about a specific user."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Get user's properties
-    properties = db.query(Property).filter(Property.owner_id == user_id).all()
+    properties = (await db.scalars(select(Property).where(Property.owner_id == user_id))).all()
     
     # Get user's inspections
-    inspections = db.query(Inspection).join(Property).filter(
+    inspections = (await db.scalars(select(Inspection).join(Property).where(
         Property.owner_id == user_id
-    ).order_by(desc(Inspection.created_at)).limit(10).all()
+    ).order_by(desc(Inspection.created_at)).limit(10))).all()
     
-    # Calculate stats (photos are stored as JSON in rooms)
-    rooms = db.query(Room).join(Inspection).join(Property).filter(
+    # Calculate stats
+    total_photos = await db.scalar(select(func.count(Photo.id)).join(
+        Inspection, Photo.inspection_id == Inspection.id
+    ).join(Property).where(
         Property.owner_id == user_id
-    ).all()
-    total_photos = sum(len(room.photo_urls or []) for room in rooms)
+    ))
     
     return {
         "id": user.id,
@@ -166,7 +150,7 @@ async def get_user_detail(
 async def update_user_role(
     user_id: int,
     role: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Update a user's role."""
@@ -174,12 +158,13 @@ async def update_user_role(
     if role not in valid_roles:
         raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {', '.join(valid_roles)}")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     user.role = role
-    db.commit()
+    await db.commit()
+    await PrincipalCache.invalidate(user_id)
     
     return {"message": "User role updated successfully", "user_id": user_id, "new_role": role}
 
@@ -188,16 +173,20 @@ async def update_user_role(
 async def update_user_status(
     user_id: int,
     is_active: bool,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Activate or deactivate a user account."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    if user.is_active and not is_active:
+        # Deactivation revokes the user's existing tokens
+        user.token_version = (user.token_version or 0) + 1
     user.is_active = is_active
-    db.commit()
+    await db.commit()
+    await PrincipalCache.invalidate(user_id)
     
     return {"message": "User status updated successfully", "user_id": user_id, "is_active": is_active}
 
@@ -205,27 +194,25 @@ async def update_user_status(
 @router.get("/analytics/inspections", response_model=InspectionAnalytics)
 async def get_inspection_analytics(
     days: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
     """Get inspection analytics for the specified time period."""
-    start_date = datetime.utcnow() - timedelta(days=days)
+    start_date = (datetime.utcnow() - timedelta(days=days)).date()
     
     # Inspections over time
-    inspections_by_day = db.query(
-        func.date(Inspection.created_at).label('date'),
-        func.count(Inspection.id).label('count')
-    ).filter(
-        Inspection.created_at >= start_date
-    ).group_by(
-        func.date(Inspection.created_at)
-    ).all()
+    inspections_by_day = (await db.execute(select(DailyStat.day, DailyStat.count).where(
+        DailyStat.metric == "inspections",
+        DailyStat.key == "",
+        DailyStat.day >= start_date,
+        DailyStat.count != 0
+    ).order_by(DailyStat.day))).all()
     
     # Status breakdown
-    status_counts = db.query(
-        Inspection.status,
-        func.count(Inspection.id)
-    ).group_by(Inspection.status).all()
+    status_counts = (await db.execute(select(
+        DailyStat.key,
+        func.sum(DailyStat.count)
+    ).where(DailyStat.metric == "inspections.status").group_by(DailyStat.key))).all()
     
     # Average completion time (mock for now)
     avg_completion_time = 45  # minutes
@@ -236,85 +223,95 @@ async def get_inspection_analytics(
             {"date": str(date), "count": count} 
             for date, count in inspections_by_day
         ],
-        "status_breakdown": {status: count for status, count in status_counts},
+        "status_breakdown": {status: int(count) for status, count in status_counts if count},
         "avg_completion_time_minutes": avg_completion_time
     }
 
 
 @router.get("/analytics/properties", response_model=PropertyAnalytics)
 async def get_property_analytics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
     """Get property analytics."""
     
     # Properties by type
-    type_counts = db.query(
-        Property.property_type,
-        func.count(Property.id)
-    ).group_by(Property.property_type).all()
+    type_counts = (await db.execute(select(
+        DailyStat.key,
+        func.sum(DailyStat.count)
+    ).where(DailyStat.metric == "properties.type").group_by(DailyStat.key))).all()
     
     # Properties by state/location
-    location_counts = db.query(
-        Property.state,
-        func.count(Property.id)
-    ).filter(
-        Property.state.isnot(None)
-    ).group_by(Property.state).order_by(
-        desc(func.count(Property.id))
-    ).limit(10).all()
+    location_total = func.sum(DailyStat.count)
+    location_counts = (await db.execute(select(
+        DailyStat.key,
+        location_total
+    ).where(
+        DailyStat.metric == "properties.state"
+    ).group_by(DailyStat.key).having(location_total > 0).order_by(
+        desc(location_total)
+    ).limit(10))).all()
     
     # Average property age (mock)
     avg_age = 25
     
     return {
-        "total_properties": db.query(func.count(Property.id)).scalar(),
-        "properties_by_type": {ptype: count for ptype, count in type_counts},
-        "properties_by_location": {loc: count for loc, count in location_counts},
+        "total_properties": (await AdminStatsService.totals(db)).get(("properties", ""), [0, 0])[0],
+        "properties_by_type": {ptype: int(count) for ptype, count in type_counts if count},
+        "properties_by_location": {loc: int(count) for loc, count in location_counts},
         "avg_property_age_years": avg_age
     }
 
 
 @router.get("/system/metrics", response_model=SystemMetrics)
 async def get_system_metrics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
     """Get system performance metrics."""
+    totals = await AdminStatsService.totals(db)
     
     # Database size (approximate)
-    total_records = (
-        db.query(func.count(User.id)).scalar() +
-        db.query(func.count(Property.id)).scalar() +
-        db.query(func.count(Inspection.id)).scalar() +
-        db.query(func.count(Photo.id)).scalar()
+    total_records = sum(
+        totals.get((metric, ""), [0, 0])[0]
+        for metric in ("users", "properties", "inspections", "photos")
     )
     
     # API usage (mock - would need actual tracking)
     api_calls_today = 1250
     
-    # Storage usage (estimate based on photos in rooms)
-    rooms = db.query(Room).all()
-    photo_count = sum(len(room.photo_urls or []) for room in rooms)
-    storage_used_mb = photo_count * 2.5  # Estimate 2.5MB per photo
+    # Storage usage (backfilled photos without a recorded size count as 2.5MB)
+    storage_used_bytes = totals.get(("photos", ""), [0, 0])[1]
+    storage_used_mb = storage_used_bytes / (1024 * 1024)
     
     return {
         "total_database_records": total_records,
         "api_calls_today": api_calls_today,
         "storage_used_mb": round(storage_used_mb, 2),
         "uptime_percentage": 99.9,
-        "avg_response_time_ms": 145
+        "avg_response_time_ms": 145,
+        "password_hashing": PasswordHasher.metrics()
     }
 
 
+@router.post("/stats/rebuild")
+async def rebuild_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin)
+):
+    """Recompute the admin rollup tables from scratch (fixes drift from bulk changes)."""
+    await db.run_sync(AdminStatsService.rebuild)
+    return {"message": "Admin statistics rebuilt"}
+
+
 @router.delete("/users/{user_id}")
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Delete a user and all their data (use with caution)."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -323,10 +320,11 @@ async def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     # Delete user's properties (cascade will handle inspections, rooms, photos)
-    db.query(Property).filter(Property.owner_id == user_id).delete()
+    await db.execute(delete(Property).where(Property.owner_id == user_id))
     
     # Delete user
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    await PrincipalCache.invalidate(user_id)
     
     return {"message": "User and all associated data deleted successfully"}
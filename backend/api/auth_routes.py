@@ -1,18 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta, datetime
+from typing import Optional
 import secrets
 import hashlib
-from backend.database.database import get_db
+from backend.database.database import get_async_db
 from backend.database.models import User
 from backend.schemas.user import UserCreate, UserResponse, Token, UserLogin, PasswordResetRequest, PasswordReset
 from backend.auth.auth import (
-    get_password_hash,
-    verify_password,
-    create_access_token,
+    create_user_token,
     get_current_active_user
 )
+from backend.auth.principal_cache import PrincipalCache
+from backend.auth.password_hasher import PasswordHasher
 from backend.services.email_service import EmailService
 from config.settings import get_settings
 
@@ -20,11 +22,15 @@ settings = get_settings()
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
+def _client_host(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,12 +41,12 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     db_user = User(
         email=user.email,
         name=user.name,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await PasswordHasher.hash(user.password, client=_client_host(request), account=user.email),
         role=user.role
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     # Send welcome email (don't fail registration if email fails)
     try:
@@ -53,13 +59,16 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login and get access token."""
     # Find user
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    if not user or not await PasswordHasher.verify(
+        form_data.password, user.hashed_password, client=_client_host(request), account=user.email
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -68,27 +77,25 @@ async def login(
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(user, expires_delta=access_token_expires)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/login/json", response_model=Token)
-async def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
+async def login_json(user_login: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Login with JSON body (for frontend)."""
-    user = db.query(User).filter(User.email == user_login.email).first()
-    if not user or not verify_password(user_login.password, user.hashed_password):
+    user = await db.scalar(select(User).where(User.email == user_login.email))
+    if not user or not await PasswordHasher.verify(
+        user_login.password, user.hashed_password, client=_client_host(request), account=user.email
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(user, expires_delta=access_token_expires)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -136,7 +143,7 @@ async def test_email():
         }
         
         return test_result
-        
+    
     except Exception as e:
         return {
             "error": str(e),
@@ -144,18 +151,18 @@ async def test_email():
         }
 
 @router.get("/test-migration")
-async def test_migration(db: Session = Depends(get_db)):
+async def test_migration(db: AsyncSession = Depends(get_async_db)):
     """Test if database migration worked."""
     try:
         # Try to query a user and check if reset fields exist
-        user = db.query(User).first()
+        user = await db.scalar(select(User).limit(1))
         if user:
             # Check if the new fields exist
             has_reset_fields = hasattr(user, 'reset_token_hash') and hasattr(user, 'reset_token_expires')
             return {
                 "migration_status": "success" if has_reset_fields else "missing_fields",
                 "reset_fields_exist": has_reset_fields,
-                "user_count": db.query(User).count()
+                "user_count": await db.scalar(select(func.count(User.id)))
             }
         else:
             return {
@@ -172,9 +179,9 @@ async def test_migration(db: Session = Depends(get_db)):
 
 
 @router.post("/forgot-password")
-async def forgot_password(request: PasswordResetRequest, db: Session = Depends(get_db)):
+async def forgot_password(request: PasswordResetRequest, db: AsyncSession = Depends(get_async_db)):
     """Request password reset."""
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     if not user:
         # Don't reveal if email exists or not for security
         return {"message": "If the email exists, a password reset link has been sent."}
@@ -186,7 +193,7 @@ async def forgot_password(request: PasswordResetRequest, db: Session = Depends(g
     # Store token hash and expiry (24 hours from now)
     user.reset_token_hash = reset_token_hash
     user.reset_token_expires = datetime.utcnow() + timedelta(hours=24)
-    db.commit()
+    await db.commit()
     
     # Debug info
     debug_info = {
@@ -235,16 +242,16 @@ async def forgot_password(request: PasswordResetRequest, db: Session = Depends(g
 
 
 @router.post("/reset-password")
-async def reset_password(request: PasswordReset, db: Session = Depends(get_db)):
+async def reset_password(request: PasswordReset, http_request: Request, db: AsyncSession = Depends(get_async_db)):
     """Reset password with token."""
     # Hash the provided token
     token_hash = hashlib.sha256(request.token.encode()).hexdigest()
     
     # Find user with matching token
-    user = db.query(User).filter(
+    user = await db.scalar(select(User).where(
         User.reset_token_hash == token_hash,
         User.reset_token_expires > datetime.utcnow()
-    ).first()
+    ))
     
     if not user:
         raise HTTPException(
@@ -253,9 +260,14 @@ async def reset_password(request: PasswordReset, db: Session = Depends(get_db)):
         )
     
     # Update password and clear reset token
-    user.hashed_password = get_password_hash(request.new_password)
+    user.hashed_password = await PasswordHasher.hash(
+        request.new_password, client=_client_host(http_request), account=user.email
+    )
     user.reset_token_hash = None
     user.reset_token_expires = None
-    db.commit()
+    # Sign out every existing session
+    user.token_version = (user.token_version or 0) + 1
+    await db.commit()
+    await PrincipalCache.invalidate(user.id)
     
     return {"message": "Password has been reset successfully"}
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+from datetime import datetime
+from typing import Optional
+import os
+import tempfile
+from backend.database.database import get_read_db
+from backend.database.models import User
+from backend.services.export_service import (
+    ExportService,
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    EXPORT_MEDIA_TYPES,
+    EXPORT_EXTENSIONS,
+    parquet_available
+)
+from backend.auth.auth import get_current_active_user
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+WATERMARK_HEADER = "X-Export-Watermark"
+ROWS_HEADER = "X-Export-Rows"
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("parquet"),
+    since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Download the current user's issues, inspections or properties as a
+    Parquet or gzip-compressed CSV file.
+    
+    Without since this is a full snapshot; with it, only rows created
+    (issues) or updated (inspections, properties) after it, followed by
+    rows deleted since then (deleted = true, only id set). The
+    X-Export-Watermark response header is the since for the next export.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset. Choose one of: {', '.join(EXPORT_DATASETS)}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format. Choose one of: {', '.join(EXPORT_FORMATS)}")
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export is not available on this server; use format=csv")
+    
+    fd, path = tempfile.mkstemp(prefix=f"export-{dataset}-", suffix=EXPORT_EXTENSIONS[format])
+    os.close(fd)
+    try:
+        total, watermark = await ExportService.export(db, dataset, format, path, current_user.id, since)
+    except Exception:
+        os.unlink(path)
+        raise
+    
+    headers = {ROWS_HEADER: str(total)}
+    if watermark:
+        headers[WATERMARK_HEADER] = watermark.isoformat()
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        filename=f"{dataset}{EXPORT_EXTENSIONS[format]}",
+        headers=headers,
+        background=BackgroundTask(os.unlink, path)
+    )
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
+from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import math
 import os
 import uuid
 from pathlib import Path
 from config.settings import get_settings
 from backend.auth.auth import get_current_active_user
-from backend.database.models import User
+from backend.database.database import get_async_db
+from backend.database.models import User, MultipartUpload
+from backend.services.file_serving_service import FileServingService
+from backend.services.storage_service import get_storage, DirectUploadNotSupported
 
 router = APIRouter(prefix="/files", tags=["files"])
 settings = get_settings()
@@ -16,7 +23,79 @@ UPLOAD_DIR = Path(settings.upload_dir)
 UPLOAD_DIR.mkdir(exist_ok=True)
 
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_FILE_SIZE = settings.max_upload_size
+# S3 allows at most 10000 parts per upload
+MAX_PART_NUMBER = min(10000, math.ceil(MAX_FILE_SIZE / settings.s3_multipart_chunk_size))
+
+
+class PresignUploadRequest(BaseModel):
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+
+
+class MultipartStartRequest(BaseModel):
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+
+
+class MultipartPartUrlsRequest(BaseModel):
+    filename: str
+    part_numbers: List[int]
+
+
+class MultipartPart(BaseModel):
+    part_number: int
+    etag: str
+
+
+class MultipartCompleteRequest(BaseModel):
+    filename: str
+    parts: List[MultipartPart]
+
+
+def _new_filename(original_filename: str) -> str:
+    """Validate the extension and return a unique storage key."""
+    file_ext = os.path.splitext(original_filename)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    return f"{uuid.uuid4()}{file_ext}"
+
+
+def _check_size(size: int) -> None:
+    if size < 1:
+        raise HTTPException(status_code=400, detail="File size must be positive")
+    if size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024}MB"
+        )
+
+
+async def _direct_upload(method, *args):
+    """Run a direct-upload storage call, turning an unsupported backend into a 400."""
+    try:
+        return await run_in_threadpool(method, *args)
+    except DirectUploadNotSupported as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _owned_upload(db: AsyncSession, upload_id: str, filename: str, user: User) -> MultipartUpload:
+    """The multipart upload if this user started it for this file; 404 otherwise."""
+    upload = await db.get(MultipartUpload, upload_id)
+    if upload is None or upload.key != filename or upload.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+def _part_size(upload: MultipartUpload, part_number: int) -> int:
+    """Exact size of a part: full chunks, then whatever remains of the declared size."""
+    chunk_size = settings.s3_multipart_chunk_size
+    return min(chunk_size, upload.size - (part_number - 1) * chunk_size)
 
 
 @router.post("/upload")
@@ -25,17 +104,7 @@ async def upload_file(
     current_user: User = Depends(get_current_active_user)
 ):
     """Upload a single file."""
-    # Check file extension
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = UPLOAD_DIR / unique_filename
+    unique_filename = _new_filename(file.filename)
     
     # Save file
     try:
@@ -48,8 +117,7 @@ async def upload_file(
                 detail=f"File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024}MB"
             )
         
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        await run_in_threadpool(get_storage().save, unique_filename, contents, file.content_type)
         
         # Return file URL
         file_url = f"/api/v1/files/{unique_filename}"
@@ -59,6 +127,8 @@ async def upload_file(
             "url": file_url,
             "size": len(contents)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
@@ -70,6 +140,7 @@ async def upload_multiple_files(
 ):
     """Upload multiple files."""
     uploaded_files = []
+    storage = get_storage()
     
     for file in files:
         try:
@@ -80,7 +151,6 @@ async def upload_multiple_files(
             
             # Generate unique filename
             unique_filename = f"{uuid.uuid4()}{file_ext}"
-            file_path = UPLOAD_DIR / unique_filename
             
             # Save file
             contents = await file.read()
@@ -89,8 +159,7 @@ async def upload_multiple_files(
             if len(contents) > MAX_FILE_SIZE:
                 continue
             
-            with open(file_path, "wb") as f:
-                f.write(contents)
+            await run_in_threadpool(storage.save, unique_filename, contents, file.content_type)
             
             # Add to results
             file_url = f"/api/v1/files/{unique_filename}"
@@ -107,15 +176,129 @@ async def upload_multiple_files(
     return {"files": uploaded_files, "count": len(uploaded_files)}
 
 
+@router.post("/presign-upload")
+async def presign_upload(
+    request: PresignUploadRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get a presigned PUT URL so the client uploads straight to the bucket."""
+    _check_size(request.size)
+    unique_filename = _new_filename(request.filename)
+    upload = await _direct_upload(
+        get_storage().presign_upload, unique_filename, request.content_type, request.size
+    )
+    
+    return {
+        **upload,
+        "filename": unique_filename,
+        "original_filename": request.filename,
+        "url": f"/api/v1/files/{unique_filename}",
+        "expires_in": settings.presigned_url_expire_seconds
+    }
+
+
+@router.post("/multipart/start")
+async def start_multipart_upload(
+    request: MultipartStartRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start a direct multipart upload for a large file of the declared size."""
+    _check_size(request.size)
+    unique_filename = _new_filename(request.filename)
+    upload_id = await _direct_upload(
+        get_storage().create_multipart_upload, unique_filename, request.content_type
+    )
+    
+    db.add(MultipartUpload(upload_id=upload_id, key=unique_filename, user_id=current_user.id, size=request.size))
+    await db.commit()
+    
+    return {
+        "upload_id": upload_id,
+        "filename": unique_filename,
+        "part_size": settings.s3_multipart_chunk_size,
+        "part_count": math.ceil(request.size / settings.s3_multipart_chunk_size),
+        "url": f"/api/v1/files/{unique_filename}"
+    }
+
+
+@router.post("/multipart/{upload_id}/part-urls")
+async def get_multipart_part_urls(
+    upload_id: str,
+    request: MultipartPartUrlsRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Presign PUT URLs for the given part numbers of a multipart upload."""
+    upload = await _owned_upload(db, upload_id, request.filename, current_user)
+    part_count = min(MAX_PART_NUMBER, math.ceil(upload.size / settings.s3_multipart_chunk_size))
+    if any(n < 1 or n > part_count for n in request.part_numbers):
+        raise HTTPException(status_code=400, detail=f"Part numbers must be between 1 and {part_count}")
+    
+    # Each URL is signed for its part's exact size, so the parts cannot add up to more than declared
+    storage = get_storage()
+    urls = {}
+    for part_number in set(request.part_numbers):
+        urls[part_number] = await _direct_upload(
+            storage.presign_upload_part, upload.key, upload_id, part_number, _part_size(upload, part_number)
+        )
+    
+    return {"upload_id": upload_id, "part_urls": urls}
+
+
+@router.post("/multipart/{upload_id}/complete")
+async def complete_multipart_upload(
+    upload_id: str,
+    request: MultipartCompleteRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Assemble the uploaded parts into the final object."""
+    upload = await _owned_upload(db, upload_id, request.filename, current_user)
+    parts = [{"PartNumber": p.part_number, "ETag": p.etag} for p in request.parts]
+    
+    try:
+        await _direct_upload(get_storage().complete_multipart_upload, upload.key, upload_id, parts)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to complete upload: {str(e)}")
+    
+    await db.delete(upload)
+    await db.commit()
+    return {"filename": upload.key, "url": f"/api/v1/files/{upload.key}"}
+
+
+@router.delete("/multipart/{upload_id}")
+async def abort_multipart_upload(
+    upload_id: str,
+    filename: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Abort a multipart upload and discard uploaded parts."""
+    upload = await _owned_upload(db, upload_id, filename, current_user)
+    await _direct_upload(get_storage().abort_multipart_upload, upload.key, upload_id)
+    await db.delete(upload)
+    await db.commit()
+    return {"message": "Upload aborted"}
+
+
 @router.get("/{filename}")
-async def get_file(filename: str):
-    """Serve an uploaded file."""
-    file_path = UPLOAD_DIR / filename
+async def get_file(filename: str, request: Request):
+    """Serve an uploaded file with ETag, conditional and byte-range support."""
+    storage = get_storage()
+    file_path = storage.local_path(filename)
     
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
+    if file_path is None:
+        # Object storage: send the client to the bucket instead of proxying bytes
+        download_url = await run_in_threadpool(storage.download_url, filename)
+        return RedirectResponse(download_url, status_code=307)
     
-    return FileResponse(file_path)
+    try:
+        return await FileServingService.serve(request, file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
 
 
 @router.delete("/{filename}")
@@ -124,13 +307,12 @@ async def delete_file(
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete an uploaded file."""
-    file_path = UPLOAD_DIR / filename
-    
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
-    
     try:
-        os.remove(file_path)
-        return {"message": "File deleted successfully"}
+        deleted = await run_in_threadpool(get_storage().delete, filename)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete file: {str(e)}")
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return {"message": "File deleted successfully"}
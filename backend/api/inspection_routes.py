@@ -1,39 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Response
+from fastapi.responses import RedirectResponse
+from sqlalchemy.orm import selectinload, load_only
+from sqlalchemy import select, update, func, cast, case, false
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import secrets
-from backend.database.database import get_db
-from backend.database.models import User, Property, Inspection, Room
+from backend.database.database import get_async_db, get_read_db
+from backend.database.models import User, Property, Inspection, Room, Photo, Issue
+from backend.database.json_types import json_text, json_float, json_int
 from backend.schemas.inspection_extended import (
     InspectionCreate,
     InspectionResponse,
     RoomCreate,
     RoomResponse,
-    InspectionAnalyzeRequest
+    InspectionAnalyzeRequest,
+    InspectionCompareRequest,
+    InspectionCompareResponse,
+    INSPECTION_REQUIRED_FIELDS,
+    INSPECTION_SUMMARY_FIELDS
 )
 from backend.auth.auth import get_current_active_user
+from config.settings import get_settings
 from workflows import InspectionWorkflow
 from schemas.inspection import InspectionInput
-from schemas.common import Photo, PropertyContext, Property as PropertyInfo
+from schemas.common import Photo as PhotoInfo, PropertyContext, Property as PropertyInfo
 from backend.services.photo_processing_service import PhotoProcessingService
-from backend.services.property_data_service import PropertyDataService
+from backend.services.room_classifier_service import RoomClassifierService
+from backend.services.file_serving_service import FileServingService
+from backend.services.issue_service import IssueService
+from backend.services.comparison_service import ComparisonService
+from backend.services.onboarding_service import OnboardingService
+from backend.services.report_service import ReportService, ReportOutdated, REPORT_MEDIA_TYPE
+from backend.services.export_service import ExportService
+from backend.services.pagination_service import PaginationService, NEXT_CURSOR_HEADER
+from backend.services.storage_service import get_storage
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/inspections", tags=["inspections"])
+settings = get_settings()
 
 
 @router.post("", response_model=InspectionResponse, status_code=status.HTTP_201_CREATED)
 async def create_inspection(
     inspection_data: InspectionCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new inspection."""
     # Verify property ownership
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).where(
         Property.id == inspection_data.property_id,
         Property.owner_id == current_user.id
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -51,41 +71,193 @@ async def create_inspection(
         public_share_token=secrets.token_urlsafe(32)
     )
     db.add(db_inspection)
-    db.commit()
-    db.refresh(db_inspection)
+    await db.commit()
     
-    return db_inspection
+    return await _load_inspection(db, db_inspection.id)
 
 
-@router.get("", response_model=List[InspectionResponse])
+def _parse_inspection_fields(fields: Optional[str]) -> Optional[tuple]:
+    """Resolve a ?fields= projection to response field names (None means everything)."""
+    if not fields:
+        return None
+    if fields == "summary":
+        return INSPECTION_SUMMARY_FIELDS
+    
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in InspectionResponse.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return INSPECTION_REQUIRED_FIELDS + tuple(name for name in requested if name not in INSPECTION_REQUIRED_FIELDS)
+
+
+def _inspection_load_options(field_names: Optional[tuple]) -> list:
+    """Eager-load rooms and photos only when returned, and skip unrequested columns."""
+    options = []
+    if field_names is None or "rooms" in field_names:
+        options.append(selectinload(Inspection.rooms).selectinload(Room.photos))
+    if field_names is not None:
+        columns = [getattr(Inspection, name) for name in field_names if name != "rooms"]
+        options.append(load_only(*columns, raiseload=True))
+    return options
+
+
+def _apply_summary_filters(
+    query,
+    dialect: str,
+    severity: Optional[str] = None,
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+    min_code_violations: Optional[int] = None,
+    issue_type: Optional[str] = None
+):
+    """
+    Filter inspections on their analysis summary.
+    
+    Each condition uses the same expression as the per-inspector expression
+    indexes in models.py, so these filters run as index scans.
+    """
+    if severity:
+        query = query.where(json_text(Inspection.summary_stats, "summary_severity") == severity.lower())
+    if min_cost is not None:
+        query = query.where(json_float(Inspection.summary_stats, "summary_cost_high") >= min_cost)
+    if max_cost is not None:
+        query = query.where(json_float(Inspection.summary_stats, "summary_cost_high") <= max_cost)
+    if min_code_violations is not None:
+        query = query.where(json_int(Inspection.report_summary, "code_violations_found") >= min_code_violations)
+    if issue_type:
+        if dialect == "postgresql":
+            # jsonb containment, served by the GIN index on issues_detected
+            query = query.where(Inspection.issues_detected.op("@>")(
+                cast([{"issue_type": issue_type}], JSONB)
+            ))
+        else:
+            issues = func.json_each(Inspection.issues_detected).table_valued("value")
+            query = query.where(
+                select(1).select_from(issues)
+                .where(func.json_extract(issues.c.value, "$.issue_type") == issue_type)
+                .exists()
+            )
+    return query
+
+
+async def _load_inspection(db: AsyncSession, inspection_id: int) -> Inspection:
+    """Fetch an inspection with everything InspectionResponse serializes."""
+    return await db.scalar(
+        select(Inspection)
+        .options(*_inspection_load_options(None))
+        .where(Inspection.id == inspection_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+def _mark_photos_analyzed(inspection_id: int, outcome: str):
+    """UPDATE recording how the latest analysis treated each photo of an inspection."""
+    # The workflow leaves out photos that failed the quality gate when exclusion is on
+    skipped = Photo.quality_passed == False if settings.exclude_low_quality_photos else false()
+    return (
+        update(Photo)
+        .where(Photo.inspection_id == inspection_id)
+        .values(analysis_status=case((skipped, "skipped"), else_=outcome))
+    )
+
+
+@router.get("", response_model=List[InspectionResponse], response_model_exclude_unset=True)
 async def list_inspections(
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     property_id: int = None,
+    severity: Optional[str] = None,
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+    min_code_violations: Optional[int] = None,
+    issue_type: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100
 ):
-    """List all inspections for current user."""
-    query = db.query(Inspection).filter(Inspection.inspector_id == current_user.id)
+    """
+    List all inspections for current user, newest first.
+    
+    severity, min_cost/max_cost (estimated high cost), min_code_violations and
+    issue_type filter on the analysis results. Pass fields=summary (or a
+    comma-separated list of field names) to leave out the report markdown,
+    issue JSON and rooms. The X-Next-Cursor header holds the cursor for the
+    following page.
+    """
+    field_names = _parse_inspection_fields(fields)
+    query = select(Inspection).options(*_inspection_load_options(field_names)).where(
+        Inspection.inspector_id == current_user.id
+    )
     
     if property_id:
-        query = query.filter(Inspection.property_id == property_id)
+        query = query.where(Inspection.property_id == property_id)
+    query = _apply_summary_filters(
+        query, db.get_bind().dialect.name,
+        severity=severity,
+        min_cost=min_cost,
+        max_cost=max_cost,
+        min_code_violations=min_code_violations,
+        issue_type=issue_type
+    )
     
-    inspections = query.offset(skip).limit(limit).all()
-    return inspections
+    try:
+        inspections, next_cursor = await PaginationService.paginate(db, query, Inspection, limit, cursor, skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    if field_names is None:
+        return inspections
+    return [{name: getattr(inspection, name) for name in field_names} for inspection in inspections]
+
+
+@router.post("/compare", response_model=InspectionCompareResponse)
+async def compare_inspections(
+    request: InspectionCompareRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Compare two inspections of the same property (typically move-in against
+    move-out): each issue is new, worsened, resolved or pre-existing.
+    """
+    if request.baseline_inspection_id == request.current_inspection_id:
+        raise HTTPException(status_code=400, detail="Choose two different inspections to compare")
+    
+    property_ids = dict((await db.execute(
+        select(Inspection.id, Inspection.property_id).where(
+            Inspection.id.in_((request.baseline_inspection_id, request.current_inspection_id)),
+            Inspection.inspector_id == current_user.id
+        )
+    )).all())
+    if len(property_ids) < 2:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inspection not found")
+    if property_ids[request.baseline_inspection_id] != property_ids[request.current_inspection_id]:
+        raise HTTPException(status_code=400, detail="Inspections belong to different properties")
+    
+    comparison = await ComparisonService.compare(db, request.baseline_inspection_id, request.current_inspection_id)
+    return {
+        "baseline_inspection_id": request.baseline_inspection_id,
+        "current_inspection_id": request.current_inspection_id,
+        "property_id": property_ids[request.current_inspection_id],
+        **comparison,
+    }
 
 
 @router.get("/{inspection_id}", response_model=InspectionResponse)
 async def get_inspection(
     inspection_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific inspection."""
-    inspection = db.query(Inspection).filter(
+    inspection = await db.scalar(select(Inspection).options(*_inspection_load_options(None)).where(
         Inspection.id == inspection_id,
         Inspection.inspector_id == current_user.id
-    ).first()
+    ))
     
     if not inspection:
         raise HTTPException(
@@ -101,14 +273,14 @@ async def add_room(
     inspection_id: int,
     room_data: RoomCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a room to an inspection."""
     # Verify inspection ownership
-    inspection = db.query(Inspection).filter(
+    inspection = await db.scalar(select(Inspection).where(
         Inspection.id == inspection_id,
         Inspection.inspector_id == current_user.id
-    ).first()
+    ))
     
     if not inspection:
         raise HTTPException(
@@ -121,12 +293,11 @@ async def add_room(
         inspection_id=inspection_id,
         room_type=room_data.room_type,
         room_name=room_data.room_name,
-        order_index=room_data.order_index,
-        photo_urls=[]
+        order_index=room_data.order_index
     )
     db.add(db_room)
-    db.commit()
-    db.refresh(db_room)
+    await db.commit()
+    await db.refresh(db_room, ["photos"])
     
     return db_room
 
@@ -137,31 +308,29 @@ async def add_photo_to_room(
     room_id: int,
     photo_url: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a photo URL to a room."""
     # Verify ownership
-    inspection = db.query(Inspection).filter(
+    inspection = await db.scalar(select(Inspection).where(
         Inspection.id == inspection_id,
         Inspection.inspector_id == current_user.id
-    ).first()
+    ))
     
     if not inspection:
         raise HTTPException(status_code=404, detail="Inspection not found")
     
-    room = db.query(Room).filter(
+    room = await db.scalar(select(Room).where(
         Room.id == room_id,
         Room.inspection_id == inspection_id
-    ).first()
+    ))
     
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     
     # Add photo URL
-    if room.photo_urls is None:
-        room.photo_urls = []
-    room.photo_urls.append(photo_url)
-    db.commit()
+    db.add(Photo(room_id=room.id, inspection_id=inspection_id, url=photo_url))
+    await db.commit()
     
     return {"message": "Photo added", "photo_url": photo_url}
 
@@ -170,28 +339,29 @@ async def add_photo_to_room(
 async def analyze_inspection(
     inspection_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Run AI analysis on an inspection."""
     # Get inspection with rooms
-    inspection = db.query(Inspection).filter(
+    inspection = await db.scalar(select(Inspection).options(*_inspection_load_options(None)).where(
         Inspection.id == inspection_id,
         Inspection.inspector_id == current_user.id
-    ).first()
+    ))
     
     if not inspection:
         raise HTTPException(status_code=404, detail="Inspection not found")
     
     # Get property
-    property = db.query(Property).filter(Property.id == inspection.property_id).first()
+    property = await db.get(Property, inspection.property_id)
     
     # Prepare photos from rooms
     photos = []
     for room in inspection.rooms:
-        for photo_url in (room.photo_urls or []):
-            photos.append(Photo(
-                image_url=photo_url,
-                room_name=room.room_name or room.room_type
+        for photo in room.photos:
+            photos.append(PhotoInfo(
+                image_url=photo.url,
+                room_name=room.room_name or room.room_type,
+                quality_passed=photo.quality_passed
             ))
     
     if not photos:
@@ -199,7 +369,7 @@ async def analyze_inspection(
     
     # Update status
     inspection.status = "processing"
-    db.commit()
+    await db.commit()
     
     try:
         # Run AI workflow
@@ -228,33 +398,35 @@ async def analyze_inspection(
         inspection.issues_detected = result["issues_enriched"]
         inspection.summary_stats = result["summary"]
         inspection.status = "completed"
+        await db.run_sync(
+            lambda session: IssueService.replace_inspection_issues(session, inspection, result["issues_enriched"])
+        )
+        await db.execute(_mark_photos_analyzed(inspection.id, "analyzed"))
         
-        db.commit()
-        db.refresh(inspection)
-        
-        return inspection
+        await db.commit()
         
+        return await _load_inspection(db, inspection.id)
+    
     except Exception as e:
         inspection.status = "failed"
-        db.commit()
+        await db.execute(_mark_photos_analyzed(inspection.id, "failed"))
+        await db.commit()
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
 @router.get("/{inspection_id}/pdf")
 async def download_inspection_pdf(
     inspection_id: int,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Download inspection report as PDF."""
-    from fastapi.responses import StreamingResponse
-    from backend.services.pdf_generator import PDFGenerator
-    
+    """Download inspection report as PDF (rendered once per inspection version)."""
     # Get inspection
-    inspection = db.query(Inspection).filter(
+    inspection = await db.scalar(select(Inspection).where(
         Inspection.id == inspection_id,
         Inspection.inspector_id == current_user.id
-    ).first()
+    ))
     
     if not inspection:
         raise HTTPException(status_code=404, detail="Inspection not found")
@@ -263,53 +435,62 @@ async def download_inspection_pdf(
         raise HTTPException(status_code=400, detail="Inspection not completed yet")
     
     # Get property
-    property = db.query(Property).filter(Property.id == inspection.property_id).first()
-    
-    # Prepare data
-    inspection_data = {
-        "inspection_type": inspection.inspection_type.value,
-        "inspection_date": inspection.inspection_date.isoformat(),
-        "status": inspection.status,
-        "summary_stats": inspection.summary_stats,
-        "issues_enriched": inspection.issues_detected,
-        "property": {
-            "address_line1": property.address_line1,
-            "city": property.city,
-            "state": property.state,
-            "postal_code": property.postal_code,
-            "property_type": property.property_type
-        } if property else None
-    }
+    property = await db.get(Property, inspection.property_id)
     
-    # Generate PDF
-    pdf_buffer = PDFGenerator.generate_inspection_report(inspection_data)
+    try:
+        key = await ReportService.get_report(inspection, property)
+    except ReportOutdated as e:
+        raise HTTPException(status_code=409, detail=f"{e}; please try again")
+    storage = get_storage()
+    file_path = storage.local_path(key)
+    if file_path is None:
+        download_url = await run_in_threadpool(storage.download_url, key)
+        return RedirectResponse(download_url, status_code=307)
     
-    # Return as download
     filename = f"inspection_{inspection_id}_{inspection.inspection_date.strftime('%Y%m%d')}.pdf"
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    serve = lambda: FileServingService.serve(
+        request,
+        file_path,
+        media_type=REPORT_MEDIA_TYPE,
+        filename=filename,
+        cache_control="private, no-cache",
+        content_disposition_type="attachment"
     )
+    try:
+        return await serve()
+    except FileNotFoundError:
+        # Recorded as rendered but the file is gone (e.g. a fresh upload directory)
+        try:
+            await ReportService.get_report(inspection, property, force=True)
+        except ReportOutdated as e:
+            raise HTTPException(status_code=409, detail=f"{e}; please try again")
+        return await serve()
 
 
 @router.delete("/{inspection_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_inspection(
     inspection_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an inspection."""
-    inspection = db.query(Inspection).filter(
+    inspection = await db.scalar(select(Inspection).where(
         Inspection.id == inspection_id,
         Inspection.inspector_id == current_user.id
-    ).first()
+    ))
     
     if not inspection:
         raise HTTPException(status_code=404, detail="Inspection not found")
     
-    db.delete(inspection)
-    db.commit()
+    report_key = ReportService.key_from_url(inspection.report_pdf_url)
+    photo_urls = (await db.scalars(select(Photo.url).where(Photo.inspection_id == inspection.id))).all()
+    # Issue rows go with the inspection through the foreign key cascade
+    await db.execute(ExportService.tombstones("issues", Issue.inspection_id == inspection.id))
+    await db.execute(ExportService.tombstones("inspections", Inspection.id == inspection.id))
+    await db.delete(inspection)
+    await db.commit()
+    await ReportService.discard(report_key)
+    await ReportService.discard_derivatives(db, photo_urls)
     return None
 
 
@@ -319,6 +500,11 @@ class QuickInspectionCreate(BaseModel):
     auto_create_rooms: bool = True
 
 
+class PhotoMoveRequest(BaseModel):
+    photo_url: str
+    to_room_id: int
+
+
 class BulkPhotoUpload(BaseModel):
     inspection_id: int
     photos: List[str]  # Base64 encoded photos
@@ -329,14 +515,14 @@ class BulkPhotoUpload(BaseModel):
 async def quick_create_inspection(
     request: QuickInspectionCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Quickly create an inspection with auto-generated rooms."""
     # Verify property ownership
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).where(
         Property.id == request.property_id,
         Property.owner_id == current_user.id
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -344,40 +530,18 @@ async def quick_create_inspection(
             detail="Property not found"
         )
     
-    # Create inspection
-    db_inspection = Inspection(
-        property_id=request.property_id,
-        inspector_id=current_user.id,
-        inspection_type=request.inspection_type,
-        status="draft",
-        public_share_token=secrets.token_urlsafe(32)
-    )
-    db.add(db_inspection)
-    db.commit()
-    db.refresh(db_inspection)
-    
-    # Auto-create rooms if requested
-    if request.auto_create_rooms:
-        suggested_rooms = await PropertyDataService.suggest_room_layout(
-            property.property_type or "Single Family Home",
-            property.bedrooms or 3,
-            property.bathrooms or 2
-        )
-        
-        for i, room_data in enumerate(suggested_rooms):
-            db_room = Room(
-                inspection_id=db_inspection.id,
-                room_type=room_data["type"],
-                room_name=room_data["name"],
-                order_index=i,
-                photo_urls=[]
-            )
-            db.add(db_room)
-        
-        db.commit()
-        db.refresh(db_inspection)
+    try:
+        inspection_type = OnboardingService.inspection_type(request.inspection_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    # Inspection and rooms go in together and are committed once
+    db_inspection = OnboardingService.new_inspection(property.id, current_user.id, inspection_type)
+    layout = await OnboardingService.room_layout(property) if request.auto_create_rooms else None
+    await OnboardingService.create_inspections(db, [db_inspection], [layout])
+    await db.commit()
     
-    return db_inspection
+    return await _load_inspection(db, db_inspection.id)
 
 
 @router.post("/bulk-photo-upload")
@@ -386,14 +550,14 @@ async def bulk_photo_upload(
     inspection_id: int = None,
     auto_assign_rooms: bool = True,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload multiple photos and auto-assign to rooms."""
     # Verify inspection ownership
-    inspection = db.query(Inspection).filter(
+    inspection = await db.scalar(select(Inspection).where(
         Inspection.id == inspection_id,
         Inspection.inspector_id == current_user.id
-    ).first()
+    ))
     
     if not inspection:
         raise HTTPException(
@@ -401,9 +565,12 @@ async def bulk_photo_upload(
             detail="Inspection not found"
         )
     
-    # Get room names for auto-assignment
-    rooms = db.query(Room).filter(Room.inspection_id == inspection_id).all()
+    # Get rooms in walkthrough order for auto-assignment
+    rooms = (await db.scalars(
+        select(Room).where(Room.inspection_id == inspection_id).order_by(Room.order_index, Room.id)
+    )).all()
     room_names = [room.room_name or room.room_type for room in rooms]
+    room_types = [room.room_type for room in rooms]
     
     # Process photos
     photo_bytes_list = []
@@ -413,7 +580,10 @@ async def bulk_photo_upload(
     
     # Process bulk photos
     processed_photos = await PhotoProcessingService.process_bulk_photos(
-        photo_bytes_list, room_names
+        photo_bytes_list,
+        room_names,
+        room_types=room_types,
+        classifier_index=await db.run_sync(RoomClassifierService.get_index, current_user.id)
     )
     
     # Auto-assign photos to rooms if requested
@@ -424,15 +594,33 @@ async def bulk_photo_upload(
                 # Find matching room
                 room = next((r for r in rooms if r.room_name == suggested_room or r.room_type == suggested_room), None)
                 if room:
-                    # In a real implementation, you'd save the photo to storage first
-                    # For now, we'll use a placeholder URL
-                    photo_url = f"/uploads/inspection_{inspection_id}/photo_{photo['hash']}.jpg"
+                    # Content-addressed key, so re-uploading the same photo reuses the object
+                    filename = photo["key"]
+                    await run_in_threadpool(
+                        get_storage().save, filename, photo_bytes_list[photo["index"]], f"image/{filename.rsplit('.', 1)[1]}"
+                    )
+                    photo_url = photo["url"]
                     
-                    if room.photo_urls is None:
-                        room.photo_urls = []
-                    room.photo_urls.append(photo_url)
-    
-    db.commit()
+                    quality = photo.get("quality") or {}
+                    db.add(Photo(
+                        room_id=room.id,
+                        inspection_id=inspection_id,
+                        url=photo_url,
+                        content_hash=photo["hash"],
+                        file_size=photo["file_size"],
+                        width=photo["width"],
+                        height=photo["height"],
+                        format=photo.get("format"),
+                        perceptual_hash=quality.get("perceptual_hash"),
+                        taken_at=RoomClassifierService.parse_timestamp(photo),
+                        quality_passed=quality.get("passed"),
+                        blur_score=quality.get("blur_score"),
+                        brightness=quality.get("brightness"),
+                        quality=quality or None,
+                        features=photo["features"]
+                    ))
+    
+    await db.commit()
     
     # Generate summary
     summary = await PhotoProcessingService.generate_photo_summary(processed_photos)
@@ -441,7 +629,54 @@ async def bulk_photo_upload(
         "message": f"Successfully uploaded {len(processed_photos)} photos",
         "processed_photos": len(processed_photos),
         "summary": summary,
-        "photos": processed_photos
+        # Feature vectors are stored for the classifier; clients have no use for them
+        "photos": [{key: value for key, value in photo.items() if key != "features"} for photo in processed_photos]
+    }
+
+
+@router.post("/{inspection_id}/photos/move")
+async def move_photo(
+    inspection_id: int,
+    request: PhotoMoveRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Move a photo to another room and teach the room classifier from the correction."""
+    inspection = await db.scalar(select(Inspection).where(
+        Inspection.id == inspection_id,
+        Inspection.inspector_id == current_user.id
+    ))
+    
+    if not inspection:
+        raise HTTPException(status_code=404, detail="Inspection not found")
+    
+    photo = await db.scalar(select(Photo).where(
+        Photo.inspection_id == inspection_id,
+        Photo.url == request.photo_url
+    ))
+    target = await db.scalar(select(Room).where(
+        Room.id == request.to_room_id,
+        Room.inspection_id == inspection_id
+    ))
+    
+    if not photo:
+        raise HTTPException(status_code=404, detail="Photo not found in this inspection")
+    if not target:
+        raise HTTPException(status_code=404, detail="Room not found")
+    
+    features = photo.features
+    photo.room_id = target.id
+    
+    if features:
+        await db.run_sync(RoomClassifierService.record_correction, current_user.id, target.room_type, features)
+    
+    await db.commit()
+    
+    return {
+        "message": "Photo moved",
+        "photo_url": request.photo_url,
+        "room_id": target.id,
+        "learned": features is not None
     }
 
 
@@ -488,21 +723,20 @@ async def get_inspection_templates(
 async def auto_analyze_inspection(
     inspection_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Automatically analyze inspection and generate preliminary report."""
     # Get inspection
-    inspection = db.query(Inspection).filter(
+    inspection = await db.scalar(select(Inspection).where(
         Inspection.id == inspection_id,
         Inspection.inspector_id == current_user.id
-    ).first()
+    ))
     
     if not inspection:
         raise HTTPException(status_code=404, detail="Inspection not found")
     
     # Get photos from all rooms
-    rooms = db.query(Room).filter(Room.inspection_id == inspection_id).all()
-    total_photos = sum(len(room.photo_urls or []) for room in rooms)
+    total_photos = await db.scalar(select(func.count(Photo.id)).where(Photo.inspection_id == inspection_id))
     
     if total_photos == 0:
         raise HTTPException(status_code=400, detail="No photos to analyze")
@@ -535,7 +769,8 @@ async def auto_analyze_inspection(
     # Update inspection status
     inspection.status = "analyzed"
     inspection.summary_stats = analysis_results
-    db.commit()
+    await db.execute(_mark_photos_analyzed(inspection_id, "analyzed"))
+    await db.commit()
     
     return {
         "message": "Analysis completed",
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from backend.database.database import get_read_db
+from backend.database.models import User, Property, Issue
+from backend.schemas.issue import IssueListResponse
+from backend.auth.auth import get_current_active_user
+
+router = APIRouter(prefix="/issues", tags=["issues"])
+
+
+@router.get("", response_model=IssueListResponse)
+async def list_issues(
+    property_id: Optional[int] = None,
+    inspection_id: Optional[int] = None,
+    severity: Optional[str] = None,
+    category: Optional[str] = None,
+    trade: Optional[str] = None,
+    code_violation: Optional[bool] = None,
+    min_cost: Optional[float] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Filter detected issues across the current user's properties."""
+    owned_properties = select(Property.id).where(Property.owner_id == current_user.id)
+    query = select(Issue).where(Issue.property_id.in_(owned_properties))
+    
+    if property_id is not None:
+        query = query.where(Issue.property_id == property_id)
+    if inspection_id is not None:
+        query = query.where(Issue.inspection_id == inspection_id)
+    if severity:
+        query = query.where(Issue.severity == severity.lower())
+    if category:
+        query = query.where(Issue.category == category)
+    if trade:
+        query = query.where(Issue.recommended_trade == trade)
+    if code_violation is not None:
+        query = query.where(Issue.potential_code_violation == code_violation)
+    if min_cost is not None:
+        query = query.where(Issue.estimated_cost_high >= min_cost)
+    
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    issues = (await db.scalars(
+        query.order_by(Issue.created_at.desc(), Issue.id.desc()).offset(skip).limit(limit)
+    )).all()
+    
+    return {"issues": issues, "total": total, "skip": skip, "limit": limit}
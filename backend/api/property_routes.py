@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy import select
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from backend.database.database import get_db
+from backend.database.database import get_async_db, get_read_db
 from backend.database.models import User, Property
-from backend.schemas.property import PropertyCreate, PropertyUpdate, PropertyResponse
+from backend.schemas.property import (
+    PropertyCreate,
+    PropertyUpdate,
+    PropertyResponse,
+    BatchPropertyResponse,
+    PropertyTimelineResponse
+)
 from backend.auth.auth import get_current_active_user
 from backend.services.property_data_service import PropertyDataService
-from pydantic import BaseModel
+from backend.services.pagination_service import PaginationService, NEXT_CURSOR_HEADER
+from backend.services.onboarding_service import OnboardingService
+from backend.services.timeline_service import TimelineService
+from config.settings import get_settings
+from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/properties", tags=["properties"])
+settings = get_settings()
 
 
 class AddressLookupRequest(BaseModel):
@@ -22,11 +35,15 @@ class QuickPropertyCreate(BaseModel):
     inspection_type: Optional[str] = "Move-in Inspection"
 
 
+class BatchPropertyCreate(BaseModel):
+    properties: List[QuickPropertyCreate] = Field(..., min_length=1)
+
+
 @router.post("", response_model=PropertyResponse, status_code=status.HTTP_201_CREATED)
 async def create_property(
     property_data: PropertyCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new property."""
     db_property = Property(
@@ -34,23 +51,31 @@ async def create_property(
         owner_id=current_user.id
     )
     db.add(db_property)
-    db.commit()
-    db.refresh(db_property)
+    await db.commit()
+    await db.refresh(db_property)
     return db_property
 
 
 @router.get("", response_model=List[PropertyResponse])
 async def list_properties(
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100
 ):
-    """List all properties for current user."""
-    properties = db.query(Property).filter(
+    """List all properties for current user, newest first (next page cursor in X-Next-Cursor)."""
+    query = select(Property).where(
         Property.owner_id == current_user.id,
         Property.is_active == True
-    ).offset(skip).limit(limit).all()
+    )
+    try:
+        properties, next_cursor = await PaginationService.paginate(db, query, Property, limit, cursor, skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return properties
 
 
@@ -58,13 +83,13 @@ async def list_properties(
 async def get_property(
     property_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific property."""
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).where(
         Property.id == property_id,
         Property.owner_id == current_user.id
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -75,18 +100,43 @@ async def get_property(
     return property
 
 
+@router.get("/{property_id}/timeline", response_model=PropertyTimelineResponse)
+async def get_property_timeline(
+    property_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Condition trend of a property across its completed inspections: issue
+    counts by severity, cost range and code violations, as parallel series.
+    """
+    points = await TimelineService.get_points(db, property_id, current_user.id)
+    if points is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    
+    columns = list(zip(*points)) if points else [()] * len(TimelineService.SERIES_FIELDS)
+    return {
+        "property_id": property_id,
+        "points": len(points),
+        "series": {name: list(values) for name, values in zip(TimelineService.SERIES_FIELDS, columns)},
+    }
+
+
 @router.put("/{property_id}", response_model=PropertyResponse)
 async def update_property(
     property_id: int,
     property_data: PropertyUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a property."""
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).where(
         Property.id == property_id,
         Property.owner_id == current_user.id
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -99,8 +149,8 @@ async def update_property(
     for field, value in update_data.items():
         setattr(property, field, value)
     
-    db.commit()
-    db.refresh(property)
+    await db.commit()
+    await db.refresh(property)
     return property
 
 
@@ -108,13 +158,13 @@ async def update_property(
 async def delete_property(
     property_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete (soft delete) a property."""
-    property = db.query(Property).filter(
+    property = await db.scalar(select(Property).where(
         Property.id == property_id,
         Property.owner_id == current_user.id
-    ).first()
+    ))
     
     if not property:
         raise HTTPException(
@@ -123,7 +173,7 @@ async def delete_property(
         )
     
     property.is_active = False
-    db.commit()
+    await db.commit()
     return None
 
 
@@ -151,72 +201,80 @@ async def lookup_property_data(
     }
 
 
+async def _quick_create_entries(requests: List[QuickPropertyCreate]) -> list:
+    """Parse addresses and look up property data for quick-create requests."""
+    errors = []
+    entries = []
+    for index, request in enumerate(requests):
+        try:
+            address = PropertyDataService.parse_address(request.address)
+            inspection_type = OnboardingService.inspection_type(request.inspection_type) if request.create_inspection else None
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        entries.append((request, address, inspection_type))
+    
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+    
+    # A large batch would otherwise start every lookup (and its source requests) at once
+    limit = asyncio.Semaphore(settings.property_batch_lookup_concurrency)
+    
+    async def lookup(address: str):
+        async with limit:
+            return await PropertyDataService.get_property_data_from_address(address)
+    
+    lookups = await asyncio.gather(*(lookup(request.address) for request, _, _ in entries))
+    return [
+        (OnboardingService.property_values(address, request.property_type, property_data), inspection_type)
+        for (request, address, inspection_type), property_data in zip(entries, lookups)
+    ]
+
+
 @router.post("/quick-create", response_model=PropertyResponse)
 async def quick_create_property(
     request: QuickPropertyCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Quickly create a property with auto-filled data and optional inspection."""
-    # Get property data from address
-    property_data = await PropertyDataService.get_property_data_from_address(request.address)
-    
-    # Create property with available data
-    property_create_data = {
-        "address": request.address,
-        "property_type": request.property_type or (property_data.get("property_type") if property_data else "Single Family Home"),
-        "bedrooms": property_data.get("bedrooms", 3) if property_data else 3,
-        "bathrooms": property_data.get("bathrooms", 2) if property_data else 2,
-        "square_feet": property_data.get("square_feet") if property_data else None,
-        "year_built": property_data.get("year_built") if property_data else None,
-        "lot_size": property_data.get("lot_size") if property_data else None
-    }
-    
-    # Remove None values
-    property_create_data = {k: v for k, v in property_create_data.items() if v is not None}
-    
-    # Create property
-    db_property = Property(
-        **property_create_data,
-        owner_id=current_user.id
-    )
-    db.add(db_property)
-    db.commit()
-    db.refresh(db_property)
+    entries = await _quick_create_entries([request])
+    [(db_property, _, _)] = await OnboardingService.create_properties(db, current_user.id, entries)
+    await db.commit()
+    return db_property
     
-    # Optionally create inspection with suggested rooms
-    if request.create_inspection:
-        from backend.database.models import Inspection, Room
-        
-        # Create inspection
-        inspection = Inspection(
-            property_id=db_property.id,
-            inspection_type=request.inspection_type,
-            status="in_progress"
+
+@router.post("/batch", response_model=BatchPropertyResponse, status_code=status.HTTP_201_CREATED)
+async def batch_create_properties(
+    request: BatchPropertyCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many properties at once, each optionally with an inspection and its
+    suggested rooms. All or nothing: any unparseable entry rejects the batch.
+    """
+    if len(request.properties) > settings.property_batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.property_batch_max_size} properties per batch"
         )
-        db.add(inspection)
-        db.commit()
-        db.refresh(inspection)
-        
-        # Add suggested rooms if we have property data
-        if property_data:
-            suggested_rooms = await PropertyDataService.suggest_room_layout(
-                property_create_data.get("property_type", ""),
-                property_create_data.get("bedrooms", 3),
-                property_create_data.get("bathrooms", 2)
-            )
-            
-            for room_data in suggested_rooms:
-                room = Room(
-                    inspection_id=inspection.id,
-                    name=room_data["name"],
-                    room_type=room_data["type"]
-                )
-                db.add(room)
-            
-            db.commit()
     
-    return db_property
+    entries = await _quick_create_entries(request.properties)
+    created = await OnboardingService.create_properties(db, current_user.id, entries)
+    await db.commit()
+    
+    return {
+        "created": len(created),
+        "results": [
+            {
+                "property": db_property,
+                "inspection_id": inspection.id if inspection else None,
+                "room_count": room_count,
+            }
+            for db_property, inspection, room_count in created
+        ]
+    }
 
 
 @router.get("/templates")
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database.database import get_read_db
+from backend.database.models import User
+from backend.schemas.search import SearchResponse
+from backend.services.search_service import SearchService
+from backend.auth.auth import get_current_active_user
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search_inspections(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Full-text search over the current user's inspections.
+    
+    Matches property addresses, inspection notes, issue descriptions and
+    report text, best matches first; the last word may be a prefix.
+    """
+    results, total = await SearchService.search(db, current_user.id, q, limit, skip)
+    return {"results": results, "total": total, "skip": skip, "limit": limit}
@@ -4,9 +4,11 @@ from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from backend.database.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database.database import get_async_db
 from backend.database.models import User
+from backend.auth.principal_cache import Principal, PrincipalCache
 from config.settings import get_settings
 
 settings = get_settings()
@@ -48,11 +50,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(
+def create_user_token(user: User, expires_delta: Optional[timedelta] = None) -> str:
+    """Access token whose claims identify the user without a database lookup."""
+    return create_access_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "role": getattr(user.role, "value", user.role),
+            "ver": user.token_version or 0,
+        },
+        expires_delta=expires_delta
+    )
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Get the current authenticated user.
+    
+    Resolved from the principal cache by the token's user id and version, so
+    most requests run no query; a miss loads the user by primary key. Tokens
+    issued before a password reset or deactivation carry an old version and
+    are rejected.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -64,24 +86,36 @@ def get_current_user(
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-    except JWTError:
+        user_id = payload.get("uid")
+        token_version = int(payload.get("ver", 0))
+    except (JWTError, TypeError, ValueError):
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    if user_id is not None:
+        principal = await PrincipalCache.get(user_id, token_version)
+        if principal is not None:
+            return principal
+        user = await db.get(User, user_id)
+    else:
+        # Tokens issued before claims carried the user id
+        user = await db.scalar(select(User).where(User.email == email))
+    
+    if user is None or (user.token_version or 0) != token_version:
         raise credentials_exception
     
-    return user
+    principal = Principal.from_user(user)
+    await PrincipalCache.put(principal)
+    return principal
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Get the current active user."""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """Require the current user to be an admin."""
     if current_user.role != "admin":
         raise HTTPException(
@@ -0,0 +1,123 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+import os
+import time
+from fastapi import HTTPException, status
+from backend.auth.auth import verify_password, get_password_hash
+from config.settings import get_settings
+
+settings = get_settings()
+
+_hash_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_hash_pool() -> ThreadPoolExecutor:
+    """
+    Dedicated pool for bcrypt, created on first use.
+    
+    bcrypt releases the GIL while hashing, so threads scale with cores without
+    the pickling overhead of a process pool.
+    """
+    global _hash_pool
+    if _hash_pool is None:
+        workers = settings.auth_hash_workers or os.cpu_count()
+        _hash_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        PasswordHasher.workers = workers
+    return _hash_pool
+
+
+class PasswordHasher:
+    """
+    Password hashing and verification off the event loop.
+    
+    Work is bounded: at most auth_hash_max_pending operations may be running
+    or queued (503 beyond that), and each client IP and account may have at
+    most auth_hash_per_client of them (429), so one client's burst of logins
+    cannot starve everyone else. Counters are only touched on the event loop.
+    """
+    
+    workers = 0  # size of the hash pool, set when it is created
+    _pending = 0
+    _per_key: Dict[str, int] = defaultdict(int)
+    _stats = {
+        "completed": 0,
+        "rejected_busy": 0,
+        "rejected_client": 0,
+        "queue_wait_seconds": 0.0,
+        "max_queue_wait_seconds": 0.0,
+        "hash_seconds": 0.0,
+    }
+
+    @staticmethod
+    async def _run(func: Callable[..., Any], *args: Any, client: Optional[str] = None, account: Optional[str] = None) -> Any:
+        stats = PasswordHasher._stats
+        keys = [key for key in (f"ip:{client}" if client else None, f"account:{account.lower()}" if account else None) if key]
+        
+        if PasswordHasher._pending >= settings.auth_hash_max_pending:
+            stats["rejected_busy"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        if any(PasswordHasher._per_key[key] >= settings.auth_hash_per_client for key in keys):
+            stats["rejected_client"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent sign-in attempts",
+                headers={"Retry-After": "1"},
+            )
+
+        def timed():
+            started = time.perf_counter()
+            return func(*args), started, time.perf_counter()
+        
+        PasswordHasher._pending += 1
+        for key in keys:
+            PasswordHasher._per_key[key] += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(get_hash_pool(), timed)
+        finally:
+            PasswordHasher._pending -= 1
+            for key in keys:
+                PasswordHasher._per_key[key] -= 1
+                if not PasswordHasher._per_key[key]:
+                    del PasswordHasher._per_key[key]
+        
+        queue_wait = started - submitted
+        stats["completed"] += 1
+        stats["queue_wait_seconds"] += queue_wait
+        stats["max_queue_wait_seconds"] = max(stats["max_queue_wait_seconds"], queue_wait)
+        stats["hash_seconds"] += finished - started
+        return result
+
+    @staticmethod
+    async def verify(plain_password: str, hashed_password: str, client: Optional[str] = None, account: Optional[str] = None) -> bool:
+        """verify_password in the hash pool."""
+        return await PasswordHasher._run(verify_password, plain_password, hashed_password, client=client, account=account)
+
+    @staticmethod
+    async def hash(password: str, client: Optional[str] = None, account: Optional[str] = None) -> str:
+        """get_password_hash in the hash pool."""
+        return await PasswordHasher._run(get_password_hash, password, client=client, account=account)
+
+    @staticmethod
+    def metrics() -> Dict[str, Any]:
+        """Queueing and throughput counters since startup."""
+        get_hash_pool()
+        stats = PasswordHasher._stats
+        completed = stats["completed"] or 1
+        return {
+            "workers": PasswordHasher.workers,
+            "in_flight": PasswordHasher._pending,
+            "completed": stats["completed"],
+            "rejected_busy": stats["rejected_busy"],
+            "rejected_client": stats["rejected_client"],
+            "avg_queue_wait_ms": round(stats["queue_wait_seconds"] / completed * 1000, 2),
+            "max_queue_wait_ms": round(stats["max_queue_wait_seconds"] * 1000, 2),
+            "avg_hash_ms": round(stats["hash_seconds"] / completed * 1000, 2),
+        }
@@ -0,0 +1,135 @@
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import json
+import logging
+import threading
+import time
+from backend.database.models import User, UserRole, SubscriptionTier
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REDIS_KEY_PREFIX = "principal:"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user as request handlers see it.
+    
+    A plain snapshot of the users row, so it can be cached across requests
+    and sessions; handlers only read it.
+    """
+    id: int
+    email: str
+    name: str
+    role: UserRole
+    subscription_tier: SubscriptionTier
+    is_active: bool
+    created_at: datetime
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            subscription_tier=user.subscription_tier,
+            is_active=bool(user.is_active),
+            created_at=user.created_at,
+            token_version=user.token_version or 0,
+        )
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return json.dumps(data, default=lambda value: getattr(value, "value", str(value)))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        data = json.loads(raw)
+        data["role"] = UserRole(data["role"]) if data.get("role") else None
+        data["subscription_tier"] = SubscriptionTier(data["subscription_tier"]) if data.get("subscription_tier") else None
+        data["created_at"] = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+        return cls(**data)
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of principals keyed by user id and token version.
+    
+    Entries live for principal_cache_ttl_seconds, in-process by default. With
+    principal_cache_url set they live in Redis instead, so an invalidation is
+    seen by every worker at once; in-process, other workers pick up a role or
+    status change when their entry expires.
+    """
+    
+    _local: Dict[int, Tuple[float, Principal]] = {}
+    _lock = threading.Lock()
+    _redis = None
+    _redis_checked = False
+
+    @staticmethod
+    def _shared():
+        """The Redis client when a shared cache is configured and usable."""
+        if PrincipalCache._redis_checked:
+            return PrincipalCache._redis
+        PrincipalCache._redis_checked = True
+        if settings.principal_cache_url:
+            try:
+                import redis.asyncio as redis
+                PrincipalCache._redis = redis.from_url(settings.principal_cache_url)
+            except ImportError:
+                logger.warning("principal_cache_url is set but the redis package is not installed; caching in-process only")
+        return PrincipalCache._redis
+
+    @staticmethod
+    async def get(user_id: int, token_version: int) -> Optional[Principal]:
+        shared = PrincipalCache._shared()
+        if shared is None:
+            with PrincipalCache._lock:
+                entry = PrincipalCache._local.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            principal = entry[1]
+        else:
+            try:
+                raw = await shared.get(f"{REDIS_KEY_PREFIX}{user_id}")
+            except Exception as e:
+                logger.warning(f"Shared principal cache unavailable: {e}")
+                return None
+            if raw is None:
+                return None
+            principal = Principal.from_json(raw)
+        
+        return principal if principal.token_version == token_version else None
+
+    @staticmethod
+    async def put(principal: Principal) -> None:
+        ttl = settings.principal_cache_ttl_seconds
+        shared = PrincipalCache._shared()
+        if shared is None:
+            with PrincipalCache._lock:
+                PrincipalCache._local[principal.id] = (time.monotonic() + ttl, principal)
+            return
+        try:
+            await shared.set(f"{REDIS_KEY_PREFIX}{principal.id}", principal.to_json(), ex=max(1, int(ttl)))
+        except Exception as e:
+            logger.warning(f"Shared principal cache unavailable: {e}")
+
+    @staticmethod
+    async def invalidate(user_id: int) -> None:
+        """Forget a user's principal after their role, status or credentials change."""
+        shared = PrincipalCache._shared()
+        if shared is None:
+            with PrincipalCache._lock:
+                PrincipalCache._local.pop(user_id, None)
+            return
+        try:
+            await shared.delete(f"{REDIS_KEY_PREFIX}{user_id}")
+        except Exception as e:
+            logger.warning(f"Shared principal cache unavailable: {e}")
@@ -1,23 +1,85 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Dict, Tuple
+import itertools
+import logging
+import time
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from config.settings import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # Database URL
 DATABASE_URL = settings.database_url
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+# Async drivers for the sync URLs used by scripts and migrations
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-# Session factory
+
+def to_async_url(url: str) -> str:
+    """Swap a sync database URL's driver for its asyncio equivalent."""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+ASYNC_DATABASE_URL = settings.async_database_url or to_async_url(DATABASE_URL)
+
+POOL_OPTIONS = {
+    "pool_pre_ping": True,
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+}
+
+# Create engine (scripts, migrations and background threads)
+engine = create_engine(DATABASE_URL, **POOL_OPTIONS)
+
+def _async_engine(url: str):
+    # aiosqlite manages its own connections, so pool sizing only applies elsewhere
+    options = POOL_OPTIONS if not url.startswith("sqlite") else {"pool_pre_ping": True}
+    return create_async_engine(url, **options)
+
+
+# Async engine used by the API routes
+async_engine = _async_engine(ASYNC_DATABASE_URL)
+
+# Read replicas for read-only routes (see get_read_db)
+replica_engines = [
+    _async_engine(to_async_url(url.strip()))
+    for url in settings.database_replica_urls.split(",") if url.strip()
+]
+_replica_cycle = itertools.cycle(range(len(replica_engines)))
+_replica_health: Dict[int, Tuple[float, bool]] = {}
+
+# Where a client carries its read-your-writes pin (a Unix time), so every worker honours it
+READ_PRIMARY_COOKIE = "read_primary_until"
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces foreign keys (and runs ON DELETE CASCADE) when asked, per connection
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+for _engine in (engine, async_engine, *replica_engines):
+    if _engine.dialect.name == "sqlite":
+        event.listen(getattr(_engine, "sync_engine", _engine), "connect", _enable_sqlite_foreign_keys)
+
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class
 Base = declarative_base()
@@ -32,6 +94,111 @@ def get_db():
         db.close()
 
 
+@event.listens_for(Session, "after_flush")
+def _mark_session_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session):
+    # Committed writes pin the client to the primary until replicas have caught up
+    request = session.info.get("request")
+    if session.info.pop("wrote", False) and request is not None:
+        request.state.read_primary_until = time.time() + settings.read_your_writes_seconds
+
+
+def _wrote_recently(request: Request) -> bool:
+    pin = request.cookies.get(READ_PRIMARY_COOKIE) or request.headers.get(READ_PRIMARY_HEADER)
+    try:
+        until = float(pin)
+    except (TypeError, ValueError):
+        return False
+    now = time.time()
+    # A pin further out than one window was not issued here
+    return now < until <= now + settings.read_your_writes_seconds
+
+
+async def carry_read_primary_pin(request: Request, call_next):
+    """
+    HTTP middleware handing a client that just committed a write its
+    read-your-writes pin, as a cookie and a response header. Browsers send
+    the cookie back by themselves; other clients echo the header.
+    """
+    response = await call_next(request)
+    until = getattr(request.state, "read_primary_until", None)
+    if until is not None:
+        response.headers[READ_PRIMARY_HEADER] = f"{until:.3f}"
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            f"{until:.3f}",
+            max_age=max(1, int(settings.read_your_writes_seconds)),
+            httponly=True,
+            samesite="lax"
+        )
+    return response
+
+
+async def _replica_is_fresh(index: int) -> bool:
+    """Whether a replica is reachable and within the allowed lag (cached briefly)."""
+    now = time.monotonic()
+    checked = _replica_health.get(index)
+    if checked and now - checked[0] < settings.replica_lag_check_interval:
+        return checked[1]
+    
+    try:
+        async with replica_engines[index].connect() as conn:
+            if conn.dialect.name == "postgresql":
+                # The last replayed transaction ages while the primary is idle, so a
+                # replica that has replayed everything it received counts as current
+                lag = await conn.scalar(text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                ))
+            else:
+                await conn.execute(text("SELECT 1"))
+                lag = 0
+        fresh = float(lag) <= settings.replica_max_lag_seconds
+        if not fresh:
+            logger.warning(f"Replica {index} is {float(lag):.1f}s behind; reading from primary")
+    except Exception as e:
+        logger.warning(f"Replica {index} unavailable: {e}")
+        fresh = False
+    
+    _replica_health[index] = (now, fresh)
+    return fresh
+
+
+async def _read_engine(request: Request):
+    """Pick a fresh replica round-robin, or the primary."""
+    if not replica_engines or _wrote_recently(request):
+        return async_engine
+    for _ in range(len(replica_engines)):
+        index = next(_replica_cycle)
+        if await _replica_is_fresh(index):
+            return replica_engines[index]
+    return async_engine
+
+
+async def get_async_db(request: Request):
+    """Dependency for getting an async database session on the primary."""
+    async with AsyncSessionLocal() as db:
+        db.info["request"] = request
+        yield db
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency for read-only routes: a session on a replica when one is fresh.
+    
+    Falls back to the primary when no replica is configured or healthy, and
+    for clients carrying the pin they were given when they last committed a
+    write (see carry_read_primary_pin).
+    """
+    async with AsyncSessionLocal(bind=await _read_engine(request)) as db:
+        db.info["request"] = request
+        yield db
+
+
 def init_db():
     """Initialize database tables."""
     from backend.database.models import Base
@@ -0,0 +1,68 @@
+"""
+JSON column type and field accessors shared by models, migrations and queries.
+"""
+import re
+from sqlalchemy import JSON, Float, Integer, String, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+# JSONB on PostgreSQL so documents can be indexed; plain JSON (text) elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+FIELD_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class _json_field(FunctionElement):
+    """
+    A top-level key of a JSON document.
+    
+    The key is rendered inline rather than as a bound parameter, so filters
+    produce exactly the expression the matching expression index was built on.
+    """
+    inherit_cache = True
+    sql_cast = None
+
+    def __init__(self, column, key: str):
+        if not FIELD_KEY_PATTERN.match(key):
+            raise ValueError(f"Unsupported JSON key: {key!r}")
+        super().__init__(column, literal_column(f"'{key}'"))
+
+
+class json_text(_json_field):
+    type = String()
+    inherit_cache = True
+
+
+class json_float(_json_field):
+    type = Float()
+    sql_cast = {"postgresql": "DOUBLE PRECISION", "default": "REAL"}
+    inherit_cache = True
+
+
+class json_int(_json_field):
+    type = Integer()
+    sql_cast = {"postgresql": "INTEGER", "default": "INTEGER"}
+    inherit_cache = True
+
+
+def _cast(element, expression: str, dialect: str) -> str:
+    if element.sql_cast is None:
+        return f"({expression})"
+    return f"(CAST({expression} AS {element.sql_cast.get(dialect, element.sql_cast['default'])}))"
+
+
+def _compile_postgresql(element, compiler, **kw):
+    column, key = element.clauses
+    return _cast(element, f"{compiler.process(column, **kw)} ->> {compiler.process(key, **kw)}", "postgresql")
+
+
+def _compile_default(element, compiler, **kw):
+    column, key = element.clauses
+    path = "'$." + key.name.strip("'") + "'"
+    return _cast(element, f"json_extract({compiler.process(column, **kw)}, {path})", "default")
+
+
+for _field_type in (json_text, json_float, json_int):
+    compiles(_field_type, "postgresql")(_compile_postgresql)
+    compiles(_field_type)(_compile_default)
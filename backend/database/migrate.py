@@ -1,100 +1,278 @@
 """
 Database migration utilities for handling schema updates
+
+Schema changes are Alembic revisions in backend/database/migrations; data
+backfills that follow them live here.
 """
-from sqlalchemy import text
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import delete, insert, inspect, select, text
+from sqlalchemy.exc import DBAPIError
 from backend.database.database import engine
-from backend.database.models import Base
+from backend.database.models import Base, BackfillState
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
-def migrate_database():
-    """Run database migrations and create tables if they don't exist"""
+CONTENT_HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+# Arbitrary key for the PostgreSQL advisory lock serialising migrations
+MIGRATION_LOCK_ID = 7_310_442_019
+
+
+def alembic_config() -> Config:
+    """Alembic config that works regardless of the current directory."""
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+
+def database_state(conn) -> Tuple[Optional[str], Optional[str]]:
+    """
+    The database's schema revision and the revision its data backfills last
+    completed at, in one query. (None, None) if it has never been migrated
+    (or predates the backfill marker, which makes it due for an upgrade anyway).
+    """
     try:
-        # Create all tables (this is safe - won't overwrite existing tables)
-        Base.metadata.create_all(bind=engine)
-        
-        # Add new columns if they don't exist
-        with engine.connect() as conn:
-            # Check if reset_token_hash column exists
-            result = conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name='users' AND column_name='reset_token_hash'
-            """))
-            
-            if not result.fetchone():
-                logger.info("Adding reset_token_hash column to users table")
-                conn.execute(text("ALTER TABLE users ADD COLUMN reset_token_hash VARCHAR"))
+        return tuple(conn.execute(text(
+            "SELECT version_num, (SELECT revision FROM backfill_state) FROM alembic_version"
+        )).one())
+    except DBAPIError:
+        conn.rollback()
+        return None, None
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+@contextmanager
+def migration_connection():
+    """
+    A connection inside a transaction for running migrations. SQLite's foreign
+    key enforcement is off meanwhile: batch mode alters a table by copying and
+    dropping it, and the drop would otherwise cascade into its child tables.
+    """
+    with engine.connect() as conn:
+        is_sqlite = conn.dialect.name == "sqlite"
+        if is_sqlite:
+            # The pragma is ignored inside a transaction
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            conn.commit()
+        try:
+            with conn.begin():
+                yield conn
+        finally:
+            if is_sqlite:
+                conn.exec_driver_sql("PRAGMA foreign_keys=ON")
                 conn.commit()
+
+
+def migrate_database() -> bool:
+    """
+    Upgrade the schema to the latest revision.
+    
+    An up-to-date database costs a single version query. Otherwise the upgrade
+    runs in one transaction holding an advisory lock on PostgreSQL, so workers
+    booting together wait for the first one instead of racing on DDL; the
+    waiters then find nothing left to do. Returns True if run_backfills() has
+    work to do, i.e. the schema was migrated since the backfills last completed.
+    """
+    config = alembic_config()
+    head = head_revision()
+    
+    with engine.connect() as conn:
+        revision, backfilled = database_state(conn)
+        if revision == head:
+            return backfilled != head
+    
+    with migration_connection() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_ID})
+        # Checks for the version table first, so a missing one doesn't abort the transaction
+        before = MigrationContext.configure(conn).get_current_revision()
+        if before == head:
+            # Another worker just migrated; run_backfills() finds out under the lock whether it is done
+            return True
+        config.attributes["connection"] = conn
+        if before is None and not inspect(conn).get_table_names():
+            # Empty database: create the current schema outright and mark it as head; there is nothing to backfill
+            logger.info(f"Creating database schema at {head}")
+            Base.metadata.create_all(conn)
+            command.stamp(config, "head")
+            conn.execute(insert(BackfillState).values(revision=head))
+            return False
+        logger.info(f"Migrating database schema from {before or 'unversioned'} to {head}")
+        command.upgrade(config, "head")
+    return True
+
+
+def backfill_photos(batch_size: int = 500) -> int:
+    """
+    Move legacy Room.photo_urls JSON arrays into the photos table.
+    
+    Works in small committed batches and clears each room's legacy columns as
+    it goes, so it is idempotent and safe to run while the app is serving.
+    Returns the number of photo rows created.
+    """
+    from sqlalchemy import null
+    from sqlalchemy.orm import Session
+    from backend.database.models import Room, Photo, Inspection
+    
+    # Photos of already analyzed inspections were part of that analysis
+    analysis_status = {"completed": "analyzed", "failed": "failed"}
+    total = 0
+    while True:
+        with Session(engine) as session:
+            rooms = session.query(Room).filter(
+                Room.legacy_photo_urls.isnot(None)
+            ).order_by(Room.id).limit(batch_size).with_for_update(skip_locked=True).all()
             
-            # Check if reset_token_expires column exists
-            result = conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name='users' AND column_name='reset_token_expires'
-            """))
+            if not rooms:
+                break
             
-            if not result.fetchone():
-                logger.info("Adding reset_token_expires column to users table")
-                conn.execute(text("ALTER TABLE users ADD COLUMN reset_token_expires TIMESTAMP"))
-                conn.commit()
+            inspections = {
+                row.id: row for row in session.query(Inspection.id, Inspection.status, Inspection.created_at).filter(
+                    Inspection.id.in_({room.inspection_id for room in rooms})
+                )
+            }
+            rows = []
+            for room in rooms:
+                quality = room.legacy_photo_quality or {}
+                features = room.legacy_photo_features or {}
+                inspection = inspections.get(room.inspection_id)
+                # Date the photos by their room, not by when this backfill ran
+                created_at = room.created_at or (inspection.created_at if inspection else None) or datetime.utcnow()
+                status = analysis_status.get(inspection.status if inspection else None, "pending")
+                for url in room.legacy_photo_urls or []:
+                    scores = quality.get(url) or {}
+                    stem = url.rsplit("/", 1)[-1].split(".", 1)[0]
+                    rows.append({
+                        "room_id": room.id,
+                        "inspection_id": room.inspection_id,
+                        "url": url,
+                        "content_hash": stem if CONTENT_HASH_PATTERN.match(stem) else None,
+                        "width": scores.get("width"),
+                        "height": scores.get("height"),
+                        "perceptual_hash": scores.get("perceptual_hash"),
+                        "quality_passed": scores.get("passed"),
+                        "blur_score": scores.get("blur_score"),
+                        "brightness": scores.get("brightness"),
+                        # SQL NULL, as for photos uploaded without scores, rather than JSON null
+                        "quality": scores or null(),
+                        "features": features.get(url) or null(),
+                        "analysis_status": status,
+                        "created_at": created_at,
+                    })
+                
+                # SQL NULL (not JSON null) marks the room as migrated
+                room.legacy_photo_urls = null()
+                room.legacy_photo_quality = null()
+                room.legacy_photo_features = null()
+            
+            if rows:
+                session.execute(insert(Photo), rows)
+            session.commit()
+            total += len(rows)
+    
+    if total:
+        logger.info(f"Backfilled {total} photos into the photos table")
+    return total
+
+
+def backfill_issues(batch_size: int = 200) -> int:
+    """
+    Copy issues from completed inspections' issues_detected JSON into the issues table.
+    
+    Only inspections without any issue rows are touched, so it is idempotent.
+    Returns the number of issue rows created.
+    """
+    from sqlalchemy.orm import Session
+    from backend.database.models import Inspection, Issue
+    from backend.services.issue_service import IssueService
+    
+    total = 0
+    last_id = 0
+    while True:
+        with Session(engine) as session:
+            inspections = session.query(Inspection).filter(
+                Inspection.id > last_id,
+                Inspection.issues_detected.isnot(None),
+                ~session.query(Issue.id).filter(Issue.inspection_id == Inspection.id).exists()
+            ).order_by(Inspection.id).limit(batch_size).all()
             
-            # Add new property columns
-            property_columns = [
-                ('bedrooms', 'INTEGER'),
-                ('bathrooms', 'INTEGER'), 
-                ('lot_size', 'FLOAT')
-            ]
+            if not inspections:
+                break
             
-            for column_name, column_type in property_columns:
-                result = conn.execute(text(f"""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name='properties' AND column_name='{column_name}'
-                """))
-                
-                if not result.fetchone():
-                    logger.info(f"Adding {column_name} column to properties table")
-                    conn.execute(text(f"ALTER TABLE properties ADD COLUMN {column_name} {column_type}"))
-                    conn.commit()
-                
-        logger.info("Database migration completed successfully")
-        
-    except Exception as e:
-        logger.error(f"Database migration failed: {e}")
-        # For SQLite (development), use different syntax
+            for inspection in inspections:
+                if isinstance(inspection.issues_detected, list):
+                    total += IssueService.replace_inspection_issues(session, inspection, inspection.issues_detected)
+            last_id = inspections[-1].id
+            session.commit()
+    
+    if total:
+        logger.info(f"Backfilled {total} issues into the issues table")
+    return total
+
+
+def run_backfills() -> bool:
+    """
+    Run the data backfills that follow schema migrations, once per revision.
+    
+    Holds the migration advisory lock on PostgreSQL throughout, so workers
+    booting together run them once, and records the revision they completed at
+    in backfill_state; a failed run is retried on the next boot. Returns True
+    if they ran.
+    """
+    from sqlalchemy.orm import Session
+    from backend.services.admin_stats_service import AdminStatsService
+    from backend.services.search_service import SearchService
+    from backend.services.timeline_service import TimelineService
+    
+    head = head_revision()
+    with engine.connect() as lock_conn:
+        is_postgresql = lock_conn.dialect.name == "postgresql"
+        if is_postgresql:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_ID})
         try:
-            with engine.connect() as conn:
-                # User table migrations
-                try:
-                    conn.execute(text("ALTER TABLE users ADD COLUMN reset_token_hash TEXT"))
-                except:
-                    pass  # Column might already exist
-                try:
-                    conn.execute(text("ALTER TABLE users ADD COLUMN reset_token_expires DATETIME"))
-                except:
-                    pass  # Column might already exist
-                
-                # Property table migrations
-                try:
-                    conn.execute(text("ALTER TABLE properties ADD COLUMN bedrooms INTEGER"))
-                except:
-                    pass  # Column might already exist
-                try:
-                    conn.execute(text("ALTER TABLE properties ADD COLUMN bathrooms INTEGER"))
-                except:
-                    pass  # Column might already exist
-                try:
-                    conn.execute(text("ALTER TABLE properties ADD COLUMN lot_size REAL"))
-                except:
-                    pass  # Column might already exist
-                    
-                conn.commit()
-            logger.info("SQLite migration completed")
-        except Exception as sqlite_error:
-            logger.error(f"SQLite migration also failed: {sqlite_error}")
-            # Don't raise - let the app continue even if migration fails
+            previous = lock_conn.execute(select(BackfillState.revision)).scalar()
+            lock_conn.commit()
+            if previous == head:
+                return False
+            
+            photos = backfill_photos()
+            backfill_issues()
+            with Session(engine) as session:
+                SearchService.index_missing(session)
+            with Session(engine) as session:
+                TimelineService.backfill(session)
+            
+            # Backfilled photos are bulk inserts that bypass the rollup listeners, and
+            # databases from before versioned migrations start with empty rollup tables
+            if photos or previous is None:
+                with Session(engine) as session:
+                    AdminStatsService.rebuild(session)
+            
+            lock_conn.execute(delete(BackfillState))
+            lock_conn.execute(insert(BackfillState).values(revision=head))
+            lock_conn.commit()
+            return True
+        finally:
+            lock_conn.rollback()
+            if is_postgresql:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_ID})
+                lock_conn.commit()
+
 
 if __name__ == "__main__":
-    migrate_database()
\ No newline at end of file
+    migrate_database()
+    run_backfills()
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""
+Alembic environment.
+
+The app passes its own connection in config.attributes["connection"] (see
+backend.database.migrate); the `alembic` CLI connects with the app engine.
+"""
+from logging.config import fileConfig
+from alembic import context
+from backend.database.database import DATABASE_URL
+from backend.database.models import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit SQL for the configured database without connecting."""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_with(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite can only alter tables by copying them
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations_with(connection)
+        return
+    
+    if config.config_file_name:
+        fileConfig(config.config_file_name)
+    from backend.database.migrate import migration_connection
+    with migration_connection() as connection:
+        run_migrations_with(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
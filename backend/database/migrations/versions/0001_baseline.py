@@ -0,0 +1,408 @@
+"""Baseline schema
+
+Brings any database created before versioned migrations (create_all plus the
+old ad-hoc ALTER TABLEs) up to the schema as of this revision. Empty databases
+never run it: migrate_database() creates them from the models and stamps head.
+
+The schema is spelled out here rather than taken from the models, which keep
+moving; later revisions likewise use op.* and their own frozen definitions.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import logging
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger(__name__)
+
+ENUM_VALUES = {
+    "userrole": ("OWNER", "TENANT", "MANAGER", "REALTOR", "ADMIN"),
+    "subscriptiontier": ("FREE", "BASIC", "PREMIUM", "ENTERPRISE"),
+    "inspectiontype": ("MOVE_IN", "MOVE_OUT", "ROUTINE", "PRE_SALE", "POST_RENOVATION"),
+}
+
+
+def _enum(name: str) -> sa.Enum:
+    # PostgreSQL types are created once up front: users and subscriptions share subscriptiontier
+    values = ENUM_VALUES[name]
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), "postgresql"
+    )
+
+
+USER_ROLE = _enum("userrole")
+SUBSCRIPTION_TIER = _enum("subscriptiontier")
+INSPECTION_TYPE = _enum("inspectiontype")
+
+# Prefix search in the admin user list; text_pattern_ops lets LIKE 'x%' use them on PostgreSQL
+EXPRESSION_INDEXES = [
+    ("ix_users_email_lower", "users", "lower(email)"),
+    ("ix_users_name_lower", "users", "lower(name)"),
+]
+
+# Columns added to existing tables before migrations were versioned
+LEGACY_COLUMNS = {
+    "users": [
+        ("reset_token_hash", sa.String()),
+        ("reset_token_expires", sa.DateTime()),
+    ],
+    "properties": [
+        ("bedrooms", sa.Integer()),
+        ("bathrooms", sa.Integer()),
+        ("lot_size", sa.Float()),
+    ],
+    "rooms": [
+        ("photo_quality", sa.JSON()),
+        ("photo_features", sa.JSON()),
+    ],
+}
+
+
+def baseline_tables():
+    """
+    Columns and constraints, and (name, columns, unique) indexes, per table in
+    dependency order. Built per call since a Column can only join one table.
+    """
+    return {
+        "daily_stats": (
+            [
+                sa.Column("day", sa.Date(), nullable=False),
+                sa.Column("metric", sa.String(), nullable=False),
+                sa.Column("key", sa.String(), nullable=False),
+                sa.Column("count", sa.BigInteger(), nullable=False),
+                sa.Column("bytes", sa.BigInteger(), nullable=False),
+                sa.PrimaryKeyConstraint("day", "metric", "key"),
+            ],
+            [],
+        ),
+        "users": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("email", sa.String(), nullable=False),
+                sa.Column("hashed_password", sa.String(), nullable=False),
+                sa.Column("name", sa.String(), nullable=False),
+                sa.Column("role", USER_ROLE, nullable=True),
+                sa.Column("subscription_tier", SUBSCRIPTION_TIER, nullable=True),
+                sa.Column("is_active", sa.Boolean(), nullable=True),
+                sa.Column("reset_token_hash", sa.String(), nullable=True),
+                sa.Column("reset_token_expires", sa.DateTime(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.Column("updated_at", sa.DateTime(), nullable=True),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_users_created_at_id", ["created_at", "id"], False),
+                ("ix_users_email", ["email"], True),
+                ("ix_users_id", ["id"], False),
+            ],
+        ),
+        "payments": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("user_id", sa.Integer(), nullable=False),
+                sa.Column("amount", sa.Float(), nullable=False),
+                sa.Column("currency", sa.String(), nullable=True),
+                sa.Column("payment_type", sa.String(), nullable=True),
+                sa.Column("stripe_payment_intent_id", sa.String(), nullable=True),
+                sa.Column("stripe_charge_id", sa.String(), nullable=True),
+                sa.Column("status", sa.String(), nullable=True),
+                sa.Column("description", sa.Text(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_payments_id", ["id"], False),
+            ],
+        ),
+        "properties": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("owner_id", sa.Integer(), nullable=False),
+                sa.Column("address_line1", sa.String(), nullable=False),
+                sa.Column("address_line2", sa.String(), nullable=True),
+                sa.Column("city", sa.String(), nullable=False),
+                sa.Column("state", sa.String(), nullable=False),
+                sa.Column("postal_code", sa.String(), nullable=False),
+                sa.Column("country", sa.String(), nullable=True),
+                sa.Column("unit_number", sa.String(), nullable=True),
+                sa.Column("property_type", sa.String(), nullable=True),
+                sa.Column("bedrooms", sa.Integer(), nullable=True),
+                sa.Column("bathrooms", sa.Integer(), nullable=True),
+                sa.Column("square_feet", sa.Float(), nullable=True),
+                sa.Column("year_built", sa.Integer(), nullable=True),
+                sa.Column("lot_size", sa.Float(), nullable=True),
+                sa.Column("num_rooms", sa.Integer(), nullable=True),
+                sa.Column("notes", sa.Text(), nullable=True),
+                sa.Column("is_active", sa.Boolean(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.Column("updated_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_properties_id", ["id"], False),
+                ("ix_properties_owner_created_at_id", ["owner_id", "created_at", "id"], False),
+            ],
+        ),
+        "room_classifier_samples": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("user_id", sa.Integer(), nullable=False),
+                sa.Column("room_type", sa.String(), nullable=False),
+                sa.Column("features", sa.JSON(), nullable=False),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_room_classifier_samples_id", ["id"], False),
+                ("ix_room_classifier_samples_user_id", ["user_id"], False),
+            ],
+        ),
+        "subscriptions": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("user_id", sa.Integer(), nullable=False),
+                sa.Column("tier", SUBSCRIPTION_TIER, nullable=False),
+                sa.Column("status", sa.String(), nullable=True),
+                sa.Column("stripe_customer_id", sa.String(), nullable=True),
+                sa.Column("stripe_subscription_id", sa.String(), nullable=True),
+                sa.Column("current_period_start", sa.DateTime(), nullable=True),
+                sa.Column("current_period_end", sa.DateTime(), nullable=True),
+                sa.Column("inspections_used", sa.Integer(), nullable=True),
+                sa.Column("inspections_limit", sa.Integer(), nullable=True),
+                sa.Column("properties_limit", sa.Integer(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.Column("updated_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_subscriptions_id", ["id"], False),
+            ],
+        ),
+        "teams": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("name", sa.String(), nullable=False),
+                sa.Column("owner_id", sa.Integer(), nullable=False),
+                sa.Column("max_members", sa.Integer(), nullable=True),
+                sa.Column("is_active", sa.Boolean(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.Column("updated_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_teams_id", ["id"], False),
+            ],
+        ),
+        "user_stats": (
+            [
+                sa.Column("user_id", sa.Integer(), nullable=False),
+                sa.Column("property_count", sa.BigInteger(), nullable=False),
+                sa.Column("inspection_count", sa.BigInteger(), nullable=False),
+                sa.Column("photo_count", sa.BigInteger(), nullable=False),
+                sa.Column("storage_bytes", sa.BigInteger(), nullable=False),
+                sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+                sa.PrimaryKeyConstraint("user_id"),
+            ],
+            [],
+        ),
+        "inspections": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("property_id", sa.Integer(), nullable=False),
+                sa.Column("inspector_id", sa.Integer(), nullable=False),
+                sa.Column("inspection_type", INSPECTION_TYPE, nullable=False),
+                sa.Column("inspection_date", sa.DateTime(), nullable=True),
+                sa.Column("report_markdown", sa.Text(), nullable=True),
+                sa.Column("report_pdf_url", sa.String(), nullable=True),
+                sa.Column("report_summary", sa.JSON(), nullable=True),
+                sa.Column("issues_detected", sa.JSON(), nullable=True),
+                sa.Column("summary_stats", sa.JSON(), nullable=True),
+                sa.Column("hash_on_chain", sa.String(), nullable=True),
+                sa.Column("chain_tx_id", sa.String(), nullable=True),
+                sa.Column("status", sa.String(), nullable=True),
+                sa.Column("is_public", sa.Boolean(), nullable=True),
+                sa.Column("public_share_token", sa.String(), nullable=True),
+                sa.Column("notes", sa.Text(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.Column("updated_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["inspector_id"], ["users.id"]),
+                sa.ForeignKeyConstraint(["property_id"], ["properties.id"]),
+                sa.PrimaryKeyConstraint("id"),
+                sa.UniqueConstraint("public_share_token"),
+            ],
+            [
+                ("ix_inspections_id", ["id"], False),
+                ("ix_inspections_inspector_created_at_id", ["inspector_id", "created_at", "id"], False),
+                ("ix_inspections_property_id", ["property_id"], False),
+            ],
+        ),
+        "team_members": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("team_id", sa.Integer(), nullable=False),
+                sa.Column("user_id", sa.Integer(), nullable=False),
+                sa.Column("role", sa.String(), nullable=True),
+                sa.Column("can_create_inspections", sa.Boolean(), nullable=True),
+                sa.Column("can_edit_properties", sa.Boolean(), nullable=True),
+                sa.Column("can_manage_team", sa.Boolean(), nullable=True),
+                sa.Column("joined_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["team_id"], ["teams.id"]),
+                sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_team_members_id", ["id"], False),
+            ],
+        ),
+        "rooms": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("inspection_id", sa.Integer(), nullable=False),
+                sa.Column("room_type", sa.String(), nullable=False),
+                sa.Column("room_name", sa.String(), nullable=True),
+                sa.Column("order_index", sa.Integer(), nullable=True),
+                sa.Column("photo_urls", sa.JSON(), nullable=True),
+                sa.Column("photo_quality", sa.JSON(), nullable=True),
+                sa.Column("photo_features", sa.JSON(), nullable=True),
+                sa.Column("issues", sa.JSON(), nullable=True),
+                sa.Column("notes", sa.Text(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["inspection_id"], ["inspections.id"]),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_rooms_id", ["id"], False),
+            ],
+        ),
+        "issues": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("inspection_id", sa.Integer(), nullable=False),
+                sa.Column("property_id", sa.Integer(), nullable=False),
+                sa.Column("room_id", sa.Integer(), nullable=True),
+                sa.Column("issue_type", sa.String(), nullable=False),
+                sa.Column("category", sa.String(), nullable=True),
+                sa.Column("description", sa.Text(), nullable=False),
+                sa.Column("severity", sa.String(), nullable=False),
+                sa.Column("confidence", sa.Float(), nullable=True),
+                sa.Column("potential_code_violation", sa.Boolean(), nullable=True),
+                sa.Column("room_name", sa.String(), nullable=True),
+                sa.Column("photo_url", sa.String(), nullable=True),
+                sa.Column("bounding_box", sa.JSON(), nullable=True),
+                sa.Column("recommended_action", sa.Text(), nullable=True),
+                sa.Column("recommended_trade", sa.String(), nullable=True),
+                sa.Column("diy_possible", sa.Boolean(), nullable=True),
+                sa.Column("estimated_cost_low", sa.Float(), nullable=True),
+                sa.Column("estimated_cost_high", sa.Float(), nullable=True),
+                sa.Column("estimated_time_hours", sa.Float(), nullable=True),
+                sa.Column("materials_list", sa.JSON(), nullable=True),
+                sa.Column("safety_warnings", sa.Text(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["inspection_id"], ["inspections.id"], ondelete="CASCADE"),
+                sa.ForeignKeyConstraint(["property_id"], ["properties.id"], ondelete="CASCADE"),
+                sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="SET NULL"),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_issues_id", ["id"], False),
+                ("ix_issues_inspection_id", ["inspection_id"], False),
+                ("ix_issues_property_category", ["property_id", "category"], False),
+                ("ix_issues_property_severity", ["property_id", "severity"], False),
+                ("ix_issues_property_trade", ["property_id", "recommended_trade"], False),
+            ],
+        ),
+        "photos": (
+            [
+                sa.Column("id", sa.Integer(), nullable=False),
+                sa.Column("room_id", sa.Integer(), nullable=False),
+                sa.Column("inspection_id", sa.Integer(), nullable=False),
+                sa.Column("url", sa.String(), nullable=False),
+                sa.Column("content_hash", sa.String(), nullable=True),
+                sa.Column("file_size", sa.BigInteger(), nullable=True),
+                sa.Column("width", sa.Integer(), nullable=True),
+                sa.Column("height", sa.Integer(), nullable=True),
+                sa.Column("format", sa.String(), nullable=True),
+                sa.Column("perceptual_hash", sa.String(), nullable=True),
+                sa.Column("taken_at", sa.DateTime(), nullable=True),
+                sa.Column("quality_passed", sa.Boolean(), nullable=True),
+                sa.Column("blur_score", sa.Float(), nullable=True),
+                sa.Column("brightness", sa.Float(), nullable=True),
+                sa.Column("quality", sa.JSON(), nullable=True),
+                sa.Column("features", sa.JSON(), nullable=True),
+                sa.Column("analysis_status", sa.String(), nullable=True),
+                sa.Column("created_at", sa.DateTime(), nullable=True),
+                sa.ForeignKeyConstraint(["inspection_id"], ["inspections.id"], ondelete="CASCADE"),
+                sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+                sa.PrimaryKeyConstraint("id"),
+            ],
+            [
+                ("ix_photos_content_hash", ["content_hash"], False),
+                ("ix_photos_id", ["id"], False),
+                ("ix_photos_inspection_room", ["inspection_id", "room_id"], False),
+                ("ix_photos_perceptual_hash", ["perceptual_hash"], False),
+                ("ix_photos_room_id", ["room_id"], False),
+            ],
+        ),
+    }
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for name, values in ENUM_VALUES.items():
+            postgresql.ENUM(*values, name=name).create(bind, checkfirst=True)
+    
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    tables = baseline_tables()
+    for table_name, (elements, _) in tables.items():
+        if table_name not in existing:
+            op.create_table(table_name, *elements)
+    
+    for table_name, columns in LEGACY_COLUMNS.items():
+        present = {column["name"] for column in inspector.get_columns(table_name)}
+        for name, type_ in columns:
+            if name not in present:
+                logger.info(f"Adding {name} column to {table_name} table")
+                op.add_column(table_name, sa.Column(name, type_, nullable=True))
+    
+    # The original issues table was never written to; recreate it with its keys
+    if "issues" in existing:
+        issue_columns = {column["name"] for column in inspector.get_columns("issues")}
+        if "inspection_id" not in issue_columns:
+            if bind.execute(sa.text("SELECT COUNT(*) FROM issues")).scalar():
+                logger.warning("issues table has rows in the old layout; leaving it untouched")
+                del tables["issues"]
+            else:
+                logger.info("Recreating issues table with inspection/property columns")
+                op.drop_table("issues")
+                op.create_table("issues", *baseline_tables()["issues"][0])
+    
+    # Indexes declared on the models after their tables were first created
+    for table_name, (_, indexes) in tables.items():
+        for name, columns, unique in indexes:
+            op.create_index(name, table_name, columns, unique=unique, if_not_exists=True)
+    pattern_ops = " text_pattern_ops" if bind.dialect.name == "postgresql" else ""
+    for name, table_name, expression in EXPRESSION_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({expression}{pattern_ops})")
+
+
+def downgrade():
+    for table_name in reversed(list(baseline_tables())):
+        op.drop_table(table_name)
+    if op.get_bind().dialect.name == "postgresql":
+        for name in ENUM_VALUES:
+            op.execute(f"DROP TYPE IF EXISTS {name}")
@@ -0,0 +1,22 @@
+"""Add users.token_version for revoking issued tokens
+
+Revision ID: 0002_user_token_version
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_user_token_version"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("users", sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("token_version")
@@ -0,0 +1,100 @@
+"""Store inspection and room JSON as JSONB and index the filtered summary fields
+
+Revision ID: 0003_jsonb_summary_indexes
+Revises: 0002_user_token_version
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_jsonb_summary_indexes"
+down_revision = "0002_user_token_version"
+branch_labels = None
+depends_on = None
+
+JSONB_COLUMNS = [
+    ("inspections", "report_summary"),
+    ("inspections", "issues_detected"),
+    ("inspections", "summary_stats"),
+    ("rooms", "issues"),
+]
+
+# Values the new casts would choke on are dropped; the app coerces them on write from now on
+NUMERIC_FIELDS = [
+    ("summary_stats", "summary_cost_high", "jsonb_typeof({value}) NOT IN ('number', 'null')"),
+    ("summary_stats", "summary_cost_low", "jsonb_typeof({value}) NOT IN ('number', 'null')"),
+    ("report_summary", "code_violations_found", "jsonb_typeof({value}) <> 'null' AND {value} #>> '{{}}' !~ '^-?[0-9]+$'"),
+]
+
+# Index name -> (column, field, cast) of the indexed expression. The SQL is written out here, as
+# backend.database.json_types rendered it at this revision, so later changes there can't alter it;
+# queries must still render exactly these expressions for the indexes to be used
+SUMMARY_INDEXES = [
+    ("ix_inspections_inspector_severity", "summary_stats", "summary_severity", None),
+    ("ix_inspections_inspector_cost_high", "summary_stats", "summary_cost_high", {"postgresql": "DOUBLE PRECISION", "default": "REAL"}),
+    ("ix_inspections_inspector_code_violations", "report_summary", "code_violations_found", {"postgresql": "INTEGER", "default": "INTEGER"}),
+]
+
+
+def _json_field(dialect: str, column: str, field: str, cast) -> str:
+    if dialect == "postgresql":
+        expression = f"{column} ->> '{field}'"
+    else:
+        expression = f"json_extract({column}, '$.{field}')"
+    if cast is None:
+        return f"({expression})"
+    return f"(CAST({expression} AS {cast.get(dialect, cast['default'])}))"
+
+
+def upgrade():
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    
+    if is_postgresql:
+        for table, column in JSONB_COLUMNS:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb")
+        for column, field, invalid in NUMERIC_FIELDS:
+            value = f"({column} -> '{field}')"
+            op.execute(f"UPDATE inspections SET {column} = {column} - '{field}' WHERE {invalid.format(value=value)}")
+    
+    # Severity filters compare lower-case values
+    if is_postgresql:
+        op.execute(
+            "UPDATE inspections SET summary_stats = jsonb_set(summary_stats, '{summary_severity}', "
+            "to_jsonb(lower(summary_stats ->> 'summary_severity'))) "
+            "WHERE jsonb_typeof(summary_stats -> 'summary_severity') = 'string'"
+        )
+    else:
+        op.execute(
+            "UPDATE inspections SET summary_stats = json_set(summary_stats, '$.summary_severity', "
+            "lower(json_extract(summary_stats, '$.summary_severity'))) "
+            "WHERE json_type(summary_stats, '$.summary_severity') = 'text'"
+        )
+    
+    dialect = op.get_bind().dialect.name
+    for name, column, field, cast in SUMMARY_INDEXES:
+        op.create_index(name, "inspections", ["inspector_id", sa.text(_json_field(dialect, column, field, cast))])
+    
+    if is_postgresql:
+        op.create_index(
+            "ix_inspections_issues_detected", "inspections", ["issues_detected"],
+            postgresql_using="gin", postgresql_ops={"issues_detected": "jsonb_path_ops"}
+        )
+        op.create_index(
+            "ix_rooms_issues", "rooms", ["issues"],
+            postgresql_using="gin", postgresql_ops={"issues": "jsonb_path_ops"}
+        )
+
+
+def downgrade():
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    
+    if is_postgresql:
+        op.drop_index("ix_rooms_issues", table_name="rooms")
+        op.drop_index("ix_inspections_issues_detected", table_name="inspections")
+    op.drop_index("ix_inspections_inspector_code_violations", table_name="inspections")
+    op.drop_index("ix_inspections_inspector_cost_high", table_name="inspections")
+    op.drop_index("ix_inspections_inspector_severity", table_name="inspections")
+    
+    if is_postgresql:
+        for table, column in JSONB_COLUMNS:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSON USING {column}::json")
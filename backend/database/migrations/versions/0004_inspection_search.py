@@ -0,0 +1,70 @@
+"""Full-text search table for inspections
+
+Revision ID: 0004_inspection_search
+Revises: 0003_jsonb_summary_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_inspection_search"
+down_revision = "0003_jsonb_summary_indexes"
+branch_labels = None
+depends_on = None
+
+# tsvector column and GIN index, or the FTS5 table and its sync triggers, as of this revision
+INSPECTION_SEARCH_DDL = {
+    "postgresql": [
+        """ALTER TABLE inspection_search ADD COLUMN document tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(address, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(notes, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(issues, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(report, '')), 'D')
+        ) STORED""",
+        "CREATE INDEX ix_inspection_search_document ON inspection_search USING gin (document)",
+    ],
+    "sqlite": [
+        """CREATE VIRTUAL TABLE inspection_search_fts USING fts5(
+            address, notes, issues, report,
+            content='inspection_search', content_rowid='inspection_id', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER inspection_search_ai AFTER INSERT ON inspection_search BEGIN
+            INSERT INTO inspection_search_fts(rowid, address, notes, issues, report)
+            VALUES (new.inspection_id, new.address, new.notes, new.issues, new.report);
+        END""",
+        """CREATE TRIGGER inspection_search_ad AFTER DELETE ON inspection_search BEGIN
+            INSERT INTO inspection_search_fts(inspection_search_fts, rowid, address, notes, issues, report)
+            VALUES ('delete', old.inspection_id, old.address, old.notes, old.issues, old.report);
+        END""",
+        """CREATE TRIGGER inspection_search_au AFTER UPDATE ON inspection_search BEGIN
+            INSERT INTO inspection_search_fts(inspection_search_fts, rowid, address, notes, issues, report)
+            VALUES ('delete', old.inspection_id, old.address, old.notes, old.issues, old.report);
+            INSERT INTO inspection_search_fts(rowid, address, notes, issues, report)
+            VALUES (new.inspection_id, new.address, new.notes, new.issues, new.report);
+        END""",
+    ],
+}
+
+
+def upgrade():
+    op.create_table(
+        "inspection_search",
+        sa.Column("inspection_id", sa.Integer(), sa.ForeignKey("inspections.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("inspector_id", sa.Integer(), nullable=False),
+        sa.Column("address", sa.Text()),
+        sa.Column("notes", sa.Text()),
+        sa.Column("issues", sa.Text()),
+        sa.Column("report", sa.Text()),
+    )
+    op.create_index("ix_inspection_search_inspector_id", "inspection_search", ["inspector_id"])
+    for statement in INSPECTION_SEARCH_DDL.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+    # Rows are filled by the search backfill after startup
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("inspection_search_ai", "inspection_search_ad", "inspection_search_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS inspection_search_fts")
+    op.drop_table("inspection_search")
@@ -0,0 +1,31 @@
+"""Precomputed property condition series
+
+Revision ID: 0005_property_condition_series
+Revises: 0004_inspection_search
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005_property_condition_series"
+down_revision = "0004_inspection_search"
+branch_labels = None
+depends_on = None
+
+# JSONB on PostgreSQL, plain JSON elsewhere
+JSON_DOCUMENT = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade():
+    op.create_table(
+        "property_condition_series",
+        sa.Column("property_id", sa.Integer(), sa.ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("points", JSON_DOCUMENT, nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    # Series are filled by the timeline backfill after startup
+
+
+def downgrade():
+    op.drop_table("property_condition_series")
@@ -0,0 +1,26 @@
+"""Record the revision the data backfills last completed at
+
+Revision ID: 0006_backfill_state
+Revises: 0005_property_condition_series
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_backfill_state"
+down_revision = "0005_property_condition_series"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "backfill_state",
+        sa.Column("revision", sa.String(), primary_key=True),
+        sa.Column("completed_at", sa.DateTime()),
+    )
+    # Left empty: the backfills run once after this upgrade and record it
+
+
+def downgrade():
+    op.drop_table("backfill_state")
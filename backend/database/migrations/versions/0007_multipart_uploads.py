@@ -0,0 +1,29 @@
+"""Record who started each direct multipart upload
+
+Revision ID: 0007_multipart_uploads
+Revises: 0006_backfill_state
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_multipart_uploads"
+down_revision = "0006_backfill_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "multipart_uploads",
+        sa.Column("upload_id", sa.String(), primary_key=True),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_multipart_uploads_user_id", "multipart_uploads", ["user_id"])
+
+
+def downgrade():
+    op.drop_table("multipart_uploads")
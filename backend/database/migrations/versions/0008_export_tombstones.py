@@ -0,0 +1,33 @@
+"""Record deleted rows for incremental exports
+
+Revision ID: 0008_export_tombstones
+Revises: 0007_multipart_uploads
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_export_tombstones"
+down_revision = "0007_multipart_uploads"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "export_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("dataset", sa.String(), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_export_tombstones_dataset_owner_deleted_at",
+        "export_tombstones",
+        ["dataset", "owner_id", "deleted_at"]
+    )
+
+
+def downgrade():
+    op.drop_table("export_tombstones")
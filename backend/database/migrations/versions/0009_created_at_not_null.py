@@ -0,0 +1,31 @@
+"""Make created_at NOT NULL on the keyset-paginated tables
+
+Revision ID: 0009_created_at_not_null
+Revises: 0008_export_tombstones
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_created_at_not_null"
+down_revision = "0008_export_tombstones"
+branch_labels = None
+depends_on = None
+
+# List pages are keyset-paginated over (created_at, id), which a NULL created_at breaks
+TABLES = ("users", "properties", "inspections")
+
+
+def upgrade():
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+        # SQLite can only change a column by rebuilding the table, which would drop its expression
+        # indexes; there the backfill and the ORM default keep the column filled
+        if op.get_bind().dialect.name != "sqlite":
+            op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        for table in TABLES:
+            op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=True)
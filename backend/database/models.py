@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, JSON, Text, Enum
+from sqlalchemy import event, func, DDL, Column, Integer, BigInteger, String, Date, DateTime, Float, Boolean, ForeignKey, JSON, Text, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 import enum
+from backend.database.json_types import JSONDocument, json_text, json_float, json_int
 
 Base = declarative_base()
 
@@ -32,6 +33,9 @@ class InspectionType(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -42,7 +46,9 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     reset_token_hash = Column(String, nullable=True, default=None)
     reset_token_expires = Column(DateTime, nullable=True, default=None)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped to revoke every token issued so far (password reset, deactivation)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -51,8 +57,24 @@ class User(Base):
     team_memberships = relationship("TeamMember", back_populates="user")
 
 
+# Prefix search in the admin user list; text_pattern_ops lets LIKE 'x%' use them on PostgreSQL
+Index(
+    "ix_users_email_lower",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"}
+)
+Index(
+    "ix_users_name_lower",
+    func.lower(User.name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"}
+)
+
+
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (
+        Index("ix_properties_owner_created_at_id", "owner_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -80,7 +102,7 @@ class Property(Base):
     # Metadata
     notes = Column(Text)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -90,9 +112,12 @@ class Property(Base):
 
 class Inspection(Base):
     __tablename__ = "inspections"
+    __table_args__ = (
+        Index("ix_inspections_inspector_created_at_id", "inspector_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False, index=True)
     inspector_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Inspection details
@@ -102,11 +127,11 @@ class Inspection(Base):
     # Report data
     report_markdown = Column(Text)
     report_pdf_url = Column(String)
-    report_summary = Column(JSON)
+    report_summary = Column(JSONDocument)
     
     # AI analysis results
-    issues_detected = Column(JSON)  # Array of detected issues
-    summary_stats = Column(JSON)  # issue_count, severity, costs
+    issues_detected = Column(JSONDocument)  # Array of detected issues
+    summary_stats = Column(JSONDocument)  # issue_count, severity, costs
     
     # Blockchain/verification
     hash_on_chain = Column(String)
@@ -119,13 +144,66 @@ class Inspection(Base):
     
     # Metadata
     notes = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     property = relationship("Property", back_populates="inspections")
     inspector = relationship("User", back_populates="inspections")
     rooms = relationship("Room", back_populates="inspection", cascade="all, delete-orphan")
+    issue_records = relationship("Issue", cascade="all, delete-orphan", passive_deletes=True)
+
+    @validates("summary_stats", "report_summary")
+    def _normalize_indexed_fields(self, key, value):
+        """Coerce the fields behind expression indexes so the index casts can't fail."""
+        if not isinstance(value, dict):
+            return value
+        value = dict(value)
+        for field, cast in INDEXED_SUMMARY_FIELDS.get(key, {}).items():
+            if field not in value:
+                continue
+            try:
+                value[field] = cast(value[field]) if value[field] is not None else None
+            except (TypeError, ValueError):
+                value[field] = None
+        return value
+
+
+# Summary fields filtered on by inspection searches, and the type each is indexed as
+INDEXED_SUMMARY_FIELDS = {
+    "summary_stats": {
+        "summary_severity": lambda severity: str(severity).lower(),
+        "summary_cost_low": float,
+        "summary_cost_high": float,
+    },
+    "report_summary": {
+        "code_violations_found": int,
+    },
+}
+
+# Per-inspector expression indexes for filtered inspection searches
+Index(
+    "ix_inspections_inspector_severity",
+    Inspection.inspector_id,
+    json_text(Inspection.summary_stats, "summary_severity")
+)
+Index(
+    "ix_inspections_inspector_cost_high",
+    Inspection.inspector_id,
+    json_float(Inspection.summary_stats, "summary_cost_high")
+)
+Index(
+    "ix_inspections_inspector_code_violations",
+    Inspection.inspector_id,
+    json_int(Inspection.report_summary, "code_violations_found")
+)
+# Containment (@>) searches inside the issue arrays; SQLite has no equivalent
+Index(
+    "ix_inspections_issues_detected",
+    Inspection.issues_detected,
+    postgresql_using="gin",
+    postgresql_ops={"issues_detected": "jsonb_path_ops"}
+).ddl_if(dialect="postgresql")
 
 
 class Room(Base):
@@ -139,11 +217,13 @@ class Room(Base):
     room_name = Column(String)  # "Master Bedroom", "Kitchen", etc.
     order_index = Column(Integer)
     
-    # Photos
-    photo_urls = Column(JSON)  # Array of photo URLs
+    # Legacy photo storage, superseded by the photos table (kept for backfill only)
+    legacy_photo_urls = Column("photo_urls", JSON)
+    legacy_photo_quality = Column("photo_quality", JSON)
+    legacy_photo_features = Column("photo_features", JSON)
     
     # AI analysis
-    issues = Column(JSON)  # Array of detected issues for this room
+    issues = Column(JSONDocument)  # Array of detected issues for this room
     
     # Metadata
     notes = Column(Text)
@@ -151,13 +231,74 @@ class Room(Base):
     
     # Relationships
     inspection = relationship("Inspection", back_populates="rooms")
+    photos = relationship("Photo", back_populates="room", order_by="Photo.id", cascade="all, delete-orphan")
+
+    @property
+    def photo_urls(self):
+        return [photo.url for photo in self.photos]
+
+
+Index(
+    "ix_rooms_issues",
+    Room.issues,
+    postgresql_using="gin",
+    postgresql_ops={"issues": "jsonb_path_ops"}
+).ddl_if(dialect="postgresql")
+
+
+class Photo(Base):
+    __tablename__ = "photos"
+    __table_args__ = (
+        Index("ix_photos_inspection_room", "inspection_id", "room_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False, index=True)
+    inspection_id = Column(Integer, ForeignKey("inspections.id", ondelete="CASCADE"), nullable=False)
+    
+    # Storage
+    url = Column(String, nullable=False)
+    content_hash = Column(String, index=True)  # sha256 of the file bytes
+    file_size = Column(BigInteger)
+    
+    # Image details
+    width = Column(Integer)
+    height = Column(Integer)
+    format = Column(String)
+    perceptual_hash = Column(String, index=True)  # 64-bit dHash, hex
+    taken_at = Column(DateTime)
+    
+    # Quality gate
+    quality_passed = Column(Boolean)
+    blur_score = Column(Float)
+    brightness = Column(Float)
+    quality = Column(JSON)  # Full scores and failure reasons
+    
+    # Room classifier feature vector
+    features = Column(JSON)
+    
+    # AI analysis
+    analysis_status = Column(String, default="pending")  # pending, analyzed, skipped, failed
+    
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    room = relationship("Room", back_populates="photos")
 
 
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        Index("ix_issues_property_severity", "property_id", "severity"),
+        Index("ix_issues_property_category", "property_id", "category"),
+        Index("ix_issues_property_trade", "property_id", "recommended_trade"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
+    inspection_id = Column(Integer, ForeignKey("inspections.id", ondelete="CASCADE"), nullable=False, index=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="SET NULL"), nullable=True)
     
     # Issue details
     issue_type = Column(String, nullable=False)
@@ -165,14 +306,17 @@ class Issue(Base):
     description = Column(Text, nullable=False)
     severity = Column(String, nullable=False)  # low, medium, high, critical
     confidence = Column(Float)
+    potential_code_violation = Column(Boolean, default=False)
     
     # Location
+    room_name = Column(String)
     photo_url = Column(String)
     bounding_box = Column(JSON)  # {x, y, w, h}
     
     # Repair info
     recommended_action = Column(Text)
     recommended_trade = Column(String)
+    diy_possible = Column(Boolean)
     estimated_cost_low = Column(Float)
     estimated_cost_high = Column(Float)
     estimated_time_hours = Column(Float)
@@ -183,6 +327,139 @@ class Issue(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class InspectionSearch(Base):
+    """Searchable text of an inspection, kept current by SearchService."""
+    __tablename__ = "inspection_search"
+    
+    inspection_id = Column(Integer, ForeignKey("inspections.id", ondelete="CASCADE"), primary_key=True)
+    inspector_id = Column(Integer, nullable=False, index=True)
+    address = Column(Text)
+    notes = Column(Text)
+    issues = Column(Text)  # Issue descriptions, one per line
+    report = Column(Text)
+
+
+# Full-text indexes over inspection_search: a weighted tsvector with a GIN index on
+# PostgreSQL, an external-content FTS5 table kept in sync by triggers on SQLite
+INSPECTION_SEARCH_DDL = {
+    "postgresql": [
+        """ALTER TABLE inspection_search ADD COLUMN document tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(address, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(notes, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(issues, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(report, '')), 'D')
+        ) STORED""",
+        "CREATE INDEX ix_inspection_search_document ON inspection_search USING gin (document)",
+    ],
+    "sqlite": [
+        """CREATE VIRTUAL TABLE inspection_search_fts USING fts5(
+            address, notes, issues, report,
+            content='inspection_search', content_rowid='inspection_id', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER inspection_search_ai AFTER INSERT ON inspection_search BEGIN
+            INSERT INTO inspection_search_fts(rowid, address, notes, issues, report)
+            VALUES (new.inspection_id, new.address, new.notes, new.issues, new.report);
+        END""",
+        """CREATE TRIGGER inspection_search_ad AFTER DELETE ON inspection_search BEGIN
+            INSERT INTO inspection_search_fts(inspection_search_fts, rowid, address, notes, issues, report)
+            VALUES ('delete', old.inspection_id, old.address, old.notes, old.issues, old.report);
+        END""",
+        """CREATE TRIGGER inspection_search_au AFTER UPDATE ON inspection_search BEGIN
+            INSERT INTO inspection_search_fts(inspection_search_fts, rowid, address, notes, issues, report)
+            VALUES ('delete', old.inspection_id, old.address, old.notes, old.issues, old.report);
+            INSERT INTO inspection_search_fts(rowid, address, notes, issues, report)
+            VALUES (new.inspection_id, new.address, new.notes, new.issues, new.report);
+        END""",
+    ],
+}
+for _dialect, _statements in INSPECTION_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(InspectionSearch.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+
+class PropertyConditionSeries(Base):
+    """
+    Per-inspection condition history of a property, kept current by TimelineService.
+    
+    points holds one compact array per completed inspection, oldest first, in
+    the order of TimelineService.SERIES_FIELDS.
+    """
+    __tablename__ = "property_condition_series"
+    
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    points = Column(JSONDocument, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class RoomClassifierSample(Base):
+    __tablename__ = "room_classifier_samples"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    # Label confirmed by the user and the photo's feature vector
+    room_type = Column(String, nullable=False)
+    features = Column(JSON, nullable=False)
+    
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DailyStat(Base):
+    """Per-day admin counters, e.g. ("inspections.status", "completed")."""
+    __tablename__ = "daily_stats"
+    
+    day = Column(Date, primary_key=True)
+    metric = Column(String, primary_key=True)  # users, properties, properties.type, inspections.status, photos...
+    key = Column(String, primary_key=True, default="")
+    count = Column(BigInteger, nullable=False, default=0)
+    bytes = Column(BigInteger, nullable=False, default=0)
+
+
+class UserStat(Base):
+    """Running per-user totals for the admin user list."""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    property_count = Column(BigInteger, nullable=False, default=0)
+    inspection_count = Column(BigInteger, nullable=False, default=0)
+    photo_count = Column(BigInteger, nullable=False, default=0)
+    storage_bytes = Column(BigInteger, nullable=False, default=0)
+
+
+class MultipartUpload(Base):
+    """A direct multipart upload in progress, so only the user who started it can finish it."""
+    __tablename__ = "multipart_uploads"
+    
+    upload_id = Column(String, primary_key=True)
+    key = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    size = Column(BigInteger, nullable=False)  # declared total; bounds the part numbers and sizes
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ExportTombstone(Base):
+    """A deleted row, so incremental exports can tell consumers to drop it."""
+    __tablename__ = "export_tombstones"
+    __table_args__ = (
+        Index("ix_export_tombstones_dataset_owner_deleted_at", "dataset", "owner_id", "deleted_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    dataset = Column(String, nullable=False)  # issues, inspections, properties
+    row_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class BackfillState(Base):
+    """Schema revision the post-migration data backfills last completed at (a single row)."""
+    __tablename__ = "backfill_state"
+    
+    revision = Column(String, primary_key=True)
+    completed_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Team(Base):
     __tablename__ = "teams"
     
@@ -67,6 +67,7 @@ class SystemMetrics(BaseModel):
     storage_used_mb: float
     uptime_percentage: float
     avg_response_time_ms: int
+    password_hashing: Optional[dict] = None
 
 
 class ActivityLog(BaseModel):
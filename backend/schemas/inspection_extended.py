@@ -2,6 +2,7 @@ from pydantic import BaseModel, field_validator
 from typing import Optional, List, Union
 from datetime import datetime
 from backend.database.models import InspectionType
+from backend.schemas.issue import IssueResponse
 
 
 class RoomCreate(BaseModel):
@@ -18,6 +19,11 @@ class RoomResponse(BaseModel):
     photo_urls: List[str] = []
     issues: List[dict] = []
     
+    @field_validator('photo_urls', 'issues', mode='before')
+    @classmethod
+    def none_as_empty(cls, v):
+        return v if v is not None else []
+    
     class Config:
         from_attributes = True
 
@@ -62,6 +68,17 @@ class InspectionResponse(BaseModel):
         from_attributes = True
 
 
+# Always returned by projected inspection lists: the response's required fields
+INSPECTION_REQUIRED_FIELDS = (
+    "id", "property_id", "inspector_id", "inspection_type", "inspection_date",
+    "status", "is_public", "created_at", "updated_at"
+)
+# ?fields=summary: everything except the report body, issue JSON and rooms
+INSPECTION_SUMMARY_FIELDS = INSPECTION_REQUIRED_FIELDS + (
+    "report_pdf_url", "summary_stats", "public_share_token"
+)
+
+
 class InspectionAnalyzeRequest(BaseModel):
     """Request to analyze an inspection with AI."""
     pass
@@ -71,3 +88,28 @@ class InspectionCompareRequest(BaseModel):
     """Request to compare two inspections."""
     baseline_inspection_id: int
     current_inspection_id: int
+
+
+class IssueComparison(BaseModel):
+    """One issue's fate between the baseline and current inspection."""
+    status: str  # new, worsened, resolved, pre_existing
+    baseline_issue: Optional[IssueResponse] = None
+    current_issue: Optional[IssueResponse] = None
+    match_score: Optional[float] = None
+
+
+class InspectionComparisonSummary(BaseModel):
+    new: int
+    worsened: int
+    resolved: int
+    pre_existing: int
+    chargeable_cost_low: float  # new and worsened issues
+    chargeable_cost_high: float
+
+
+class InspectionCompareResponse(BaseModel):
+    baseline_inspection_id: int
+    current_inspection_id: int
+    property_id: int
+    summary: InspectionComparisonSummary
+    items: List[IssueComparison]
@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List
+
+
+class IssueResponse(BaseModel):
+    id: int
+    inspection_id: int
+    property_id: int
+    room_id: Optional[int] = None
+    issue_type: str
+    category: Optional[str] = None
+    description: str
+    severity: str
+    confidence: Optional[float] = None
+    potential_code_violation: Optional[bool] = None
+    room_name: Optional[str] = None
+    photo_url: Optional[str] = None
+    bounding_box: Optional[dict] = None
+    recommended_action: Optional[str] = None
+    recommended_trade: Optional[str] = None
+    diy_possible: Optional[bool] = None
+    estimated_cost_low: Optional[float] = None
+    estimated_cost_high: Optional[float] = None
+    estimated_time_hours: Optional[float] = None
+    materials_list: Optional[List[str]] = None
+    safety_warnings: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class IssueListResponse(BaseModel):
+    issues: List[IssueResponse]
+    total: int
+    skip: int
+    limit: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 
@@ -75,3 +75,21 @@ class PropertyResponse(PropertyBase):
     
     class Config:
         from_attributes = True
+
+
+class BatchPropertyResult(BaseModel):
+    property: PropertyResponse
+    inspection_id: Optional[int] = None
+    room_count: int = 0
+
+
+class BatchPropertyResponse(BaseModel):
+    created: int
+    results: List[BatchPropertyResult]
+
+
+class PropertyTimelineResponse(BaseModel):
+    """Condition history, one entry per completed inspection in each series (oldest first)."""
+    property_id: int
+    points: int
+    series: Dict[str, List[Any]]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List
+from backend.database.models import InspectionType
+
+
+class SearchResult(BaseModel):
+    inspection_id: int
+    property_id: int
+    address: Optional[str] = None
+    inspection_type: InspectionType
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    rank: float
+    snippet: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    total: int
+    skip: int
+    limit: int
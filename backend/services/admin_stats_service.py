@@ -0,0 +1,405 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Any, Tuple, Optional
+import logging
+from sqlalchemy import event, inspect, insert, update, delete, and_, or_, func, select, literal, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database.models import User, Property, Inspection, Photo, DailyStat, UserStat
+
+logger = logging.getLogger(__name__)
+
+# Photos backfilled without a recorded size count as 2.5MB of storage
+ESTIMATED_PHOTO_BYTES = int(2.5 * 1024 * 1024)
+# Rows whose created_at is NULL are filed under this day so totals stay right
+UNDATED_DAY = date(1970, 1, 1)
+UNKNOWN_KEY = "unknown"
+TRACKED_MODELS = (User, Property, Inspection, Photo)
+# Attribute changes that move a row between the buckets of its creation day
+BUCKETED_ATTRIBUTES = {
+    Property: [("property_type", "properties.type"), ("state", "properties.state")],
+    Inspection: [("status", "inspections.status"), ("inspection_type", "inspections.type")],
+}
+# session.info key for what before_flush resolved for the flush's after_flush
+FLUSH_STATE_KEY = "admin_stats_flush"
+
+
+def _day(value: Optional[datetime]) -> date:
+    if value is None:
+        return UNDATED_DAY
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _enum_value(value: Any) -> str:
+    return getattr(value, "value", value) or UNKNOWN_KEY
+
+
+def _bucket(metric: str, value: Any) -> Optional[str]:
+    # Properties without a state are left out of the per-state counts
+    if metric == "properties.state":
+        return value or None
+    return _enum_value(value)
+
+
+def _moved(obj, name: str) -> Optional[Tuple[Any, Any]]:
+    """(old, new) if the flush changes a loaded attribute, else None."""
+    history = inspect(obj).attrs[name].history
+    if not (history.deleted and history.added):
+        return None
+    return history.deleted[0], history.added[0]
+
+
+class AdminStatsService:
+    """
+    Admin console counters kept in rollup tables.
+    
+    ORM flushes apply deltas to daily_stats and user_stats in the same
+    transaction. Core bulk inserts and query-level deletes bypass the ORM, so
+    rebuild() recomputes everything from the base tables; it runs after
+    startup backfills that bulk-insert photos and from the admin API.
+    """
+
+    @staticmethod
+    def prepare_flush(session: Session) -> None:
+        """
+        Before a flush, while the rows deleted or moved by it still exist:
+        resolve the owners that deleted inspections and photos are counted
+        against, and move the totals of properties that change owner and of
+        inspections that change property between the users concerned.
+        Owners are as of after the flush, so later deltas land on the same user.
+        """
+        session.info.pop(FLUSH_STATE_KEY, None)
+        property_moves: Dict[int, Tuple[int, int]] = {}
+        inspection_moves: Dict[int, int] = {}
+        for obj in session.dirty:
+            if isinstance(obj, Property) and obj.id is not None:
+                moved = _moved(obj, "owner_id")
+                if moved:
+                    property_moves[obj.id] = moved
+            elif isinstance(obj, Inspection) and obj.id is not None:
+                moved = _moved(obj, "property_id")
+                if moved:
+                    inspection_moves[obj.id] = moved[1]
+        
+        property_ids = set(inspection_moves.values())
+        inspection_ids = set()
+        for obj in session.deleted:
+            values = inspect(obj).dict
+            if isinstance(obj, Inspection) and values.get("property_id"):
+                property_ids.add(values["property_id"])
+            elif isinstance(obj, Photo) and values.get("inspection_id"):
+                inspection_ids.add(values["inspection_id"])
+        if not (property_ids or inspection_ids or property_moves or inspection_moves):
+            return
+        
+        with session.no_autoflush:
+            inspection_properties = dict(session.execute(
+                select(Inspection.id, Inspection.property_id).where(Inspection.id.in_(inspection_ids))
+            ).all()) if inspection_ids else {}
+            inspection_properties.update(inspection_moves)
+            property_ids.update(inspection_properties.values())
+            owners = dict(session.execute(
+                select(Property.id, Property.owner_id).where(Property.id.in_(property_ids))
+            ).all()) if property_ids else {}
+            user_deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+            for property_id, (old_owner, new_owner) in property_moves.items():
+                owners[property_id] = new_owner
+                user_deltas[old_owner]["property_count"] -= 1
+                user_deltas[new_owner]["property_count"] += 1
+            
+            # Existing inspections whose owner changes, with their stored photos
+            moving = []
+            if property_moves or inspection_moves:
+                conditions = []
+                if property_moves:
+                    conditions.append(Inspection.property_id.in_(list(property_moves)))
+                if inspection_moves:
+                    conditions.append(Inspection.id.in_(list(inspection_moves)))
+                moving = session.execute(
+                    select(
+                        Inspection.id,
+                        Inspection.property_id,
+                        Property.owner_id,
+                        func.count(Photo.id),
+                        func.sum(func.coalesce(Photo.file_size, ESTIMATED_PHOTO_BYTES))
+                    ).join(Property, Inspection.property_id == Property.id)
+                    .outerjoin(Photo, Photo.inspection_id == Inspection.id)
+                    .where(or_(*conditions))
+                    .group_by(Inspection.id, Inspection.property_id, Property.owner_id)
+                ).all()
+                missing = {inspection_moves.get(id, property_id) for id, property_id, *_ in moving} - set(owners)
+                if missing:
+                    owners.update(session.execute(
+                        select(Property.id, Property.owner_id).where(Property.id.in_(missing))
+                    ).all())
+            for inspection_id, property_id, old_owner, photos, size in moving:
+                new_owner = owners.get(inspection_moves.get(inspection_id, property_id))
+                if new_owner == old_owner:
+                    continue
+                for user_id, sign in ((old_owner, -1), (new_owner, 1)):
+                    if user_id is not None:
+                        user_deltas[user_id]["inspection_count"] += sign
+                        user_deltas[user_id]["photo_count"] += sign * photos
+                        user_deltas[user_id]["storage_bytes"] += sign * int(size or 0)
+        
+        session.info[FLUSH_STATE_KEY] = (
+            owners,
+            {id: owners[property_id] for id, property_id in inspection_properties.items() if property_id in owners},
+            user_deltas,
+        )
+
+    @staticmethod
+    def _collect(session: Session) -> Tuple[Dict[tuple, list], Dict[int, Dict[str, int]], list]:
+        """Turn a flush's new, changed and deleted objects into counter deltas."""
+        property_owners, inspection_owners, moved_totals = session.info.pop(FLUSH_STATE_KEY, ({}, {}, {}))
+        daily: Dict[tuple, list] = defaultdict(lambda: [0, 0])
+        owner_properties: Dict[int, int] = defaultdict(int)
+        property_inspections: Dict[int, int] = defaultdict(int)
+        inspection_photos: Dict[int, list] = defaultdict(lambda: [0, 0])
+        deleted_users = []
+        
+        changes = [(obj, 1) for obj in session.new] + [(obj, -1) for obj in session.deleted]
+        for obj, sign in changes:
+            values = inspect(obj).dict
+            day = _day(values.get("created_at"))
+            
+            if isinstance(obj, User):
+                daily[(day, "users", "")][0] += sign
+                if sign < 0:
+                    deleted_users.append(values.get("id"))
+            elif isinstance(obj, Property):
+                daily[(day, "properties", "")][0] += sign
+                if values.get("owner_id"):
+                    owner_properties[values["owner_id"]] += sign
+            elif isinstance(obj, Inspection):
+                daily[(day, "inspections", "")][0] += sign
+                if values.get("property_id"):
+                    property_inspections[values["property_id"]] += sign
+            elif isinstance(obj, Photo):
+                size = values.get("file_size") or ESTIMATED_PHOTO_BYTES
+                daily[(day, "photos", "")][0] += sign
+                daily[(day, "photos", "")][1] += sign * size
+                if values.get("inspection_id"):
+                    inspection_photos[values["inspection_id"]][0] += sign
+                    inspection_photos[values["inspection_id"]][1] += sign * size
+            for name, metric in BUCKETED_ATTRIBUTES.get(type(obj), []):
+                key = _bucket(metric, values.get(name))
+                if key:
+                    daily[(day, metric, key)][0] += sign
+        
+        # Attribute changes move a row between the buckets of its creation day
+        for obj in session.dirty:
+            attributes = BUCKETED_ATTRIBUTES.get(type(obj))
+            if not attributes:
+                continue
+            day = _day(inspect(obj).dict.get("created_at"))
+            for name, metric in attributes:
+                history = inspect(obj).attrs[name].history
+                for old in history.deleted:
+                    if _bucket(metric, old):
+                        daily[(day, metric, _bucket(metric, old))][0] -= 1
+                for new in history.added:
+                    if _bucket(metric, new):
+                        daily[(day, metric, _bucket(metric, new))][0] += 1
+        
+        # Resolve inspections and photos to the property owner they are counted against;
+        # owners of deleted rows were resolved before the flush removed their parents
+        user_deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for user_id, totals in moved_totals.items():
+            for name, delta in totals.items():
+                user_deltas[user_id][name] += delta
+        for owner_id, delta in owner_properties.items():
+            user_deltas[owner_id]["property_count"] += delta
+        if property_inspections:
+            owners = dict(property_owners)
+            missing = set(property_inspections) - set(owners)
+            if missing:
+                owners.update(session.execute(
+                    select(Property.id, Property.owner_id).where(Property.id.in_(list(missing)))
+                ).all())
+            for property_id, delta in property_inspections.items():
+                if property_id in owners:
+                    user_deltas[owners[property_id]]["inspection_count"] += delta
+        if inspection_photos:
+            owners = dict(inspection_owners)
+            missing = set(inspection_photos) - set(owners)
+            if missing:
+                owners.update(session.execute(
+                    select(Inspection.id, Property.owner_id).join(
+                        Property, Inspection.property_id == Property.id
+                    ).where(Inspection.id.in_(list(missing)))
+                ).all())
+            for inspection_id, (count, size) in inspection_photos.items():
+                if inspection_id in owners:
+                    user_deltas[owners[inspection_id]]["photo_count"] += count
+                    user_deltas[owners[inspection_id]]["storage_bytes"] += size
+        
+        return daily, user_deltas, deleted_users
+
+    @staticmethod
+    def _increment(connection, table, keys: Dict[str, Any], increments: Dict[str, int]) -> None:
+        """Add increments to the row with the given key, creating it if needed."""
+        dialect = connection.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(table).values(**keys, **increments)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={name: table.c[name] + stmt.excluded[name] for name in increments}
+            )
+            connection.execute(stmt)
+            return
+        
+        result = connection.execute(
+            update(table)
+            .where(and_(*(table.c[name] == value for name, value in keys.items())))
+            .values({name: table.c[name] + value for name, value in increments.items()})
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**keys, **increments))
+
+    @staticmethod
+    def apply_flush(session: Session) -> None:
+        """Apply the current flush's deltas to the rollup tables."""
+        daily, user_deltas, deleted_users = AdminStatsService._collect(session)
+        if not (daily or user_deltas or deleted_users):
+            return
+        connection = session.connection()
+        
+        # Rows are upserted in key order so concurrent flushes lock them in the same order
+        # and cannot deadlock on the hot rows (today's counters, active users)
+        for (day, metric, key), (count, size) in sorted(daily.items()):
+            if count or size:
+                AdminStatsService._increment(
+                    connection, DailyStat.__table__,
+                    {"day": day, "metric": metric, "key": key},
+                    {"count": count, "bytes": size}
+                )
+        
+        for user_id, deltas in sorted(user_deltas.items()):
+            deltas = {name: value for name, value in deltas.items() if value}
+            if deltas and user_id not in deleted_users:
+                AdminStatsService._increment(connection, UserStat.__table__, {"user_id": user_id}, deltas)
+        
+        if deleted_users:
+            connection.execute(delete(UserStat).where(UserStat.user_id.in_(deleted_users)))
+
+    @staticmethod
+    def rebuild(db: Session) -> None:
+        """Recompute both rollup tables from the base tables in one transaction."""
+        # Writers queue behind the rebuild instead of adding deltas to rows it is about to replace;
+        # taking the lock first also makes the counts below see everything committed before it
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE daily_stats, user_stats IN EXCLUSIVE MODE"))
+        daily: Dict[tuple, list] = defaultdict(lambda: [0, 0])
+
+        def add_grouped(model, metric, key_column=None, size_column=None):
+            day = func.date(model.created_at)
+            query = db.query(
+                day,
+                key_column if key_column is not None else literal(""),
+                func.count(model.id),
+                func.sum(size_column) if size_column is not None else literal(0)
+            ).group_by(day)
+            if key_column is not None:
+                query = query.group_by(key_column)
+            for row_day, key, count, size in query.all():
+                entry = daily[(_day(row_day), metric, _enum_value(key) if key_column is not None else "")]
+                entry[0] += count
+                entry[1] += int(size or 0)
+        
+        add_grouped(User, "users")
+        add_grouped(Property, "properties")
+        add_grouped(Property, "properties.type", Property.property_type)
+        add_grouped(Inspection, "inspections")
+        add_grouped(Inspection, "inspections.status", Inspection.status)
+        add_grouped(Inspection, "inspections.type", Inspection.inspection_type)
+        add_grouped(Photo, "photos", size_column=func.coalesce(Photo.file_size, ESTIMATED_PHOTO_BYTES))
+        
+        state_day = func.date(Property.created_at)
+        for day, state, count in db.query(state_day, Property.state, func.count(Property.id)).filter(
+            Property.state.isnot(None), Property.state != ""
+        ).group_by(state_day, Property.state).all():
+            daily[(_day(day), "properties.state", state)][0] += count
+        
+        users: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for owner_id, count in db.query(Property.owner_id, func.count(Property.id)).group_by(Property.owner_id):
+            users[owner_id]["property_count"] = count
+        for owner_id, count in db.query(Property.owner_id, func.count(Inspection.id)).join(
+            Inspection, Inspection.property_id == Property.id
+        ).group_by(Property.owner_id):
+            users[owner_id]["inspection_count"] = count
+        for owner_id, count, size in db.query(
+            Property.owner_id,
+            func.count(Photo.id),
+            func.sum(func.coalesce(Photo.file_size, ESTIMATED_PHOTO_BYTES))
+        ).join(Inspection, Photo.inspection_id == Inspection.id).join(
+            Property, Inspection.property_id == Property.id
+        ).group_by(Property.owner_id):
+            users[owner_id]["photo_count"] = count
+            users[owner_id]["storage_bytes"] = int(size or 0)
+        
+        db.execute(delete(DailyStat))
+        db.execute(delete(UserStat))
+        if daily:
+            db.execute(insert(DailyStat), [
+                {"day": day, "metric": metric, "key": key, "count": count, "bytes": size}
+                for (day, metric, key), (count, size) in daily.items()
+            ])
+        if users:
+            db.execute(insert(UserStat), [
+                {
+                    "user_id": user_id,
+                    "property_count": totals["property_count"],
+                    "inspection_count": totals["inspection_count"],
+                    "photo_count": totals["photo_count"],
+                    "storage_bytes": totals["storage_bytes"],
+                }
+                for user_id, totals in users.items()
+            ])
+        db.commit()
+        logger.info(f"Rebuilt admin stats: {len(daily)} daily rows, {len(users)} users")
+
+    @staticmethod
+    async def totals(db: AsyncSession, since: Optional[date] = None) -> Dict[Tuple[str, str], list]:
+        """Summed [count, bytes] per (metric, key), optionally from a given day on."""
+        query = select(
+            DailyStat.metric, DailyStat.key, func.sum(DailyStat.count), func.sum(DailyStat.bytes)
+        )
+        if since is not None:
+            query = query.where(DailyStat.day >= since)
+        result = await db.execute(query.group_by(DailyStat.metric, DailyStat.key))
+        return {
+            (metric, key): [int(count or 0), int(size or 0)]
+            for metric, key, count, size in result.all()
+        }
+
+
+def _keep_replaced_value(target, value, oldvalue, initiator):
+    return value
+
+
+# active_history loads the replaced value even when the attribute was expired,
+# so the flush's history always has both sides of a move
+for _attribute in (
+    Property.owner_id, Property.property_type, Property.state,
+    Inspection.property_id, Inspection.status, Inspection.inspection_type,
+):
+    event.listen(_attribute, "set", _keep_replaced_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted_rows(session, flush_context, instances):
+    # Deleted rows are gone by after_flush; make sure their columns are loaded first
+    for obj in session.deleted:
+        if isinstance(obj, TRACKED_MODELS):
+            obj.created_at
+    AdminStatsService.prepare_flush(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_admin_stats(session, flush_context):
+    AdminStatsService.apply_flush(session)
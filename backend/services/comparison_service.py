@@ -0,0 +1,227 @@
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+import re
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database.models import Issue
+from backend.schemas.issue import IssueResponse
+from backend.services.issue_service import IssueService
+from config.settings import get_settings
+
+settings = get_settings()
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+# Matched pairs scoring below this are treated as two unrelated issues
+MIN_MATCH_SCORE = 0.25
+# Second pass (same type, different or unknown room) needs a stronger resemblance
+MIN_CROSS_ROOM_SCORE = 0.5
+BOX_WEIGHT = 0.5
+TEXT_WEIGHT = 0.5
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+# Words too common in issue descriptions to say two issues are the same
+STOP_WORDS = frozenset(("a", "an", "the", "of", "on", "in", "to", "and", "with", "near", "is", "are", "at", "by", "for", "from"))
+
+ComparisonKey = Tuple[int, int, Tuple, Tuple]
+
+
+def _words(text: Optional[str]) -> frozenset:
+    return frozenset(word for word in WORD_PATTERN.findall((text or "").lower()) if word not in STOP_WORDS)
+
+
+def _assign(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Minimum-cost assignment of rows to columns (Hungarian algorithm, shortest
+    augmenting paths with the inner loop vectorized). Every row of the smaller
+    side is assigned; returns (row, column) pairs.
+    """
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)  # p[j]: row (1-based) assigned to column j
+    way = np.zeros(m + 1, dtype=int)
+    
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    
+    pairs = [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j]]
+    return [(col, row) for row, col in pairs] if transposed else pairs
+
+
+class ComparisonService:
+    """
+    Move-in versus move-out comparison of two inspections of one property.
+    
+    Issues are only scored against candidates in the same room with the same
+    issue type (then, for what is left, the same type anywhere), and each
+    group is resolved with an optimal one-to-one assignment on bounding-box
+    overlap and description similarity. Results are cached per inspection
+    pair until either inspection's issues are rewritten.
+    """
+    
+    _cache: "OrderedDict[ComparisonKey, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def _score(baseline: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> np.ndarray:
+        """Pairwise similarity in [0, 1] between two groups of issues."""
+        boxes_a = [IssueService.bounding_box(issue) for issue in baseline]
+        boxes_b = [IssueService.bounding_box(issue) for issue in current]
+        words_a = [issue["_words"] for issue in baseline]
+        words_b = [issue["_words"] for issue in current]
+        
+        text = np.array([
+            [len(a & b) / len(a | b) if a and b else 0.0 for b in words_b]
+            for a in words_a
+        ])
+        
+        has_a = np.array([box is not None for box in boxes_a])
+        has_b = np.array([box is not None for box in boxes_b])
+        a = np.array([box or (0, 0, 0, 0) for box in boxes_a], dtype=float)
+        b = np.array([box or (0, 0, 0, 0) for box in boxes_b], dtype=float)
+        width = np.clip(np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0]), 0, None)
+        height = np.clip(np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1]), 0, None)
+        overlap = width * height
+        area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+        area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+        union = area_a[:, None] + area_b[None, :] - overlap
+        iou = np.divide(overlap, union, out=np.zeros_like(overlap), where=union > 0)
+        
+        # Without a box on both sides the description is all there is to go on
+        both_boxed = has_a[:, None] & has_b[None, :]
+        return np.where(both_boxed, BOX_WEIGHT * iou + TEXT_WEIGHT * text, text)
+
+    @staticmethod
+    def _match_groups(
+        baseline: List[Dict[str, Any]],
+        current: List[Dict[str, Any]],
+        key,
+        min_score: float,
+        matches: Dict[int, Tuple[int, float]]
+    ) -> None:
+        """Match still-unmatched issues within groups sharing key(issue); fills matches[current index]."""
+        matched_baseline = {b for b, _ in matches.values()}
+        groups: Dict[Hashable, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        for index, issue in enumerate(baseline):
+            if index not in matched_baseline:
+                groups[key(issue)][0].append(index)
+        for index, issue in enumerate(current):
+            if index not in matches:
+                groups[key(issue)][1].append(index)
+        
+        for group_key, (rows, cols) in groups.items():
+            if group_key is None or not rows or not cols:
+                continue
+            score = ComparisonService._score([baseline[i] for i in rows], [current[j] for j in cols])
+            # Weak pairs cost as much as leaving both unmatched, so they never displace a real match
+            cost = np.where(score >= min_score, 1.0 - score, 1.0)
+            for row, col in _assign(cost):
+                if score[row, col] >= min_score:
+                    matches[cols[col]] = (rows[row], float(score[row, col]))
+
+    @staticmethod
+    def compare_issues(baseline: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Classify issues as new, worsened, resolved or pre_existing. Issues are IssueResponse dicts."""
+        for issue in (*baseline, *current):
+            issue["_words"] = _words(issue.get("description"))
+        room = lambda issue: (issue.get("room_name") or "").strip().lower() or None
+        
+        matches: Dict[int, Tuple[int, float]] = {}
+        ComparisonService._match_groups(
+            baseline, current,
+            lambda issue: (room(issue), issue["issue_type"]) if room(issue) else None,
+            MIN_MATCH_SCORE, matches
+        )
+        ComparisonService._match_groups(
+            baseline, current, lambda issue: issue["issue_type"], MIN_CROSS_ROOM_SCORE, matches
+        )
+        for issue in (*baseline, *current):
+            issue.pop("_words", None)
+        
+        items = []
+        counts = {"new": 0, "worsened": 0, "resolved": 0, "pre_existing": 0}
+        cost_low = cost_high = 0.0
+        for index, issue in enumerate(current):
+            if index in matches:
+                baseline_index, score = matches[index]
+                before = baseline[baseline_index]
+                worse = SEVERITY_RANK.get(issue["severity"], 0) > SEVERITY_RANK.get(before["severity"], 0)
+                status = "worsened" if worse else "pre_existing"
+                items.append({"status": status, "baseline_issue": before, "current_issue": issue, "match_score": round(score, 3)})
+            else:
+                status = "new"
+                items.append({"status": status, "baseline_issue": None, "current_issue": issue, "match_score": None})
+            counts[status] += 1
+            # New damage and damage that got worse are what a deposit claim rests on
+            if status in ("new", "worsened"):
+                cost_low += issue.get("estimated_cost_low") or 0
+                cost_high += issue.get("estimated_cost_high") or 0
+        
+        matched_baseline = {b for b, _ in matches.values()}
+        for index, issue in enumerate(baseline):
+            if index not in matched_baseline:
+                items.append({"status": "resolved", "baseline_issue": issue, "current_issue": None, "match_score": None})
+                counts["resolved"] += 1
+        
+        return {
+            "summary": {**counts, "chargeable_cost_low": round(cost_low, 2), "chargeable_cost_high": round(cost_high, 2)},
+            "items": items,
+        }
+
+    @staticmethod
+    async def _fingerprints(db: AsyncSession, inspection_ids: Iterable[int]) -> Dict[int, Tuple]:
+        """(issue count, highest issue id) per inspection; rewriting issues always changes it."""
+        rows = await db.execute(
+            select(Issue.inspection_id, func.count(Issue.id), func.max(Issue.id))
+            .where(Issue.inspection_id.in_(list(inspection_ids)))
+            .group_by(Issue.inspection_id)
+        )
+        return {inspection_id: (count, max_id) for inspection_id, count, max_id in rows}
+
+    @staticmethod
+    async def compare(db: AsyncSession, baseline_id: int, current_id: int) -> Dict[str, Any]:
+        """Comparison of two inspections' issues, from cache when neither has changed."""
+        fingerprints = await ComparisonService._fingerprints(db, (baseline_id, current_id))
+        key = (baseline_id, current_id, fingerprints.get(baseline_id, (0, None)), fingerprints.get(current_id, (0, None)))
+        cache = ComparisonService._cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        
+        issues: Dict[int, List[Dict[str, Any]]] = {baseline_id: [], current_id: []}
+        for issue in await db.scalars(
+            select(Issue).where(Issue.inspection_id.in_((baseline_id, current_id))).order_by(Issue.id)
+        ):
+            issues[issue.inspection_id].append(IssueResponse.model_validate(issue).model_dump())
+        
+        result = ComparisonService.compare_issues(issues[baseline_id], issues[current_id])
+        cache[key] = result
+        while len(cache) > settings.inspection_compare_cache_size:
+            cache.popitem(last=False)
+        return result
@@ -0,0 +1,342 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import csv
+import gzip
+import json
+import logging
+from sqlalchemy import select, insert, literal, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from backend.database.models import Property, Inspection, Issue, ExportTombstone
+from backend.database.json_types import json_text, json_float, json_int
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+EXPORT_FORMATS = ("parquet", "csv")
+EXPORT_MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "csv": "application/gzip"}
+EXPORT_EXTENSIONS = {"parquet": ".parquet", "csv": ".csv.gz"}
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """A table as exported: its columns, the column exports resume from, and who may see which rows."""
+    model: Any
+    watermark: Any
+    columns: Tuple[Tuple[str, Any, str], ...]  # (name, expression, kind)
+    owner_filter: Callable[[int], Any]
+    owner: Any  # the owning user's id, recorded with tombstones
+
+
+def _owned_properties(owner_id: int):
+    return select(Property.id).where(Property.owner_id == owner_id)
+
+
+# Issue rows are rewritten (new ids) when an inspection is re-analyzed, so created_at moves forward
+# and the old ids come back as tombstones
+EXPORT_DATASETS: Dict[str, ExportDataset] = {
+    "issues": ExportDataset(
+        model=Issue,
+        watermark=Issue.created_at,
+        columns=(
+            ("id", Issue.id, "int"),
+            ("inspection_id", Issue.inspection_id, "int"),
+            ("property_id", Issue.property_id, "int"),
+            ("room_id", Issue.room_id, "int"),
+            ("room_name", Issue.room_name, "str"),
+            ("issue_type", Issue.issue_type, "str"),
+            ("category", Issue.category, "str"),
+            ("severity", Issue.severity, "str"),
+            ("confidence", Issue.confidence, "float"),
+            ("potential_code_violation", Issue.potential_code_violation, "bool"),
+            ("recommended_trade", Issue.recommended_trade, "str"),
+            ("diy_possible", Issue.diy_possible, "bool"),
+            ("estimated_cost_low", Issue.estimated_cost_low, "float"),
+            ("estimated_cost_high", Issue.estimated_cost_high, "float"),
+            ("estimated_time_hours", Issue.estimated_time_hours, "float"),
+            ("description", Issue.description, "str"),
+            ("bounding_box", Issue.bounding_box, "json"),
+            ("created_at", Issue.created_at, "datetime"),
+        ),
+        owner_filter=lambda owner_id: Issue.property_id.in_(_owned_properties(owner_id)),
+        owner=select(Property.owner_id).where(Property.id == Issue.property_id).scalar_subquery(),
+    ),
+    "inspections": ExportDataset(
+        model=Inspection,
+        watermark=Inspection.updated_at,
+        columns=(
+            ("id", Inspection.id, "int"),
+            ("property_id", Inspection.property_id, "int"),
+            ("inspector_id", Inspection.inspector_id, "int"),
+            ("inspection_type", Inspection.inspection_type, "enum"),
+            ("status", Inspection.status, "str"),
+            ("inspection_date", Inspection.inspection_date, "datetime"),
+            ("summary_severity", json_text(Inspection.summary_stats, "summary_severity"), "str"),
+            ("summary_cost_low", json_float(Inspection.summary_stats, "summary_cost_low"), "float"),
+            ("summary_cost_high", json_float(Inspection.summary_stats, "summary_cost_high"), "float"),
+            ("code_violations_found", json_int(Inspection.report_summary, "code_violations_found"), "int"),
+            ("created_at", Inspection.created_at, "datetime"),
+            ("updated_at", Inspection.updated_at, "datetime"),
+        ),
+        owner_filter=lambda owner_id: Inspection.inspector_id == owner_id,
+        owner=Inspection.inspector_id,
+    ),
+    "properties": ExportDataset(
+        model=Property,
+        watermark=Property.updated_at,
+        columns=(
+            ("id", Property.id, "int"),
+            ("owner_id", Property.owner_id, "int"),
+            ("address_line1", Property.address_line1, "str"),
+            ("unit_number", Property.unit_number, "str"),
+            ("city", Property.city, "str"),
+            ("state", Property.state, "str"),
+            ("postal_code", Property.postal_code, "str"),
+            ("property_type", Property.property_type, "str"),
+            ("bedrooms", Property.bedrooms, "int"),
+            ("bathrooms", Property.bathrooms, "int"),
+            ("square_feet", Property.square_feet, "float"),
+            ("year_built", Property.year_built, "int"),
+            ("lot_size", Property.lot_size, "float"),
+            ("is_active", Property.is_active, "bool"),
+            ("created_at", Property.created_at, "datetime"),
+            ("updated_at", Property.updated_at, "datetime"),
+        ),
+        owner_filter=lambda owner_id: Property.owner_id == owner_id,
+        owner=Property.owner_id,
+    ),
+}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _plain(value: Any, kind: str) -> Any:
+    """A column value as the writers take it."""
+    if value is None:
+        return None
+    if kind == "enum":
+        return getattr(value, "value", value)
+    if kind == "json":
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class ExportService:
+    """
+    Columnar exports of issues, inspections and properties.
+    
+    Rows are read in keyset-paginated chunks of export_chunk_size and each
+    chunk is written to the output file (a Parquet row group, or more
+    gzip-compressed CSV) before the next is read, so memory stays flat
+    however many rows are exported. An export covers rows whose watermark
+    column falls in (since, until]; until is fixed when the export starts,
+    export_watermark_lag_seconds behind now so transactions still
+    committing are picked up next time, and handed back so the next
+    incremental export can start there.
+    
+    Every file ends with a deleted column. Incremental exports follow the
+    rows with a tombstone per row deleted in the same window: only id is
+    set and deleted is true, and the consumer drops that id.
+    """
+
+    @staticmethod
+    def tombstones(dataset_name: str, *criteria):
+        """
+        INSERT recording the dataset's rows matching criteria as deleted.
+        Execute it before the rows are deleted, in the same transaction.
+        """
+        dataset = EXPORT_DATASETS[dataset_name]
+        return insert(ExportTombstone).from_select(
+            ["dataset", "row_id", "owner_id", "deleted_at"],
+            select(
+                literal(dataset_name),
+                dataset.model.id,
+                dataset.owner,
+                literal(datetime.utcnow(), ExportTombstone.deleted_at.type)
+            ).where(*criteria)
+        )
+
+    @staticmethod
+    async def iter_chunks(
+        db: AsyncSession,
+        dataset: ExportDataset,
+        owner_id: Optional[int],
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> AsyncIterator[List[List[Any]]]:
+        """Rows in watermark order, chunk by chunk, already converted for the writers."""
+        if until is None:
+            return
+        key = dataset.model.id
+        query = select(
+            *(expression.label(name) for name, expression, _ in dataset.columns),
+            dataset.watermark.label("_watermark"),
+        ).where(dataset.watermark <= until)
+        if since is not None:
+            query = query.where(dataset.watermark > since)
+        if owner_id is not None:
+            query = query.where(dataset.owner_filter(owner_id))
+        query = query.order_by(dataset.watermark, key).limit(settings.export_chunk_size)
+        kinds = [kind for _, _, kind in dataset.columns]
+        
+        last = None
+        while True:
+            page = query
+            if last is not None:
+                page = page.where(or_(
+                    dataset.watermark > last[0],
+                    and_(dataset.watermark == last[0], key > last[1])
+                ))
+            rows = (await db.execute(page)).all()
+            if not rows:
+                return
+            last = (rows[-1]._watermark, rows[-1].id)
+            yield [[_plain(value, kind) for value, kind in zip(row, kinds)] + [False] for row in rows]
+            if len(rows) < settings.export_chunk_size:
+                return
+
+    @staticmethod
+    async def iter_tombstones(
+        db: AsyncSession,
+        dataset: ExportDataset,
+        owner_id: Optional[int],
+        since: datetime,
+        until: datetime
+    ) -> AsyncIterator[List[List[Any]]]:
+        """Rows deleted in (since, until], chunk by chunk, as id-only rows flagged deleted."""
+        query = select(ExportTombstone.id, ExportTombstone.row_id, ExportTombstone.deleted_at).where(
+            ExportTombstone.dataset == dataset.model.__tablename__,
+            ExportTombstone.deleted_at > since,
+            ExportTombstone.deleted_at <= until
+        )
+        if owner_id is not None:
+            query = query.where(ExportTombstone.owner_id == owner_id)
+        query = query.order_by(ExportTombstone.deleted_at, ExportTombstone.id).limit(settings.export_chunk_size)
+        blank = [None] * (len(dataset.columns) - 1)
+        
+        last = None
+        while True:
+            page = query
+            if last is not None:
+                page = page.where(or_(
+                    ExportTombstone.deleted_at > last[0],
+                    and_(ExportTombstone.deleted_at == last[0], ExportTombstone.id > last[1])
+                ))
+            rows = (await db.execute(page)).all()
+            if not rows:
+                return
+            last = (rows[-1].deleted_at, rows[-1].id)
+            yield [[row.row_id] + blank + [True] for row in rows]
+            if len(rows) < settings.export_chunk_size:
+                return
+
+    @staticmethod
+    async def iter_export(
+        db: AsyncSession,
+        dataset: ExportDataset,
+        owner_id: Optional[int],
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> AsyncIterator[List[List[Any]]]:
+        """The changed rows, then (for incremental exports) the deleted ones."""
+        async for rows in ExportService.iter_chunks(db, dataset, owner_id, since, until):
+            yield rows
+        if since is not None and until is not None:
+            async for rows in ExportService.iter_tombstones(db, dataset, owner_id, since, until):
+                yield rows
+
+    @staticmethod
+    def _arrow_schema(dataset: ExportDataset):
+        import pyarrow as pa
+        types = {
+            "int": pa.int64(), "float": pa.float64(), "str": pa.string(), "enum": pa.string(),
+            "json": pa.string(), "bool": pa.bool_(), "datetime": pa.timestamp("us"),
+        }
+        return pa.schema([(name, types[kind]) for name, _, kind in dataset.columns] + [("deleted", pa.bool_())])
+
+    @staticmethod
+    async def write_parquet(
+        db: AsyncSession,
+        dataset: ExportDataset,
+        path: str,
+        owner_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> int:
+        """Write the rows to a Parquet file, one row group per chunk. Returns the row count."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = ExportService._arrow_schema(dataset)
+
+        def write(writer, rows):
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+        
+        total = 0
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+        try:
+            async for rows in ExportService.iter_export(db, dataset, owner_id, since, until):
+                # Encoding and compression run off the event loop
+                await run_in_threadpool(write, writer, rows)
+                total += len(rows)
+        finally:
+            writer.close()
+        logger.info(f"Exported {total} rows of {dataset.model.__tablename__} to {path}")
+        return total
+
+    @staticmethod
+    async def write_csv_gzip(
+        db: AsyncSession,
+        dataset: ExportDataset,
+        path: str,
+        owner_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> int:
+        """Write the rows as gzip-compressed CSV with a header row. Returns the row count."""
+        def write(out, rows):
+            csv.writer(out).writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+            )
+        
+        total = 0
+        with gzip.open(path, "wt", newline="", encoding="utf-8") as out:
+            write(out, [[name for name, _, _ in dataset.columns] + ["deleted"]])
+            async for rows in ExportService.iter_export(db, dataset, owner_id, since, until):
+                await run_in_threadpool(write, out, rows)
+                total += len(rows)
+        logger.info(f"Exported {total} rows of {dataset.model.__tablename__} to {path}")
+        return total
+
+    @staticmethod
+    async def export(
+        db: AsyncSession,
+        dataset_name: str,
+        export_format: str,
+        path: str,
+        owner_id: Optional[int] = None,
+        since: Optional[datetime] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        Export rows changed after since (everything when None) to path.
+        Returns the row count and the watermark to pass as since next time.
+        """
+        dataset = EXPORT_DATASETS[dataset_name]
+        # Watermarks come from the app clock at insert time, not commit time
+        until = datetime.utcnow() - timedelta(seconds=settings.export_watermark_lag_seconds)
+        if since is not None and until <= since:
+            until = None
+        write = ExportService.write_parquet if export_format == "parquet" else ExportService.write_csv_gzip
+        total = await write(db, dataset, path, owner_id, since, until)
+        return total, until or since
@@ -0,0 +1,258 @@
+import os
+import re
+import stat
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional, Tuple, List
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
+from config.settings import get_settings
+
+settings = get_settings()
+
+# Upload names are either uuid4 or content hashes; both are written once and never rewritten
+IMMUTABLE_NAME_PATTERN = re.compile(
+    r'^(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{64})(?:\.[A-Za-z0-9]+)?$'
+)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class RangeFileResponse(FileResponse):
+    """FileResponse that can send a single byte range and use zero-copy sends."""
+
+    def __init__(self, path, offset: int = 0, length: Optional[int] = None, **kwargs):
+        self.offset = offset
+        self.length = length
+        super().__init__(path, **kwargs)
+
+    def set_stat_headers(self, stat_result: os.stat_result) -> None:
+        # Validators are computed by FileServingService, only fill in the basics here
+        length = self.length if self.length is not None else stat_result.st_size
+        self.headers.setdefault("content-length", str(length))
+        self.headers.setdefault("last-modified", formatdate(stat_result.st_mtime, usegmt=True))
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        
+        count = self.length if self.length is not None else self.stat_result.st_size
+        extensions = scope.get("extensions") or {}
+        
+        if scope["method"].upper() == "HEAD" or count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopy" in extensions:
+            # Server hands the descriptor to sendfile(2), bytes never enter Python
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": count,
+                    "more_body": False,
+                })
+        elif "http.response.pathsend" in extensions and self.offset == 0 and count == self.stat_result.st_size:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    })
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        
+        if self.background is not None:
+            await self.background()
+
+
+class FileServingService:
+    """Serve stored files with content-hash ETags, conditional requests and byte ranges."""
+    
+    _etag_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+    _etag_cache_lock = threading.Lock()
+    _etag_cache_size = 4096
+
+    @staticmethod
+    def content_hash(contents: bytes) -> str:
+        """Hash file contents the same way served ETags are derived."""
+        return hashlib.sha256(contents).hexdigest()
+
+    @staticmethod
+    def remember_etag(path: Path, digest: str) -> None:
+        """Prime the ETag cache for a file we just wrote, so the first GET skips hashing."""
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return
+        FileServingService._store_etag(path, stat_result, f'"{digest}"')
+
+    @staticmethod
+    def _cache_key(path: Path, stat_result: os.stat_result) -> Tuple[str, int, int]:
+        return (str(path), stat_result.st_mtime_ns, stat_result.st_size)
+
+    @staticmethod
+    def _store_etag(path: Path, stat_result: os.stat_result, etag: str) -> None:
+        key = FileServingService._cache_key(path, stat_result)
+        with FileServingService._etag_cache_lock:
+            FileServingService._etag_cache[key] = etag
+            FileServingService._etag_cache.move_to_end(key)
+            while len(FileServingService._etag_cache) > FileServingService._etag_cache_size:
+                FileServingService._etag_cache.popitem(last=False)
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    async def get_etag(path: Path, stat_result: os.stat_result) -> str:
+        """Return the strong content-hash ETag, hashing off the event loop on a cache miss."""
+        key = FileServingService._cache_key(path, stat_result)
+        with FileServingService._etag_cache_lock:
+            etag = FileServingService._etag_cache.get(key)
+            if etag is not None:
+                FileServingService._etag_cache.move_to_end(key)
+                return etag
+        
+        etag = f'"{await run_in_threadpool(FileServingService._hash_file, path)}"'
+        FileServingService._store_etag(path, stat_result, etag)
+        return etag
+
+    @staticmethod
+    def cache_control_for(filename: str) -> str:
+        """Immutable caching for write-once names, revalidation for everything else."""
+        if IMMUTABLE_NAME_PATTERN.match(filename):
+            return f"public, max-age={settings.file_cache_max_age}, immutable"
+        return "private, no-cache"
+
+    @staticmethod
+    def _etag_matches(header: str, etag: str) -> bool:
+        """Weak comparison as required for If-None-Match."""
+        if header.strip() == "*":
+            return True
+        bare = etag.removeprefix("W/")
+        for candidate in header.split(","):
+            if candidate.strip().removeprefix("W/") == bare:
+                return True
+        return False
+
+    @staticmethod
+    def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+        """
+        Parse a Range header into inclusive (start, end) pairs.
+        
+        Returns None when the header is malformed (serve the full body), or an
+        empty list when no range is satisfiable (416).
+        """
+        units, _, spec = header.partition("=")
+        if units.strip().lower() != "bytes" or not spec:
+            return None
+        
+        ranges = []
+        for part in spec.split(","):
+            start_str, sep, end_str = part.strip().partition("-")
+            if not sep:
+                return None
+            try:
+                if start_str == "":
+                    # Suffix range: last N bytes
+                    suffix = int(end_str)
+                    if suffix <= 0:
+                        continue
+                    start, end = max(size - suffix, 0), size - 1
+                else:
+                    start = int(start_str)
+                    if end_str and int(end_str) < start:
+                        return None
+                    end = min(int(end_str), size - 1) if end_str else size - 1
+            except ValueError:
+                return None
+            if start < size:
+                ranges.append((start, end))
+        return ranges
+
+    @staticmethod
+    async def serve(
+        request: Request,
+        path: Path,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+        cache_control: Optional[str] = None,
+        content_disposition_type: str = "inline"
+    ) -> Response:
+        """
+        Build the response for a stored file.
+        
+        A single stat both checks existence and feeds the validators. Handles
+        If-None-Match (304), Range/If-Range (206/416) and falls back to a full 200.
+        Raises FileNotFoundError if the path is not a regular file.
+        """
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise FileNotFoundError(str(path))
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise FileNotFoundError(str(path))
+        
+        etag = await FileServingService.get_etag(path, stat_result)
+        headers = {
+            "etag": etag,
+            "cache-control": cache_control or FileServingService.cache_control_for(path.name),
+            "accept-ranges": "bytes",
+        }
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and FileServingService._etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        size = stat_result.st_size
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and (not if_range or if_range.strip() == etag):
+            ranges = FileServingService.parse_range(range_header, size)
+            if ranges == []:
+                headers["content-range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+            if ranges:
+                # Multipart/byteranges is rarely used by clients; answer the first range only
+                start, end = ranges[0]
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+                return RangeFileResponse(
+                    path,
+                    offset=start,
+                    length=end - start + 1,
+                    status_code=206,
+                    headers=headers,
+                    media_type=media_type,
+                    filename=filename,
+                    stat_result=stat_result,
+                    content_disposition_type=content_disposition_type
+                )
+        
+        return RangeFileResponse(
+            path,
+            headers=headers,
+            media_type=media_type,
+            filename=filename,
+            stat_result=stat_result,
+            content_disposition_type=content_disposition_type
+        )
@@ -0,0 +1,82 @@
+from typing import Dict, Any
+from PIL import Image
+import numpy as np
+import io
+from config.settings import get_settings
+
+settings = get_settings()
+
+# Scores are computed on a bounded thumbnail so cost doesn't grow with camera resolution
+ANALYSIS_MAX_SIDE = 512
+DARK_LEVEL = 16
+BRIGHT_LEVEL = 239
+DHASH_SIZE = 8
+
+
+class ImageQualityService:
+    """Cheap, vectorized photo quality scoring used to gate vision analysis."""
+
+    @staticmethod
+    def score(photo_bytes: bytes) -> Dict[str, Any]:
+        """
+        Compute blur, exposure and resolution scores and a perceptual hash for a photo.
+        
+        Pure CPU work with no shared state, so it is safe to run in a process pool.
+        """
+        image = Image.open(io.BytesIO(photo_bytes))
+        width, height = image.size
+        
+        # Let the JPEG decoder downscale while decoding, then finish with a cheap resize
+        image.draft("L", (ANALYSIS_MAX_SIDE, ANALYSIS_MAX_SIDE))
+        gray = image.convert("L")
+        gray.thumbnail((ANALYSIS_MAX_SIDE, ANALYSIS_MAX_SIDE))
+        pixels = np.asarray(gray, dtype=np.float32)
+        
+        # Variance of the 4-neighbour Laplacian: low values mean few sharp edges
+        if pixels.shape[0] >= 3 and pixels.shape[1] >= 3:
+            laplacian = (
+                pixels[:-2, 1:-1] + pixels[2:, 1:-1] +
+                pixels[1:-1, :-2] + pixels[1:-1, 2:] -
+                4.0 * pixels[1:-1, 1:-1]
+            )
+            blur_score = float(laplacian.var())
+        else:
+            blur_score = 0.0
+        
+        # Difference hash: compare horizontally adjacent cells of a 9x8 thumbnail
+        cells = np.asarray(gray.resize((DHASH_SIZE + 1, DHASH_SIZE)), dtype=np.int16)
+        bits = (cells[:, 1:] > cells[:, :-1]).ravel()
+        perceptual_hash = f"{int(''.join('1' if b else '0' for b in bits), 2):016x}"
+        
+        histogram = np.bincount(pixels.astype(np.uint8).ravel(), minlength=256)
+        total = max(int(histogram.sum()), 1)
+        
+        return {
+            "width": width,
+            "height": height,
+            "blur_score": round(blur_score, 2),
+            "brightness": round(float(pixels.mean()), 2),
+            "dark_fraction": round(float(histogram[:DARK_LEVEL + 1].sum()) / total, 4),
+            "bright_fraction": round(float(histogram[BRIGHT_LEVEL:].sum()) / total, 4),
+            "perceptual_hash": perceptual_hash,
+        }
+
+    @staticmethod
+    def evaluate(scores: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the configured thresholds to raw scores and explain any failures."""
+        issues = []
+        
+        if min(scores["width"], scores["height"]) < settings.photo_min_resolution:
+            issues.append("low_resolution")
+        if scores["blur_score"] < settings.photo_blur_threshold:
+            issues.append("blurry")
+        if scores["dark_fraction"] > settings.photo_max_clipped_fraction or scores["brightness"] < settings.photo_min_brightness:
+            issues.append("underexposed")
+        if scores["bright_fraction"] > settings.photo_max_clipped_fraction or scores["brightness"] > settings.photo_max_brightness:
+            issues.append("overexposed")
+        
+        return {
+            **scores,
+            "passed": not issues,
+            "issues": issues
+        }
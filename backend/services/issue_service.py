@@ -0,0 +1,111 @@
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import insert, delete
+from sqlalchemy.orm import Session
+from backend.database.models import Inspection, Issue, Room
+from backend.services.search_service import SearchService
+from backend.services.timeline_service import TimelineService
+from backend.services.export_service import ExportService
+
+# Category for issue types the vision agent reports without a code_category
+ISSUE_TYPE_CATEGORIES = {
+    "electrical_violation": "electrical",
+    "plumbing_violation": "plumbing",
+    "safety_violation": "safety",
+    "structural_violation": "structural",
+    "fire_safety_violation": "fire_safety",
+    "ventilation_issue": "ventilation",
+    "water_damage": "moisture",
+    "mold_signs": "moisture",
+    "crack": "structural",
+    "broken_fixture": "fixtures",
+    "flooring_damage": "flooring",
+}
+DEFAULT_CATEGORY = "cosmetic"
+
+
+class IssueService:
+    """Persist and query detected issues as rows instead of inspection JSON."""
+
+    @staticmethod
+    def categorize(issue: Dict[str, Any]) -> str:
+        """Best category for an enriched issue."""
+        category = issue.get("category") or issue.get("code_category")
+        if category and category != "none":
+            return category
+        return ISSUE_TYPE_CATEGORIES.get(issue.get("issue_type"), DEFAULT_CATEGORY)
+
+    @staticmethod
+    def bounding_box(issue: Dict[str, Any]) -> Optional[Tuple[float, float, float, float]]:
+        """An issue's {x, y, w, h} box as (x0, y0, x1, y1), or None if missing or empty."""
+        box = issue.get("bounding_box")
+        if not isinstance(box, dict):
+            return None
+        try:
+            x, y = float(box.get("x", 0)), float(box.get("y", 0))
+            w, h = float(box.get("w", box.get("width", 0))), float(box.get("h", box.get("height", 0)))
+        except (TypeError, ValueError):
+            return None
+        return (x, y, x + w, y + h) if w > 0 and h > 0 else None
+
+    @staticmethod
+    def build_rows(inspection: Inspection, issues_enriched: List[Dict[str, Any]], rooms: List[Room]) -> List[Dict[str, Any]]:
+        """Map enriched issue dicts onto issues table rows."""
+        room_ids: Dict[str, int] = {}
+        for room in rooms:
+            room_ids.setdefault(room.room_type, room.id)
+            if room.room_name:
+                room_ids[room.room_name] = room.id
+        
+        rows = []
+        for issue in issues_enriched or []:
+            room_name = issue.get("room_name")
+            rows.append({
+                "inspection_id": inspection.id,
+                "property_id": inspection.property_id,
+                "room_id": room_ids.get(room_name) if room_name else None,
+                "issue_type": issue.get("issue_type") or "other",
+                "category": IssueService.categorize(issue),
+                "description": issue.get("description") or "",
+                "severity": (issue.get("severity") or "low").lower(),
+                "confidence": issue.get("confidence"),
+                "potential_code_violation": bool(issue.get("potential_code_violation")),
+                "room_name": room_name,
+                "photo_url": issue.get("image_url"),
+                "bounding_box": issue.get("bounding_box"),
+                "recommended_action": issue.get("recommended_action"),
+                "recommended_trade": issue.get("recommended_trade"),
+                "diy_possible": issue.get("diy_possible"),
+                "estimated_cost_low": issue.get("cost_low"),
+                "estimated_cost_high": issue.get("cost_high"),
+                "estimated_time_hours": issue.get("time_hours"),
+                "materials_list": issue.get("materials_list"),
+                "safety_warnings": issue.get("safety_warnings"),
+            })
+        return rows
+
+    @staticmethod
+    def replace_inspection_issues(
+        db: Session,
+        inspection: Inspection,
+        issues_enriched: List[Dict[str, Any]],
+        rooms: Optional[List[Room]] = None
+    ) -> int:
+        """
+        Replace an inspection's issue rows with a fresh analysis result.
+        
+        Uses one DELETE and one multi-row INSERT; the caller commits.
+        Returns the number of rows written.
+        """
+        rows = IssueService.build_rows(
+            inspection,
+            issues_enriched,
+            rooms if rooms is not None else inspection.rooms
+        )
+        db.execute(ExportService.tombstones("issues", Issue.inspection_id == inspection.id))
+        db.execute(delete(Issue).where(Issue.inspection_id == inspection.id))
+        if rows:
+            db.execute(insert(Issue), rows)
+        # Core statements skip the ORM listeners that keep search and timelines current
+        SearchService.mark(db, [inspection.id])
+        TimelineService.mark(db, [inspection.property_id])
+        return len(rows)
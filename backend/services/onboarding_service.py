@@ -0,0 +1,135 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import re
+import secrets
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database.models import Property, Inspection, InspectionType, Room
+from backend.services.property_data_service import PropertyDataService
+
+# Rows per multi-row INSERT, well under SQLite's and PostgreSQL's parameter limits
+ROOM_INSERT_CHUNK = 500
+DEFAULT_PROPERTY_TYPE = "Single Family Home"
+
+
+class OnboardingService:
+    """
+    Bulk creation of properties, inspections and their suggested rooms.
+    
+    Properties and inspections are added as ORM objects so the stats and
+    search listeners see them; on PostgreSQL a single flush writes each table
+    with batched INSERT ... RETURNING statements (SQLite, which can't order
+    RETURNING rows, inserts them one at a time in-process). Rooms, most of the
+    rows, go in as multi-row Core inserts. Nothing is committed here: callers
+    commit once at the end.
+    """
+
+    @staticmethod
+    def inspection_type(value: Union[InspectionType, str]) -> InspectionType:
+        """Resolve enum values and labels like "Move-in Inspection"."""
+        if isinstance(value, InspectionType):
+            return value
+        normalized = re.sub(r"[\s\-]+", "_", value.strip().lower())
+        normalized = re.sub(r"_inspection$", "", normalized)
+        try:
+            return InspectionType(normalized)
+        except ValueError:
+            valid_values = [e.value for e in InspectionType]
+            raise ValueError(f"Invalid inspection_type {value!r}. Must be one of: {valid_values}")
+
+    @staticmethod
+    def property_values(address: Dict[str, Any], property_type: Optional[str], property_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Property columns from a parsed address and looked-up property data."""
+        property_data = property_data or {}
+        values = {
+            **address,
+            "property_type": property_type or property_data.get("property_type") or DEFAULT_PROPERTY_TYPE,
+            "bedrooms": property_data.get("bedrooms", 3),
+            "bathrooms": property_data.get("bathrooms", 2),
+            "square_feet": property_data.get("square_feet"),
+            "year_built": property_data.get("year_built"),
+            "lot_size": property_data.get("lot_size"),
+        }
+        return {k: v for k, v in values.items() if v is not None}
+
+    @staticmethod
+    def new_inspection(property_id: int, inspector_id: int, inspection_type: InspectionType, status: str = "draft") -> Inspection:
+        return Inspection(
+            property_id=property_id,
+            inspector_id=inspector_id,
+            inspection_type=inspection_type,
+            status=status,
+            public_share_token=secrets.token_urlsafe(32)
+        )
+
+    @staticmethod
+    async def room_layout(property: Property) -> List[Dict[str, str]]:
+        return await PropertyDataService.suggest_room_layout(
+            property.property_type or DEFAULT_PROPERTY_TYPE,
+            property.bedrooms or 3,
+            property.bathrooms or 2
+        )
+
+    @staticmethod
+    async def insert_rooms(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        for start in range(0, len(rows), ROOM_INSERT_CHUNK):
+            await db.execute(insert(Room).values(rows[start:start + ROOM_INSERT_CHUNK]))
+
+    @staticmethod
+    async def create_inspections(
+        db: AsyncSession,
+        inspections: Sequence[Inspection],
+        layouts: Sequence[Optional[List[Dict[str, str]]]]
+    ) -> List[int]:
+        """Insert inspections with their room layouts. Returns the number of rooms per inspection."""
+        db.add_all(inspections)
+        await db.flush()
+        
+        await OnboardingService.insert_rooms(db, [
+            {
+                "inspection_id": inspection.id,
+                "room_type": room["type"],
+                "room_name": room["name"],
+                "order_index": i,
+            }
+            for inspection, layout in zip(inspections, layouts)
+            for i, room in enumerate(layout or [])
+        ])
+        return [len(layout or []) for layout in layouts]
+
+    @staticmethod
+    async def create_properties(
+        db: AsyncSession,
+        owner_id: int,
+        entries: Sequence[Tuple[Dict[str, Any], Optional[InspectionType]]]
+    ) -> List[Tuple[Property, Optional[Inspection], int]]:
+        """
+        Insert properties, each optionally with an in-progress inspection and
+        its suggested rooms.
+        
+        entries pairs property column values with the inspection type to
+        create (None for no inspection). Returns (property, inspection, rooms
+        created) per entry, in order.
+        """
+        properties = [Property(**values, owner_id=owner_id) for values, _ in entries]
+        db.add_all(properties)
+        await db.flush()
+        
+        inspections: List[Inspection] = []
+        layouts = []
+        by_property: Dict[int, Inspection] = {}
+        for property, (_, inspection_type) in zip(properties, entries):
+            if inspection_type is None:
+                continue
+            inspection = OnboardingService.new_inspection(property.id, owner_id, inspection_type, status="in_progress")
+            inspections.append(inspection)
+            layouts.append(await OnboardingService.room_layout(property))
+            by_property[property.id] = inspection
+        
+        room_counts = dict(zip(
+            (inspection.property_id for inspection in inspections),
+            await OnboardingService.create_inspections(db, inspections, layouts) if inspections else []
+        ))
+        return [
+            (property, by_property.get(property.id), room_counts.get(property.id, 0))
+            for property in properties
+        ]
@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PaginationService:
+    """Keyset pagination over (created_at, id), newest first."""
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, row_id: int) -> str:
+        """Opaque cursor pointing just past the given row."""
+        payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Inverse of encode_cursor; raises ValueError for anything malformed."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return datetime.fromisoformat(created_at), int(row_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    async def paginate(
+        db: AsyncSession,
+        query: Select,
+        model: Any,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Fetch one page ordered by (created_at DESC, id DESC).
+        
+        With a cursor the page starts right after the cursor row, so deep pages
+        are index range scans; without one the legacy offset is applied.
+        Returns the rows and the cursor for the next page (None on the last page).
+        """
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+        
+        if cursor:
+            created_at, row_id = PaginationService.decode_cursor(cursor)
+            query = query.where(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id)
+            ))
+        elif skip:
+            query = query.offset(skip)
+        
+        result = await db.execute(query.limit(limit + 1))
+        # Entity selects come back as model instances, column selects as rows
+        rows = list(result.scalars()) if len(result.keys()) == 1 else list(result)
+        if len(rows) <= limit:
+            return rows, None
+        
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, PaginationService.encode_cursor(last.created_at, last.id)
@@ -1,29 +1,74 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib import colors
+from reportlab import rl_config
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
 from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
 import markdown2
 
+SEVERITY_COLORS = {
+    "low": colors.HexColor('#16a34a'),
+    "medium": colors.HexColor('#d97706'),
+    "high": colors.HexColor('#dc2626'),
+    "critical": colors.HexColor('#7f1d1d'),
+}
+PHOTO_WIDTH = 3*inch
+
+# Embed streams as binary: ASCII85-encoding every JPEG byte in Python dominated report build time
+rl_config.useA85 = 0
+
+
+class PhotoFlowable(Flowable):
+    """
+    A JPEG on disk drawn at a fixed width, with an optional bounding box
+    (fractions of the image) outlined on top.
+    
+    The canvas names image objects after their file, so every issue that
+    draws the same photo shares one embedded copy.
+    """
+
+    def __init__(self, path: str, size: Tuple[int, int], width: float, box: Optional[Tuple[float, float, float, float]] = None, color=colors.red):
+        super().__init__()
+        self.path = path
+        self.width = width
+        self.height = width * size[1] / size[0]
+        self.box = box
+        self.color = color
+
+    def draw(self):
+        self.canv.drawImage(self.path, 0, 0, self.width, self.height)
+        if self.box:
+            x0, y0, x1, y1 = self.box
+            self.canv.setStrokeColor(self.color)
+            self.canv.setLineWidth(2)
+            # PDF y runs bottom-up, image y top-down
+            self.canv.rect(x0 * self.width, (1 - y1) * self.height, (x1 - x0) * self.width, (y1 - y0) * self.height)
+
 
 class PDFGenerator:
     """Generate PDF reports from inspection data."""
     
     @staticmethod
-    def generate_inspection_report(inspection_data: dict) -> BytesIO:
+    def generate_inspection_report(inspection_data: dict, output=None, images: Optional[Dict[int, Dict[str, Any]]] = None):
         """
         Generate a PDF report for an inspection.
         
         Args:
             inspection_data: Dictionary containing inspection details
+            output: File path or file object to write to; a new BytesIO when omitted
+            images: Prepared photos per issue index: "thumbnail" and "crop" JPEG
+                paths with their pixel sizes, and the issue's "box" as fractions.
+                Images are read from disk as pages are drawn.
             
         Returns:
-            BytesIO object containing the PDF
+            The output the PDF was written to
         """
-        buffer = BytesIO()
+        buffer = output if output is not None else BytesIO()
+        images = images or {}
         doc = SimpleDocTemplate(buffer, pagesize=letter)
         story = []
         styles = getSampleStyleSheet()
@@ -150,6 +195,20 @@ class PDFGenerator:
                     ('VALIGN', (0, 0), (-1, -1), 'TOP'),
                 ]))
                 story.append(issue_table)
+                
+                photo = images.get(idx - 1)
+                if photo:
+                    color = SEVERITY_COLORS.get((issue.get('severity') or '').lower(), colors.red)
+                    cells = [PhotoFlowable(photo['thumbnail'], photo['thumbnail_size'], PHOTO_WIDTH, photo.get('box'), color)]
+                    if photo.get('crop'):
+                        cells.insert(0, PhotoFlowable(photo['crop'], photo['crop_size'], PHOTO_WIDTH))
+                    photo_table = Table([cells], colWidths=[PHOTO_WIDTH + 0.1*inch] * len(cells), hAlign='LEFT')
+                    photo_table.setStyle(TableStyle([
+                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+                    ]))
+                    story.append(Spacer(1, 0.1*inch))
+                    story.append(photo_table)
                 story.append(Spacer(1, 0.2*inch))
         
         # Footer
@@ -159,5 +218,6 @@ class PDFGenerator:
         
         # Build PDF
         doc.build(story)
-        buffer.seek(0)
+        if hasattr(buffer, 'seek'):
+            buffer.seek(0)
         return buffer
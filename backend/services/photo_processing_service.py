@@ -1,77 +1,141 @@
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Optional
 from PIL import Image, ExifTags
 import io
-import base64
+import os
 from datetime import datetime
 import hashlib
+from config.settings import get_settings
+from backend.services.image_quality_service import ImageQualityService
+from backend.services.room_classifier_service import RoomClassifierService, RoomClassifierIndex
+
+settings = get_settings()
+
+# EXIF tags read on the metadata fast path
+SUMMARY_EXIF_TAGS = {"DateTime": 0x0132, "Make": 0x010F, "Model": 0x0110, "Orientation": 0x0112}
+EXIF_IFD_POINTER = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+PHOTO_FORMAT_EXTENSIONS = {"JPEG": ".jpeg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp"}
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound image work, created on first use."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.photo_process_workers or os.cpu_count())
+    return _process_pool
+
 
 class PhotoProcessingService:
     """Service for processing and organizing uploaded photos."""
     
     @staticmethod
-    async def process_bulk_photos(photos: List[bytes], room_names: List[str]) -> List[Dict[str, Any]]:
+    def analyze_photo(photo_bytes: bytes, index: int, include_exif: bool = False) -> Dict[str, Any]:
+        """
+        All the CPU work for one uploaded photo, run as a single process pool job:
+        metadata and content hash, raw quality scores (None if they could not
+        be computed) and the room-classifier feature vector.
+        Raises when the photo can't be decoded.
+        """
+        photo_data = PhotoProcessingService._process_single_photo(photo_bytes, index, include_exif)
+        try:
+            photo_data["quality"] = ImageQualityService.score(photo_bytes)
+        except Exception:
+            photo_data["quality"] = None
+        photo_data["features"] = RoomClassifierService.extract_features(photo_bytes)
+        return photo_data
+    
+    @staticmethod
+    async def process_bulk_photos(
+        photos: List[bytes],
+        room_names: List[str],
+        include_exif: bool = False,
+        room_types: Optional[List[str]] = None,
+        classifier_index: Optional[RoomClassifierIndex] = None
+    ) -> List[Dict[str, Any]]:
         """
         Process multiple photos and attempt to auto-assign to rooms.
-        Returns list of processed photo data with suggested room assignments.
+        Returns list of processed photo data with suggested room assignments
+        and quality scores.
         """
-        processed_photos = []
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, PhotoProcessingService.analyze_photo, photo_bytes, i, include_exif)
+                for i, photo_bytes in enumerate(photos)
+            ),
+            return_exceptions=True
+        )
         
-        for i, photo_bytes in enumerate(photos):
-            try:
-                # Process individual photo
-                photo_data = await PhotoProcessingService._process_single_photo(photo_bytes, i)
-                
-                # Attempt to auto-assign room
-                suggested_room = await PhotoProcessingService._suggest_room_assignment(
-                    photo_data, room_names
-                )
-                
-                photo_data["suggested_room"] = suggested_room
-                photo_data["confidence"] = 0.8 if suggested_room else 0.0
-                
-                processed_photos.append(photo_data)
-                
-            except Exception as e:
-                print(f"Error processing photo {i}: {e}")
+        processed_photos = []
+        for i, photo_data in enumerate(results):
+            if isinstance(photo_data, Exception):
+                print(f"Error processing photo {i}: {photo_data}")
                 continue
+            if photo_data["quality"] is not None:
+                photo_data["quality"] = ImageQualityService.evaluate(photo_data["quality"])
+            processed_photos.append(photo_data)
+        
+        # Assign rooms for the whole batch at once so a walkthrough stays together
+        rooms = list(zip(room_names, room_types or room_names))
+        assignments = RoomClassifierService.assign_rooms(processed_photos, rooms, classifier_index)
+        for photo_data, (suggested_room, confidence) in zip(processed_photos, assignments):
+            photo_data["suggested_room"] = suggested_room
+            photo_data["confidence"] = confidence
         
         return processed_photos
     
     @staticmethod
-    async def _process_single_photo(photo_bytes: bytes, index: int) -> Dict[str, Any]:
-        """Process a single photo and extract metadata."""
+    def _process_single_photo(photo_bytes: bytes, index: int, include_exif: bool = False) -> Dict[str, Any]:
+        """
+        Process a single photo and extract metadata.
+        
+        Only the image header and EXIF block are parsed; pixel data is never
+        decoded here. The full tag-name EXIF mapping is built only when
+        include_exif is set.
+        """
         try:
-            # Open image
+            # Lazy open: reads the header, not the pixels
             image = Image.open(io.BytesIO(photo_bytes))
             
             # Extract EXIF data
-            exif_data = {}
-            if hasattr(image, '_getexif') and image._getexif():
-                exif = image._getexif()
-                for tag_id, value in exif.items():
-                    tag = ExifTags.TAGS.get(tag_id, tag_id)
-                    exif_data[tag] = value
+            exif = image.getexif()
+            exif_ifd = exif.get_ifd(EXIF_IFD_POINTER) if EXIF_IFD_POINTER in exif else {}
+            if include_exif:
+                exif_data = {ExifTags.TAGS.get(tag_id, tag_id): value for tag_id, value in exif.items()}
+                exif_data.update({ExifTags.TAGS.get(tag_id, tag_id): value for tag_id, value in exif_ifd.items()})
+            else:
+                exif_data = {
+                    name: exif.get(tag_id)
+                    for name, tag_id in SUMMARY_EXIF_TAGS.items()
+                    if exif.get(tag_id) is not None
+                }
+                if exif_ifd.get(EXIF_DATETIME_ORIGINAL) is not None:
+                    exif_data["DateTimeOriginal"] = exif_ifd[EXIF_DATETIME_ORIGINAL]
             
-            # Generate photo hash for deduplication
-            photo_hash = hashlib.md5(photo_bytes).hexdigest()
+            # Content hash doubles as the storage key, so duplicates share one object
+            photo_hash = hashlib.sha256(photo_bytes).hexdigest()
+            key = f"{photo_hash}{PHOTO_FORMAT_EXTENSIONS.get(image.format, '.jpg')}"
             
             # Basic image analysis
             width, height = image.size
             file_size = len(photo_bytes)
             
-            # Convert to base64 for storage/transmission
-            photo_base64 = base64.b64encode(photo_bytes).decode('utf-8')
-            
+            # The bytes stay with the caller; results carry where they will be stored
             return {
                 "index": index,
                 "hash": photo_hash,
+                "key": key,
+                "url": f"/api/v1/files/{key}",
                 "width": width,
                 "height": height,
                 "file_size": file_size,
                 "format": image.format,
-                "timestamp": exif_data.get("DateTime", datetime.now().isoformat()),
-                "data": photo_base64,
+                "timestamp": exif_data.get("DateTimeOriginal") or exif_data.get("DateTime") or datetime.now().isoformat(),
                 "exif": exif_data
             }
             
@@ -79,32 +143,18 @@ class PhotoProcessingService:
             raise Exception(f"Failed to process photo: {e}")
     
     @staticmethod
-    async def _suggest_room_assignment(photo_data: Dict[str, Any], room_names: List[str]) -> Optional[str]:
+    def load_preview(photo_bytes: bytes, max_side: int, mode: str = "RGB") -> Image.Image:
         """
-        Use simple heuristics to suggest room assignment.
-        In a real implementation, this would use AI/ML for image recognition.
-        """
-        # For now, use simple filename-based heuristics
-        # In production, this would analyze the actual image content
-        
-        # Mock room detection based on image characteristics
-        # This is where you'd integrate with computer vision APIs
-        
-        room_keywords = {
-            "kitchen": ["kitchen", "stove", "refrigerator", "sink"],
-            "bathroom": ["bathroom", "toilet", "shower", "bath"],
-            "bedroom": ["bedroom", "bed", "closet"],
-            "living room": ["living", "sofa", "couch", "tv"],
-            "garage": ["garage", "car", "tools"],
-            "laundry": ["laundry", "washer", "dryer"]
-        }
+        Decode a reduced-size copy of a photo.
         
-        # Simple assignment based on available rooms
-        # In production, this would use actual image analysis
-        if room_names:
-            return room_names[photo_data["index"] % len(room_names)]
-        
-        return None
+        For JPEGs, draft() makes the decoder scale by 1/2-1/8 during decoding,
+        so a 12MP photo is never fully decoded just to produce a thumbnail.
+        """
+        image = Image.open(io.BytesIO(photo_bytes))
+        image.draft(mode, (max_side, max_side))
+        image = image.convert(mode)
+        image.thumbnail((max_side, max_side))
+        return image
     
     @staticmethod
     async def detect_issues_in_photos(photos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -162,9 +212,17 @@ class PhotoProcessingService:
             room = photo.get("suggested_room", "Unassigned")
             room_counts[room] = room_counts.get(room, 0) + 1
         
+        # Flag photos the inspector should retake
+        low_quality = [
+            {"index": photo["index"], "issues": photo["quality"]["issues"]}
+            for photo in photos
+            if photo.get("quality") and not photo["quality"]["passed"]
+        ]
+        
         return {
             "total_photos": total_photos,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
             "photos_by_room": room_counts,
+            "low_quality_photos": low_quality,
             "processing_timestamp": datetime.now().isoformat()
         }
\ No newline at end of file
@@ -1,12 +1,91 @@
 import httpx
 import asyncio
-from typing import Optional, Dict, Any
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from config.settings import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# "123 Main St, Apt 4, Springfield, IL 62704[, USA]"; the state may follow the city without a comma
+ADDRESS_PATTERN = re.compile(
+    r"^\s*(?P<line1>[^,]+?)\s*,\s*(?:(?P<line2>[^,]+?)\s*,\s*)?(?P<city>[^,]+?)\s*,?\s+"
+    r"(?P<state>[A-Za-z]{2})\.?\s+(?P<postal_code>\d{5}(?:-\d{4})?)(?:\s*,?\s*(?:USA?|United States))?\s*$",
+    re.IGNORECASE
+)
+UNIT_PATTERN = re.compile(r"^(?:apt|apartment|unit|suite|ste|#)\.?\s*#?\s*(?P<unit>[\w-]+)$", re.IGNORECASE)
+
+# Spellings folded together when building cache keys
+ADDRESS_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "drive": "dr", "boulevard": "blvd",
+    "lane": "ln", "court": "ct", "place": "pl", "terrace": "ter", "parkway": "pkwy",
+    "highway": "hwy", "circle": "cir", "apartment": "apt", "suite": "ste", "unit": "apt",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "usa": "", "us": "", "united": "", "states": "",
+}
+# Fields that make a lookup result complete enough to stop waiting for other sources
+DETAIL_FIELDS = ("bedrooms", "bathrooms")
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP client shared by the property data sources."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=settings.property_data_source_timeout,
+            limits=httpx.Limits(
+                max_connections=settings.property_data_max_connections,
+                max_keepalive_connections=settings.property_data_max_connections
+            )
+        )
+    return _http_client
+
 
 class PropertyDataService:
-    """Service to fetch property data from external APIs."""
+    """
+    Service to fetch property data from external APIs.
+    
+    Sources are queried concurrently, each with its own timeout; the first
+    complete answer wins. Answers, including "nothing found", are cached by
+    normalized address, and concurrent lookups of one address share a query.
+    """
+    
+    # Source lookups in order of preference among partial answers
+    SOURCES = ("_try_zillow_api", "_try_public_records", "_try_google_places")
+    
+    _cache: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+    _inflight: Dict[str, "asyncio.Future"] = {}
+
+    @staticmethod
+    def normalize_address(address: str) -> str:
+        """Cache key for an address: case, punctuation and common spellings folded."""
+        words = re.findall(r"[a-z0-9]+", address.lower())
+        return " ".join(word for word in (ADDRESS_ABBREVIATIONS.get(word, word) for word in words) if word)
+
+    @staticmethod
+    def _cached(key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        entry = PropertyDataService._cache.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del PropertyDataService._cache[key]
+            return False, None
+        PropertyDataService._cache.move_to_end(key)
+        return True, entry[1]
+
+    @staticmethod
+    def _store(key: str, property_data: Optional[Dict[str, Any]]) -> None:
+        ttl = settings.property_data_cache_ttl_seconds if property_data else settings.property_data_negative_ttl_seconds
+        cache = PropertyDataService._cache
+        cache[key] = (time.monotonic() + ttl, property_data)
+        cache.move_to_end(key)
+        while len(cache) > settings.property_data_cache_size:
+            cache.popitem(last=False)
     
     @staticmethod
     async def get_property_data_from_address(address: str) -> Optional[Dict[str, Any]]:
@@ -14,19 +93,85 @@ class PropertyDataService:
         Fetch property data from address using multiple data sources.
         Returns property details like bedrooms, bathrooms, square footage, etc.
         """
+        key = PropertyDataService.normalize_address(address)
+        hit, property_data = PropertyDataService._cached(key)
+        if not hit:
+            inflight = PropertyDataService._inflight.get(key)
+            if inflight is None:
+                inflight = asyncio.ensure_future(PropertyDataService._lookup(address))
+                PropertyDataService._inflight[key] = inflight
+                inflight.add_done_callback(lambda _: PropertyDataService._inflight.pop(key, None))
+            try:
+                property_data = await asyncio.shield(inflight)
+            except Exception as e:
+                logger.error(f"Error fetching property data for {address!r}: {e}")
+                return None
+            PropertyDataService._store(key, property_data)
+        
+        # Callers add their own keys to the result; keep the cached copy intact
+        return dict(property_data) if property_data else None
+
+    @staticmethod
+    async def _lookup(address: str) -> Optional[Dict[str, Any]]:
+        """Query every source at once; return the first complete answer, else the preferred partial one."""
+        async def query(name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+            try:
+                return name, await asyncio.wait_for(
+                    getattr(PropertyDataService, name)(address),
+                    timeout=settings.property_data_source_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Property data source {name} timed out for {address!r}")
+            except Exception as e:
+                logger.warning(f"Property data source {name} failed for {address!r}: {e}")
+            return name, None
+        
+        tasks = [asyncio.ensure_future(query(name)) for name in PropertyDataService.SOURCES]
+        partial: Dict[str, Dict[str, Any]] = {}
         try:
-            # Try multiple data sources in order of preference
-            property_data = await PropertyDataService._try_zillow_api(address)
-            if not property_data:
-                property_data = await PropertyDataService._try_public_records(address)
-            if not property_data:
-                property_data = await PropertyDataService._try_google_places(address)
+            for next_done in asyncio.as_completed(tasks):
+                name, result = await next_done
+                if not result:
+                    continue
+                if all(result.get(field) is not None for field in DETAIL_FIELDS):
+                    return result
+                partial[name] = result
+        finally:
+            for task in tasks:
+                task.cancel()
             
-            return property_data
+        return next((partial[name] for name in PropertyDataService.SOURCES if name in partial), None)
             
-        except Exception as e:
-            print(f"Error fetching property data: {e}")
-            return None
+    @staticmethod
+    async def close() -> None:
+        """Release the pooled HTTP connections (application shutdown)."""
+        global _http_client
+        if _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
+
+    @staticmethod
+    def parse_address(address: str) -> Dict[str, str]:
+        """
+        Split a one-line US address into Property address columns.
+        Raises ValueError when the street, city, state and ZIP can't be found.
+        """
+        match = ADDRESS_PATTERN.match(address)
+        if not match:
+            raise ValueError(f"Could not parse address {address!r}; expected \"street, city, ST 12345\"")
+        
+        parsed = {
+            "address_line1": match["line1"],
+            "city": match["city"],
+            "state": match["state"].upper(),
+            "postal_code": match["postal_code"],
+        }
+        if match["line2"]:
+            parsed["address_line2"] = match["line2"]
+            unit = UNIT_PATTERN.match(match["line2"])
+            if unit:
+                parsed["unit_number"] = unit["unit"]
+        return parsed
     
     @staticmethod
     async def _try_zillow_api(address: str) -> Optional[Dict[str, Any]]:
@@ -52,16 +197,12 @@ class PropertyDataService:
     @staticmethod
     async def _try_google_places(address: str) -> Optional[Dict[str, Any]]:
         """Get basic property info from Google Places API."""
-        try:
-            async with httpx.AsyncClient() as client:
-                # This would use Google Places API
-                # For now, return basic structure
-                return {
-                    "property_type": "Residential",
-                    "formatted_address": address
-                }
-        except Exception:
-            return None
+        # This would call the Google Places API through get_http_client()
+        # For now, return basic structure
+        return {
+            "property_type": "Residential",
+            "formatted_address": address
+        }
     
     @staticmethod
     async def suggest_room_layout(property_type: str, bedrooms: int, bathrooms: int) -> list:
@@ -0,0 +1,273 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import io
+import logging
+import os
+import tempfile
+from PIL import Image
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from backend.database.database import AsyncSessionLocal
+from backend.database.models import Inspection, Property, Photo
+from backend.services.issue_service import IssueService
+from backend.services.pdf_generator import PDFGenerator
+from backend.services.photo_processing_service import PhotoProcessingService, get_process_pool
+from backend.services.storage_service import get_storage
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REPORT_URL_PREFIX = "/api/v1/files/"
+REPORT_MEDIA_TYPE = "application/pdf"
+DERIVATIVE_SUFFIX = ".report.jpeg"
+# Context kept around an issue's box in its close-up, as a fraction of the box size
+CROP_MARGIN = 0.25
+
+Box = Tuple[float, float, float, float]
+
+
+class ReportOutdated(Exception):
+    """The inspection changed (or was deleted) while its report was rendering."""
+
+
+
+def _load_derivative(key: str) -> Image.Image:
+    """The photo's stored report derivative, made from the original (and stored) on first use."""
+    storage = get_storage()
+    derivative_key = ReportService.derivative_key(key)
+    try:
+        image = Image.open(io.BytesIO(storage.read(derivative_key)))
+        image.load()
+        return image
+    except FileNotFoundError:
+        pass
+    
+    image = PhotoProcessingService.load_preview(storage.read(key), settings.report_derivative_max_side)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=settings.report_image_quality)
+    storage.save(derivative_key, buffer.getvalue(), "image/jpeg")
+    return image
+
+
+def _prepare_photo(key: str, boxes: List[Tuple[int, Optional[Box]]], workdir: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Process-pool entry point: write one photo's thumbnail and its issues'
+    close-ups into workdir. boxes pairs issue indexes with their box as
+    fractions of the photo. Returns the report images per issue index.
+    """
+    image = _load_derivative(key)
+    stem = os.path.join(workdir, key.rsplit(".", 1)[0])
+    quality = settings.report_image_quality
+    
+    images = {}
+    for index, box in boxes:
+        entry = {"thumbnail": f"{stem}.jpeg", "box": box}
+        if box:
+            x0, y0, x1, y1 = box
+            dx, dy = (x1 - x0) * CROP_MARGIN, (y1 - y0) * CROP_MARGIN
+            left, top = int(max(0.0, x0 - dx) * image.width), int(max(0.0, y0 - dy) * image.height)
+            crop = image.crop((
+                left, top,
+                max(left + 1, int(min(1.0, x1 + dx) * image.width)), max(top + 1, int(min(1.0, y1 + dy) * image.height)),
+            ))
+            crop.thumbnail((settings.report_crop_max_side, settings.report_crop_max_side))
+            crop.save(f"{stem}-{index}.jpeg", "JPEG", quality=quality)
+            entry.update(crop=f"{stem}-{index}.jpeg", crop_size=crop.size)
+        images[index] = entry
+    
+    # Close-ups are cut first so the thumbnail can shrink the derivative in place
+    image.thumbnail((settings.report_thumbnail_max_side, settings.report_thumbnail_max_side), reducing_gap=1.5)
+    image.save(f"{stem}.jpeg", "JPEG", quality=quality)
+    for entry in images.values():
+        entry["thumbnail_size"] = image.size
+    return images
+
+
+def _render(inspection_data: Dict[str, Any], path: str, images: Dict[int, Dict[str, Any]]) -> int:
+    """Process-pool entry point: write the PDF to path. Returns its size."""
+    PDFGenerator.generate_inspection_report(inspection_data, path, images)
+    return os.path.getsize(path)
+
+
+class ReportService:
+    """
+    Inspection PDF reports, rendered once per version and kept in storage.
+    
+    A report's storage key carries the inspection id and the time the
+    inspection (or its property) last changed, so any edit makes the next
+    download render a fresh copy under a new key and the stale one is
+    deleted. Rendering runs in the shared process pool; concurrent downloads
+    of the same version wait on a single render.
+    
+    Issue photos come from a derivative store: a downsampled JPEG kept next
+    to each original, made the first time a report uses the photo. Pool
+    workers cut each photo's thumbnail and issue close-ups from it in
+    parallel into a temp directory, and the PDF is written to a temp file
+    that pulls those images in page by page, so memory is bounded by the
+    embedded image sizes rather than by the photos. A photo with several
+    issues is embedded once and outlined per issue.
+    """
+    
+    _inflight: Dict[str, "asyncio.Future"] = {}
+
+    @staticmethod
+    def report_key(inspection: Inspection, property: Optional[Property]) -> str:
+        changed = max(filter(None, (inspection.updated_at, inspection.created_at, property and property.updated_at)))
+        return f"report_{inspection.id}_{changed.strftime('%Y%m%d%H%M%S%f')}.pdf"
+
+    @staticmethod
+    def key_from_url(url: Optional[str]) -> Optional[str]:
+        if url and url.startswith(REPORT_URL_PREFIX):
+            return url[len(REPORT_URL_PREFIX):]
+        return None
+
+    @staticmethod
+    def derivative_key(key: str) -> str:
+        return key.rsplit(".", 1)[0] + DERIVATIVE_SUFFIX
+
+    @staticmethod
+    def report_data(inspection: Inspection, property: Optional[Property]) -> Dict[str, Any]:
+        return {
+            "inspection_type": inspection.inspection_type.value,
+            "inspection_date": inspection.inspection_date.isoformat(),
+            "status": inspection.status,
+            "summary_stats": inspection.summary_stats,
+            "issues_enriched": inspection.issues_detected,
+            "property": {
+                "address_line1": property.address_line1,
+                "city": property.city,
+                "state": property.state,
+                "postal_code": property.postal_code,
+                "property_type": property.property_type
+            } if property else None
+        }
+
+    @staticmethod
+    def issue_boxes(
+        issues: List[Dict[str, Any]],
+        photo_sizes: Dict[str, Tuple[Optional[int], Optional[int]]]
+    ) -> Dict[str, List[Tuple[int, Optional[Box]]]]:
+        """
+        Issue indexes per stored photo key, each with its bounding box as
+        fractions of the photo. Boxes already in 0-1 are taken as fractions,
+        larger ones as pixels of the original (dropped when its size is unknown).
+        """
+        boxes: Dict[str, List[Tuple[int, Optional[Box]]]] = defaultdict(list)
+        for index, issue in enumerate(issues or []):
+            key = ReportService.key_from_url(issue.get("image_url"))
+            if not key:
+                continue
+            box = IssueService.bounding_box(issue)
+            if box and max(box) > 1:
+                width, height = photo_sizes.get(issue["image_url"], (None, None))
+                box = (box[0] / width, box[1] / height, box[2] / width, box[3] / height) if width and height else None
+            if box:
+                box = tuple(min(max(value, 0.0), 1.0) for value in box)
+                if box[2] <= box[0] or box[3] <= box[1]:
+                    box = None
+            boxes[key].append((index, box))
+        return boxes
+
+    @staticmethod
+    async def prepare_images(inspection: Inspection, workdir: str) -> Dict[int, Dict[str, Any]]:
+        """Report images per issue index, prepared in the process pool. Unreadable photos are left out."""
+        async with AsyncSessionLocal() as db:
+            photo_sizes = {
+                url: (width, height) for url, width, height in await db.execute(
+                    select(Photo.url, Photo.width, Photo.height).where(Photo.inspection_id == inspection.id)
+                )
+            }
+        boxes = ReportService.issue_boxes(inspection.issues_detected, photo_sizes)
+        
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(pool, _prepare_photo, key, photo_boxes, workdir) for key, photo_boxes in boxes.items()),
+            return_exceptions=True
+        )
+        images = {}
+        for key, result in zip(boxes, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Leaving photo {key} out of the report for inspection {inspection.id}: {result}")
+                continue
+            images.update(result)
+        return images
+
+    @staticmethod
+    async def get_report(inspection: Inspection, property: Optional[Property], force: bool = False) -> str:
+        """
+        Storage key of the inspection's current report, rendering it first if
+        this version has not been rendered yet (or force is set, e.g. because
+        the stored file went missing). Raises ReportOutdated when the
+        inspection changes before the render is recorded.
+        """
+        key = ReportService.report_key(inspection, property)
+        if not force and ReportService.key_from_url(inspection.report_pdf_url) == key:
+            return key
+        
+        inflight = ReportService._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(ReportService._render_and_store(inspection, property, key))
+            ReportService._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: ReportService._inflight.pop(key, None))
+        await asyncio.shield(inflight)
+        return key
+
+    @staticmethod
+    async def _render_and_store(inspection: Inspection, property: Optional[Property], key: str) -> None:
+        loop = asyncio.get_running_loop()
+        storage = get_storage()
+        with tempfile.TemporaryDirectory(prefix="report-") as workdir:
+            images = await ReportService.prepare_images(inspection, workdir)
+            path = os.path.join(workdir, key)
+            size = await loop.run_in_executor(
+                get_process_pool(), _render, ReportService.report_data(inspection, property), path, images
+            )
+            await run_in_threadpool(storage.save_file, key, path, REPORT_MEDIA_TYPE)
+        
+        # Keep updated_at as it is: the report describes this version, it doesn't make a new one
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Inspection)
+                .where(Inspection.id == inspection.id, Inspection.updated_at == inspection.updated_at)
+                .values(report_pdf_url=REPORT_URL_PREFIX + key, updated_at=Inspection.updated_at)
+            )
+            await db.commit()
+        
+        if not result.rowcount:
+            # Nothing points at this version's file, so nothing would ever delete it
+            await ReportService.discard(key)
+            raise ReportOutdated(f"Inspection {inspection.id} changed while its report was rendering")
+        previous = ReportService.key_from_url(inspection.report_pdf_url)
+        if previous and previous != key:
+            await ReportService.discard(previous)
+        logger.info(f"Rendered report for inspection {inspection.id} ({size} bytes, {len(images)} issue photos)")
+
+    @staticmethod
+    async def discard(key: Optional[str]) -> None:
+        """Delete a stored report or derivative; missing files are fine."""
+        if not key:
+            return
+        try:
+            await run_in_threadpool(get_storage().delete, key)
+        except Exception as e:
+            logger.warning(f"Could not delete report file {key}: {e}")
+
+    @staticmethod
+    async def discard_derivatives(db: AsyncSession, photo_urls: Iterable[str]) -> None:
+        """
+        Delete the report derivatives of photos that were just deleted. Photo
+        keys are content-addressed, so photos whose file another photo row still
+        uses keep theirs.
+        """
+        photo_urls = set(photo_urls)
+        if not photo_urls:
+            return
+        photo_urls -= set(await db.scalars(select(Photo.url).where(Photo.url.in_(photo_urls))))
+        for url in photo_urls:
+            key = ReportService.key_from_url(url)
+            if key:
+                await ReportService.discard(ReportService.derivative_key(key))
@@ -0,0 +1,244 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import threading
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from config.settings import get_settings
+from backend.database.models import RoomClassifierSample
+
+settings = get_settings()
+
+FEATURE_PREVIEW_SIDE = 96
+HUE_BINS, SAT_BINS, VAL_BINS = 8, 2, 2
+ORIENTATION_BINS = 8
+EXIF_TIME_FORMAT = "%Y:%m:%d %H:%M:%S"
+FALLBACK_CONFIDENCE = 0.3
+
+
+class RoomClassifierIndex:
+    """Per-user nearest-neighbour index over labelled photo features."""
+
+    def __init__(self, features: np.ndarray, labels: List[str]):
+        self.features = features
+        self.labels = np.array(labels, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def vote(self, queries: np.ndarray, k: int) -> List[Dict[str, float]]:
+        """Similarity-weighted label votes from the k nearest samples of each query."""
+        if not len(self):
+            return [{} for _ in range(len(queries))]
+        
+        # Features are L2-normalised, so a matrix product gives cosine similarity
+        similarity = queries @ self.features.T
+        k = min(k, similarity.shape[1])
+        nearest = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        
+        votes = []
+        for row, neighbours in enumerate(nearest):
+            photo_votes: Dict[str, float] = {}
+            for j in neighbours:
+                weight = max(float(similarity[row, j]), 0.0)
+                photo_votes[self.labels[j]] = photo_votes.get(self.labels[j], 0.0) + weight
+            votes.append(photo_votes)
+        return votes
+
+
+class RoomClassifierService:
+    """CPU-only room assignment from cheap image features and walkthrough order."""
+    
+    # user_id -> (sample count, newest sample id, index); bounded LRU
+    _index_cache: "OrderedDict[int, Tuple[int, Optional[int], RoomClassifierIndex]]" = OrderedDict()
+    _index_cache_lock = threading.Lock()
+
+    @staticmethod
+    def extract_features(photo_bytes: bytes) -> List[float]:
+        """
+        Colour histogram + edge-orientation feature vector for a photo.
+        
+        Runs on a draft-decoded thumbnail; safe to run in a process pool.
+        """
+        from backend.services.photo_processing_service import PhotoProcessingService
+        
+        preview = PhotoProcessingService.load_preview(photo_bytes, FEATURE_PREVIEW_SIDE)
+        hsv = np.asarray(preview.convert("HSV"), dtype=np.int32)
+        
+        # Joint hue/saturation/value histogram
+        h = hsv[..., 0] * HUE_BINS // 256
+        s = hsv[..., 1] * SAT_BINS // 256
+        v = hsv[..., 2] * VAL_BINS // 256
+        color_hist = np.bincount(
+            ((h * SAT_BINS + s) * VAL_BINS + v).ravel(),
+            minlength=HUE_BINS * SAT_BINS * VAL_BINS
+        ).astype(np.float32)
+        color_hist /= max(color_hist.sum(), 1.0)
+        
+        # Magnitude-weighted gradient orientation histogram (tiles vs cabinets vs bare walls)
+        gray = np.asarray(preview.convert("L"), dtype=np.float32) / 255.0
+        gx = gray[1:-1, 2:] - gray[1:-1, :-2]
+        gy = gray[2:, 1:-1] - gray[:-2, 1:-1]
+        magnitude = np.hypot(gx, gy)
+        orientation = (np.arctan2(gy, gx) % np.pi) * ORIENTATION_BINS / np.pi
+        edge_hist = np.bincount(
+            np.minimum(orientation.astype(np.int32), ORIENTATION_BINS - 1).ravel(),
+            weights=magnitude.ravel(),
+            minlength=ORIENTATION_BINS
+        ).astype(np.float32)
+        edge_density = float(magnitude.mean())
+        edge_hist /= max(edge_hist.sum(), 1e-6)
+        
+        # Hellinger mapping keeps histograms comparable under cosine similarity
+        vector = np.concatenate([
+            np.sqrt(color_hist),
+            np.sqrt(edge_hist),
+            [edge_density * 4.0, float(gray.mean()), float(gray.std()) * 2.0]
+        ])
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).round(5).tolist()
+
+    @staticmethod
+    def parse_timestamp(photo_data: Dict[str, Any]) -> Optional[datetime]:
+        """Capture time from a processed photo's EXIF, if present."""
+        exif = photo_data.get("exif") or {}
+        for key in ("DateTimeOriginal", "DateTime"):
+            value = exif.get(key)
+            if isinstance(value, str):
+                try:
+                    return datetime.strptime(value.strip("\x00 "), EXIF_TIME_FORMAT)
+                except ValueError:
+                    continue
+        return None
+
+    @staticmethod
+    def segment_walkthrough(features: np.ndarray, timestamps: List[Optional[datetime]]) -> List[List[int]]:
+        """
+        Split photos into contiguous segments, one per room visited.
+        
+        Photos are ordered by EXIF time when every photo has one (upload order
+        otherwise). A new segment starts at a time gap or a large jump in
+        appearance between consecutive photos.
+        """
+        count = len(timestamps)
+        if not count:
+            return []
+        
+        if all(timestamps):
+            order = sorted(range(count), key=lambda i: timestamps[i])
+        else:
+            order = list(range(count))
+        
+        segments = [[order[0]]]
+        for prev, cur in zip(order, order[1:]):
+            time_gap = (
+                timestamps[prev] and timestamps[cur] and
+                (timestamps[cur] - timestamps[prev]).total_seconds() > settings.room_segment_gap_seconds
+            )
+            feature_jump = 1.0 - float(features[prev] @ features[cur]) > settings.room_segment_feature_distance
+            if time_gap or feature_jump:
+                segments.append([cur])
+            else:
+                segments[-1].append(cur)
+        return segments
+
+    @staticmethod
+    def assign_rooms(
+        photos: List[Dict[str, Any]],
+        rooms: List[Tuple[str, str]],
+        index: Optional[RoomClassifierIndex] = None
+    ) -> List[Tuple[Optional[str], float]]:
+        """
+        Suggest a room for each processed photo.
+        
+        Args:
+            photos: processed photo dicts carrying "features" and "exif"
+            rooms: (room_name, room_type) pairs in walkthrough order
+            index: the user's learned index, if any
+        
+        Returns:
+            (room_name, confidence) per photo, in input order
+        """
+        if not rooms or not photos:
+            return [(None, 0.0)] * len(photos)
+        
+        features = np.array([photo["features"] for photo in photos], dtype=np.float32)
+        timestamps = [RoomClassifierService.parse_timestamp(photo) for photo in photos]
+        segments = RoomClassifierService.segment_walkthrough(features, timestamps)
+        votes = index.vote(features, settings.room_classifier_neighbors) if index is not None else [{}] * len(photos)
+        
+        rooms_by_type: Dict[str, List[str]] = {}
+        for name, room_type in rooms:
+            rooms_by_type.setdefault(room_type, []).append(name)
+        used_by_type: Dict[str, int] = {}
+        
+        assignments: List[Tuple[Optional[str], float]] = [(None, 0.0)] * len(photos)
+        next_room = 0
+        for segment in segments:
+            segment_votes: Dict[str, float] = {}
+            for i in segment:
+                for label, weight in votes[i].items():
+                    segment_votes[label] = segment_votes.get(label, 0.0) + weight
+            
+            label = max(segment_votes, key=segment_votes.get) if segment_votes else None
+            if label in rooms_by_type:
+                # Several rooms of one type (Bedroom 2, Bedroom 3): fill them in walkthrough order
+                candidates = rooms_by_type[label]
+                slot = used_by_type.get(label, 0)
+                room_name = candidates[min(slot, len(candidates) - 1)]
+                used_by_type[label] = slot + 1
+                confidence = segment_votes[label] / sum(segment_votes.values())
+                confidence *= min(segment_votes[label] / len(segment), 1.0)
+            else:
+                # Nothing learned yet: assume the walkthrough follows the room list
+                room_name = rooms[next_room % len(rooms)][0]
+                next_room += 1
+                confidence = FALLBACK_CONFIDENCE
+            
+            for i in segment:
+                assignments[i] = (room_name, round(confidence, 3))
+        return assignments
+
+    @staticmethod
+    def get_index(db: Session, user_id: int) -> RoomClassifierIndex:
+        """
+        Load (or reuse) the nearest-neighbour index built from the user's corrections.
+        
+        Cached indexes are checked against the user's sample count and newest
+        sample id (one indexed aggregate query), so a correction recorded by
+        any worker is picked up by all of them on their next lookup.
+        """
+        count, newest = db.query(func.count(RoomClassifierSample.id), func.max(RoomClassifierSample.id)).filter(
+            RoomClassifierSample.user_id == user_id
+        ).one()
+        cache = RoomClassifierService._index_cache
+        with RoomClassifierService._index_cache_lock:
+            cached = cache.get(user_id)
+            if cached is not None and cached[:2] == (count, newest):
+                cache.move_to_end(user_id)
+                return cached[2]
+        
+        samples = db.query(RoomClassifierSample.room_type, RoomClassifierSample.features).filter(
+            RoomClassifierSample.user_id == user_id
+        ).order_by(RoomClassifierSample.id.desc()).limit(settings.room_classifier_max_samples).all() if count else []
+        
+        if samples:
+            index = RoomClassifierIndex(
+                np.array([features for _, features in samples], dtype=np.float32),
+                [room_type for room_type, _ in samples]
+            )
+        else:
+            index = RoomClassifierIndex(np.zeros((0, 0), dtype=np.float32), [])
+        
+        with RoomClassifierService._index_cache_lock:
+            cache[user_id] = (count, newest, index)
+            cache.move_to_end(user_id)
+            while len(cache) > settings.room_classifier_cache_size:
+                cache.popitem(last=False)
+        return index
+
+    @staticmethod
+    def record_correction(db: Session, user_id: int, room_type: str, features: List[float]) -> None:
+        """Store a manually confirmed room label; cached indexes notice the new sample on their own."""
+        db.add(RoomClassifierSample(user_id=user_id, room_type=room_type, features=features))
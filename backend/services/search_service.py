@@ -0,0 +1,215 @@
+from typing import Any, Dict, Iterable, List, Set, Tuple
+import logging
+import re
+from sqlalchemy import event, inspect, select, delete, insert, func, table, column, literal_column
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database.models import Inspection, Property, Issue, InspectionSearch
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "english"
+PENDING_KEY = "search_pending"
+ADDRESS_FIELDS = ("address_line1", "address_line2", "unit_number", "city", "state", "postal_code")
+INSPECTION_FIELDS = ("notes", "report_markdown", "property_id", "inspector_id")
+# Relative weight of address, notes, issues and report matches (FTS5 bm25 column weights)
+SQLITE_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchService:
+    """
+    Full-text search over inspections.
+    
+    inspection_search holds each inspection's address, notes, issue
+    descriptions and report text; the database indexes it (tsvector on
+    PostgreSQL, FTS5 on SQLite). Session listeners note which inspections a
+    transaction touched and refresh just those rows before it commits.
+    """
+
+    @staticmethod
+    def mark(session: Session, inspection_ids: Iterable[int]) -> None:
+        """Queue inspections for reindexing when the session commits."""
+        session.info.setdefault(PENDING_KEY, set()).update(i for i in inspection_ids if i is not None)
+
+    @staticmethod
+    def _collect(session: Session) -> None:
+        """Note the inspections whose searchable text the current flush changed."""
+        ids: Set[int] = set()
+        property_ids: Set[int] = set()
+        
+        for obj in session.new:
+            if isinstance(obj, Inspection):
+                ids.add(obj.id)
+        for obj in session.dirty:
+            state = inspect(obj)
+            if isinstance(obj, Inspection):
+                if any(state.attrs[name].history.has_changes() for name in INSPECTION_FIELDS):
+                    ids.add(obj.id)
+            elif isinstance(obj, Property):
+                if any(state.attrs[name].history.has_changes() for name in ADDRESS_FIELDS):
+                    property_ids.add(obj.id)
+        
+        deleted = [obj.id for obj in session.deleted if isinstance(obj, Inspection)]
+        if deleted:
+            # PostgreSQL cascades; SQLite runs without foreign key enforcement
+            session.execute(delete(InspectionSearch).where(InspectionSearch.inspection_id.in_(deleted)))
+        if property_ids:
+            ids.update(session.scalars(select(Inspection.id).where(Inspection.property_id.in_(property_ids))))
+        if ids:
+            SearchService.mark(session, ids)
+
+    @staticmethod
+    def refresh(session: Session, inspection_ids: Iterable[int]) -> int:
+        """Rewrite the search rows of the given inspections. Returns the number indexed."""
+        inspection_ids = list(inspection_ids)
+        if not inspection_ids:
+            return 0
+        
+        rows = session.execute(
+            select(
+                Inspection.id, Inspection.inspector_id, Inspection.notes, Inspection.report_markdown,
+                *(getattr(Property, name) for name in ADDRESS_FIELDS)
+            ).join(Property, Inspection.property_id == Property.id).where(Inspection.id.in_(inspection_ids))
+        ).all()
+        
+        issue_text: Dict[int, List[str]] = {}
+        for inspection_id, description in session.execute(
+            select(Issue.inspection_id, Issue.description)
+            .where(Issue.inspection_id.in_(inspection_ids))
+            .order_by(Issue.id)
+        ):
+            issue_text.setdefault(inspection_id, []).append(description)
+        
+        session.execute(delete(InspectionSearch).where(InspectionSearch.inspection_id.in_(inspection_ids)))
+        if rows:
+            session.execute(insert(InspectionSearch), [
+                {
+                    "inspection_id": row.id,
+                    "inspector_id": row.inspector_id,
+                    "address": " ".join(str(row._mapping[name]) for name in ADDRESS_FIELDS if row._mapping[name]),
+                    "notes": row.notes,
+                    "issues": "\n".join(issue_text.get(row.id, [])) or None,
+                    "report": row.report_markdown,
+                }
+                for row in rows
+            ])
+        return len(rows)
+
+    @staticmethod
+    def index_missing(session: Session, batch_size: int = 500) -> int:
+        """Index inspections that have no search row yet (backfill)."""
+        total = 0
+        while True:
+            ids = session.scalars(
+                select(Inspection.id).where(
+                    ~select(InspectionSearch.inspection_id)
+                    .where(InspectionSearch.inspection_id == Inspection.id)
+                    .exists()
+                ).order_by(Inspection.id).limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            total += SearchService.refresh(session, ids)
+            session.commit()
+        if total:
+            logger.info(f"Indexed {total} inspections for search")
+        return total
+
+    @staticmethod
+    def _terms(query: str) -> List[str]:
+        return TERM_PATTERN.findall(query.lower())[:16]
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        inspector_id: int,
+        query: str,
+        limit: int,
+        skip: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Ranked matches among one inspector's inspections.
+        
+        Every term must match, and the last one may be a prefix, so partial
+        addresses find their inspection as they are typed. Returns the page of
+        results and the total number of matches.
+        """
+        terms = SearchService._terms(query)
+        if not terms:
+            return [], 0
+        
+        base = select(InspectionSearch.inspection_id).where(InspectionSearch.inspector_id == inspector_id)
+        if db.get_bind().dialect.name == "postgresql":
+            tsquery = func.to_tsquery(SEARCH_CONFIG, " & ".join(terms[:-1] + [f"{terms[-1]}:*"]))
+            document = literal_column("inspection_search.document")
+            base = base.where(document.op("@@")(tsquery))
+            rank = func.ts_rank_cd(document, tsquery)
+            snippet = func.ts_headline(
+                SEARCH_CONFIG,
+                func.concat_ws(" ", InspectionSearch.notes, InspectionSearch.issues, InspectionSearch.report),
+                tsquery,
+                "MaxWords=24, MinWords=8, StartSel=[, StopSel=]"
+            )
+            order = rank.desc()
+        else:
+            fts = table("inspection_search_fts", column("rowid"))
+            fts_query = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+            base = base.join_from(InspectionSearch, fts, fts.c.rowid == InspectionSearch.inspection_id).where(
+                literal_column("inspection_search_fts").op("MATCH")(fts_query)
+            )
+            rank = func.bm25(literal_column("inspection_search_fts"), *SQLITE_WEIGHTS)
+            snippet = func.snippet(literal_column("inspection_search_fts"), -1, "[", "]", "…", 16)
+            # bm25 scores are negative, best first
+            order = rank.asc()
+        
+        total = await db.scalar(select(func.count()).select_from(base.subquery()))
+        if not total:
+            return [], 0
+        
+        page = base.add_columns(
+            rank.label("rank"),
+            snippet.label("snippet"),
+            InspectionSearch.address,
+            Inspection.property_id,
+            Inspection.inspection_type,
+            Inspection.status,
+            Inspection.created_at,
+        ).join(Inspection, Inspection.id == InspectionSearch.inspection_id).order_by(
+            order, Inspection.created_at.desc()
+        ).offset(skip).limit(limit)
+        
+        results = [
+            {
+                "inspection_id": row.inspection_id,
+                "property_id": row.property_id,
+                "address": row.address,
+                "inspection_type": row.inspection_type,
+                "status": row.status,
+                "created_at": row.created_at,
+                "rank": abs(float(row.rank or 0)),
+                "snippet": row.snippet or None,
+            }
+            for row in (await db.execute(page)).all()
+        ]
+        return results, total
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_search_changes(session, flush_context):
+    SearchService._collect(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_search_index(session):
+    # commit flushes after this hook; flush now so the changes are collected
+    # and the refresh reads this transaction's final state
+    session.flush()
+    if not session.info.get(PENDING_KEY):
+        return
+    SearchService.refresh(session, session.info.pop(PENDING_KEY, set()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_search_changes(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,245 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+import logging
+import os
+import shutil
+from config.settings import get_settings
+from backend.services.file_serving_service import FileServingService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class DirectUploadNotSupported(Exception):
+    """The storage backend cannot take uploads straight from clients."""
+    
+
+class StorageBackend(ABC):
+    """
+    Interface for where uploaded file bytes live.
+    
+    Direct (presigned) uploads are an optional capability: backends without
+    it raise DirectUploadNotSupported from those methods.
+    """
+
+    @abstractmethod
+    def save(self, key: str, contents: bytes, content_type: Optional[str] = None) -> None:
+        """Store contents under key, replacing any existing object."""
+
+    def save_file(self, key: str, path: str, content_type: Optional[str] = None) -> None:
+        """Store a file from disk, e.g. one built in a temp file. The file may be moved or removed."""
+        with open(path, "rb") as f:
+            self.save(key, f.read(), content_type)
+
+    @abstractmethod
+    def read(self, key: str) -> bytes:
+        """Contents of a stored object. Raises FileNotFoundError if it does not exist."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete a stored object. Returns False if it did not exist."""
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Path on this machine for backends that keep files on disk, else None."""
+        return None
+
+    def download_url(self, key: str) -> Optional[str]:
+        """Short-lived URL clients can fetch the object from directly, if supported."""
+        return None
+
+    def presign_upload(self, key: str, content_type: Optional[str], content_length: int) -> Dict[str, Any]:
+        """Request a client sends to upload exactly content_length bytes to key."""
+        raise DirectUploadNotSupported("Direct uploads require the S3 storage backend")
+
+    def create_multipart_upload(self, key: str, content_type: Optional[str] = None) -> str:
+        raise DirectUploadNotSupported("Direct uploads require the S3 storage backend")
+
+    def presign_upload_part(self, key: str, upload_id: str, part_number: int, content_length: int) -> str:
+        """URL a client PUTs exactly content_length bytes of one part to."""
+        raise DirectUploadNotSupported("Direct uploads require the S3 storage backend")
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Dict[str, Any]]) -> None:
+        raise DirectUploadNotSupported("Direct uploads require the S3 storage backend")
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        raise DirectUploadNotSupported("Direct uploads require the S3 storage backend")
+
+
+class LocalStorageBackend(StorageBackend):
+    """Stores files in the local upload directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.root / key
+
+    def save(self, key: str, contents: bytes, content_type: Optional[str] = None) -> None:
+        path = self.root / key
+        with open(path, "wb") as f:
+            f.write(contents)
+        FileServingService.remember_etag(path, FileServingService.content_hash(contents))
+
+    def save_file(self, key: str, path: str, content_type: Optional[str] = None) -> None:
+        shutil.move(path, self.root / key)
+
+    def read(self, key: str) -> bytes:
+        with open(self.root / key, "rb") as f:
+            return f.read()
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self.root / key)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Stores files in an S3-compatible bucket.
+    
+    Large server-side writes use multipart upload, and clients can upload
+    directly with presigned PUT (or presigned multipart part) URLs so the
+    bytes never pass through the API. Set aws_s3_endpoint_url to point at
+    MinIO or another S3-compatible service.
+    """
+
+    def __init__(self):
+        import boto3
+        from botocore.config import Config
+        
+        self.bucket = settings.aws_s3_bucket
+        self.client = boto3.client(
+            "s3",
+            aws_access_key_id=settings.aws_access_key_id or None,
+            aws_secret_access_key=settings.aws_secret_access_key or None,
+            region_name=settings.aws_region,
+            endpoint_url=settings.aws_s3_endpoint_url or None,
+            config=Config(
+                signature_version="s3v4",
+                max_pool_connections=settings.s3_max_pool_connections
+            )
+        )
+
+    def save(self, key: str, contents: bytes, content_type: Optional[str] = None) -> None:
+        extra = {"ContentType": content_type} if content_type else {}
+        if len(contents) < settings.s3_multipart_threshold:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=contents, **extra)
+            return
+        
+        upload_id = self.create_multipart_upload(key, content_type)
+        try:
+            parts = []
+            chunk_size = settings.s3_multipart_chunk_size
+            for part_number, offset in enumerate(range(0, len(contents), chunk_size), start=1):
+                response = self.client.upload_part(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=contents[offset:offset + chunk_size]
+                )
+                parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+            self.complete_multipart_upload(key, upload_id, parts)
+        except Exception:
+            self.abort_multipart_upload(key, upload_id)
+            raise
+
+    def save_file(self, key: str, path: str, content_type: Optional[str] = None) -> None:
+        from boto3.s3.transfer import TransferConfig
+        
+        # The transfer manager streams from disk and switches to multipart on its own
+        self.client.upload_file(
+            path,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type} if content_type else None,
+            Config=TransferConfig(
+                multipart_threshold=settings.s3_multipart_threshold,
+                multipart_chunksize=settings.s3_multipart_chunk_size
+            )
+        )
+
+    def read(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+
+    def delete(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError:
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        return True
+
+    def download_url(self, key: str) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=settings.presigned_url_expire_seconds
+        )
+
+    def presign_upload(self, key: str, content_type: Optional[str], content_length: int) -> Dict[str, Any]:
+        # Content-Length is signed into the URL, so the client cannot send more than it declared
+        params = {"Bucket": self.bucket, "Key": key, "ContentLength": content_length}
+        headers = {"Content-Length": str(content_length)}
+        if content_type:
+            params["ContentType"] = content_type
+            headers["Content-Type"] = content_type
+        
+        upload_url = self.client.generate_presigned_url(
+            "put_object",
+            Params=params,
+            ExpiresIn=settings.presigned_url_expire_seconds
+        )
+        return {"method": "PUT", "upload_url": upload_url, "headers": headers}
+
+    def create_multipart_upload(self, key: str, content_type: Optional[str] = None) -> str:
+        extra = {"ContentType": content_type} if content_type else {}
+        response = self.client.create_multipart_upload(Bucket=self.bucket, Key=key, **extra)
+        return response["UploadId"]
+
+    def presign_upload_part(self, key: str, upload_id: str, part_number: int, content_length: int) -> str:
+        return self.client.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "UploadId": upload_id,
+                "PartNumber": part_number,
+                "ContentLength": content_length
+            },
+            ExpiresIn=settings.presigned_url_expire_seconds
+        )
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Dict[str, Any]]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])}
+        )
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+        except Exception as e:
+            logger.warning(f"Failed to abort multipart upload {upload_id} for {key}: {e}")
+
+
+@lru_cache()
+def get_storage() -> StorageBackend:
+    """Return the configured storage backend."""
+    if settings.use_s3:
+        if not settings.aws_s3_bucket:
+            raise RuntimeError("use_s3 is enabled but aws_s3_bucket is not set")
+        return S3StorageBackend()
+    return LocalStorageBackend(settings.upload_dir)
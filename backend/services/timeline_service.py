@@ -0,0 +1,220 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+import logging
+from sqlalchemy import event, inspect, select, delete, insert, update, func, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database.models import Property, Inspection, Issue, PropertyConditionSeries
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "timeline_pending"
+# Inspections that appear on a property's timeline
+TIMELINE_STATUS = "completed"
+INSPECTION_FIELDS = ("status", "inspection_date", "inspection_type", "property_id")
+SEVERITIES = ("low", "medium", "high", "critical")
+
+
+class TimelineService:
+    """
+    Property condition timelines from a precomputed series.
+    
+    Each property's series is one row holding a small array per completed
+    inspection: issue counts by severity, the cost range and code violations.
+    Session listeners note which properties a transaction touched (an
+    inspection completing, being deleted or having its issues rewritten) and
+    recompute just those series before it commits, so reading a timeline is
+    a single primary-key lookup.
+    """
+    
+    SERIES_FIELDS = (
+        "inspection_id", "inspection_date", "inspection_type",
+        "issue_count", *SEVERITIES, "cost_low", "cost_high", "code_violations",
+    )
+
+    @staticmethod
+    def mark(session: Session, property_ids: Iterable[int]) -> None:
+        """Queue properties for a series recompute when the session commits."""
+        session.info.setdefault(PENDING_KEY, set()).update(i for i in property_ids if i is not None)
+
+    @staticmethod
+    def _collect(session: Session) -> None:
+        """Note the properties whose timeline the current flush changed."""
+        property_ids: Set[int] = set()
+        for obj in session.new:
+            if isinstance(obj, Inspection) and obj.status == TIMELINE_STATUS:
+                property_ids.add(obj.property_id)
+        for obj in session.deleted:
+            if isinstance(obj, Inspection):
+                property_ids.add(obj.property_id)
+        for obj in session.dirty:
+            if not isinstance(obj, Inspection):
+                continue
+            state = inspect(obj)
+            if not any(state.attrs[name].history.has_changes() for name in INSPECTION_FIELDS):
+                continue
+            # Only completed inspections (now or before this change) are on a timeline
+            statuses = {obj.status, *state.attrs.status.history.deleted}
+            if TIMELINE_STATUS in statuses:
+                property_ids.add(obj.property_id)
+                property_ids.update(state.attrs.property_id.history.deleted)
+        if property_ids:
+            TimelineService.mark(session, property_ids)
+
+    @staticmethod
+    def compute(session: Session, property_ids: Iterable[int]) -> Dict[int, List[List[Any]]]:
+        """Series points per property, aggregated from issue rows in one grouped query."""
+        property_ids = list(property_ids)
+        if not property_ids:
+            return {}
+        
+        severity_counts = [
+            func.sum(case((Issue.severity == severity, 1), else_=0)) for severity in SEVERITIES
+        ]
+        rows = session.execute(
+            select(
+                Inspection.property_id,
+                Inspection.id,
+                Inspection.inspection_date,
+                Inspection.inspection_type,
+                func.count(Issue.id),
+                *severity_counts,
+                func.sum(Issue.estimated_cost_low),
+                func.sum(Issue.estimated_cost_high),
+                func.sum(case((Issue.potential_code_violation == True, 1), else_=0)),
+            )
+            .outerjoin(Issue, Issue.inspection_id == Inspection.id)
+            .where(Inspection.property_id.in_(property_ids), Inspection.status == TIMELINE_STATUS)
+            .group_by(Inspection.property_id, Inspection.id, Inspection.inspection_date, Inspection.inspection_type)
+            .order_by(Inspection.property_id, Inspection.inspection_date, Inspection.id)
+        ).all()
+        
+        series: Dict[int, List[List[Any]]] = {property_id: [] for property_id in property_ids}
+        for property_id, inspection_id, inspection_date, inspection_type, count, *rest in rows:
+            *severities, cost_low, cost_high, code_violations = rest
+            series[property_id].append([
+                inspection_id,
+                inspection_date.isoformat() if inspection_date else None,
+                getattr(inspection_type, "value", inspection_type),
+                count,
+                *(int(n or 0) for n in severities),
+                round(float(cost_low or 0), 2),
+                round(float(cost_high or 0), 2),
+                int(code_violations or 0),
+            ])
+        return series
+
+    @staticmethod
+    def _store(session: Session, rows: List[Dict[str, Any]]) -> None:
+        """Insert or replace series rows."""
+        table = PropertyConditionSeries.__table__
+        dialect = session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["property_id"],
+                set_={"points": stmt.excluded.points, "updated_at": stmt.excluded.updated_at}
+            )
+            session.execute(stmt)
+            return
+        
+        for row in rows:
+            result = session.execute(
+                update(table).where(table.c.property_id == row["property_id"]).values(row)
+            )
+            if result.rowcount == 0:
+                session.execute(insert(table).values(row))
+
+    @staticmethod
+    def refresh(session: Session, property_ids: Iterable[int]) -> int:
+        """
+        Recompute and store the series of the given properties. Returns the number stored.
+        
+        The property rows are locked first (FOR NO KEY UPDATE on PostgreSQL, which
+        still lets inspections reference them), so transactions refreshing the same
+        property take turns and each one computes from what the previous committed.
+        """
+        property_ids = sorted(set(property_ids))
+        if not property_ids:
+            return 0
+        
+        existing = session.scalars(
+            select(Property.id).where(Property.id.in_(property_ids))
+            .order_by(Property.id).with_for_update(key_share=True)
+        ).all()
+        # Properties deleted in this transaction have nothing left to store
+        gone = set(property_ids) - set(existing)
+        if gone:
+            session.execute(delete(PropertyConditionSeries).where(PropertyConditionSeries.property_id.in_(gone)))
+        
+        series = TimelineService.compute(session, existing)
+        if series:
+            now = datetime.utcnow()
+            TimelineService._store(session, [
+                {"property_id": property_id, "points": points, "updated_at": now}
+                for property_id, points in series.items()
+            ])
+        return len(series)
+
+    @staticmethod
+    def backfill(session: Session, batch_size: int = 500) -> int:
+        """Store series for properties with completed inspections but no series yet."""
+        total = 0
+        while True:
+            property_ids = session.scalars(
+                select(Inspection.property_id).distinct()
+                .join(Property, Property.id == Inspection.property_id)
+                .where(
+                    Inspection.status == TIMELINE_STATUS,
+                    ~select(PropertyConditionSeries.property_id)
+                    .where(PropertyConditionSeries.property_id == Inspection.property_id)
+                    .exists()
+                ).limit(batch_size)
+            ).all()
+            if not property_ids:
+                break
+            total += TimelineService.refresh(session, property_ids)
+            session.commit()
+        if total:
+            logger.info(f"Built condition series for {total} properties")
+        return total
+
+    @staticmethod
+    async def get_points(db: AsyncSession, property_id: int, owner_id: int) -> Optional[List[List[Any]]]:
+        """
+        A property's series points, or None when the property isn't the owner's.
+        
+        Properties not backfilled yet are computed on the fly (and stored by
+        the backfill or their next change).
+        """
+        row = (await db.execute(
+            select(Property.id, PropertyConditionSeries.points)
+            .outerjoin(PropertyConditionSeries, PropertyConditionSeries.property_id == Property.id)
+            .where(Property.id == property_id, Property.owner_id == owner_id)
+        )).first()
+        if row is None:
+            return None
+        if row.points is not None:
+            return row.points
+        return (await db.run_sync(TimelineService.compute, [property_id]))[property_id]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_timeline_changes(session, flush_context):
+    TimelineService._collect(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_timelines(session):
+    # commit flushes after this hook; flush now so the changes are collected
+    session.flush()
+    if not session.info.get(PENDING_KEY):
+        return
+    TimelineService.refresh(session, session.info.pop(PENDING_KEY, set()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_timeline_changes(session):
+    session.info.pop(PENDING_KEY, None)
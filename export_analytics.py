@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Export issues, inspections and properties for analytics (all owners).
+
+Writes one Parquet (or gzip CSV) file per dataset into the output directory.
+With --state, the watermark each dataset reached is saved to a JSON file and
+the next run exports only rows created or updated since; without it, every
+run is a full snapshot.
+
+Usage: python export_analytics.py OUT_DIR [--format parquet|csv] [--state watermarks.json]
+                                  [--datasets issues,inspections,properties]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.database.database import AsyncSessionLocal
+from backend.services.export_service import (
+    ExportService,
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    EXPORT_EXTENSIONS,
+    parquet_available
+)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="parquet")
+    parser.add_argument("--state", help="JSON file holding each dataset's watermark between runs")
+    parser.add_argument("--datasets", default=",".join(EXPORT_DATASETS))
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not parquet_available():
+        parser.error("Parquet export needs pyarrow; install it or use --format csv")
+    datasets = [name.strip() for name in args.datasets.split(",") if name.strip()]
+    unknown = [name for name in datasets if name not in EXPORT_DATASETS]
+    if unknown:
+        parser.error(f"Unknown datasets: {', '.join(unknown)}")
+
+    state = {}
+    if args.state and os.path.exists(args.state):
+        with open(args.state) as f:
+            state = json.load(f)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    async with AsyncSessionLocal() as db:
+        for name in datasets:
+            since = datetime.fromisoformat(state[name]) if state.get(name) else None
+            path = os.path.join(args.out_dir, f"{name}-{stamp}{EXPORT_EXTENSIONS[args.format]}")
+            total, watermark = await ExportService.export(db, name, args.format, path, since=since)
+            print(f"{name:>12}: {total} rows -> {path}" + (f" (since {since.isoformat()})" if since else ""))
+            if watermark:
+                state[name] = watermark.isoformat()
+
+    if args.state:
+        with open(args.state, "w") as f:
+            json.dump(state, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,11 +6,15 @@ from backend.api.property_routes import router as property_router
 from backend.api.inspection_routes import router as inspection_router
 from backend.api.file_routes import router as file_router
 from backend.api.admin_routes import router as admin_router
+from backend.api.issue_routes import router as issue_router
+from backend.api.search_routes import router as search_router
+from backend.api.export_routes import router as export_router
 from backend.api.setup_routes import router as setup_router
-from backend.database.database import init_db
+from backend.database.database import carry_read_primary_pin, READ_PRIMARY_HEADER
 from config.settings import get_settings
 from pathlib import Path
 import os
+import threading
 
 # Initialize settings
 settings = get_settings()
@@ -30,8 +34,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Export-Watermark", "X-Export-Rows", READ_PRIMARY_HEADER],
 )
 
+# Hand clients that wrote their read-your-writes pin
+app.middleware("http")(carry_read_primary_pin)
+
 # Create upload directory
 Path(settings.upload_dir).mkdir(exist_ok=True)
 
@@ -41,59 +49,39 @@ async def startup_event():
     """Initialize database tables on startup."""
     print("🚀 Starting InspectIQ backend...")
     
-    # Initialize database
-    print("📊 Initializing database...")
-    init_db()
-    
-    # Run database migrations
-    print("🔧 Running database migrations...")
+    # Bring the schema up to date; a current database costs one version query
+    print("🔧 Checking database schema...")
+    backfills_pending = False
     try:
         from backend.database.migrate import migrate_database
-        migrate_database()
-        print("✅ Database migration completed successfully")
+        backfills_pending = migrate_database()
+        print("✅ Database schema is up to date")
     except Exception as e:
         print(f"⚠️  Migration warning: {e}")
-        print("🔄 Attempting alternative migration...")
-        
-        # Try alternative migration approach
-        try:
-            from backend.database.database import engine
-            from sqlalchemy import text
-            
-            with engine.connect() as conn:
-                # Add missing columns if they don't exist
-                try:
-                    conn.execute(text("ALTER TABLE properties ADD COLUMN bedrooms INTEGER"))
-                    print("✅ Added bedrooms column")
-                except:
-                    print("ℹ️  bedrooms column already exists")
-                
-                try:
-                    conn.execute(text("ALTER TABLE properties ADD COLUMN bathrooms INTEGER"))
-                    print("✅ Added bathrooms column")
-                except:
-                    print("ℹ️  bathrooms column already exists")
-                
-                try:
-                    conn.execute(text("ALTER TABLE properties ADD COLUMN lot_size REAL"))
-                    print("✅ Added lot_size column")
-                except:
-                    print("ℹ️  lot_size column already exists")
-                
-                conn.commit()
-                print("✅ Alternative migration completed")
-                
-        except Exception as alt_e:
-            print(f"❌ Alternative migration also failed: {alt_e}")
+    
+    # Data backfills for a just-migrated schema run without blocking startup
+    if backfills_pending:
+        from backend.database.migrate import run_backfills
+        threading.Thread(target=run_backfills, name="data-backfill", daemon=True).start()
     
     print("🎉 Backend startup completed!")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled outbound connections."""
+    from backend.services.property_data_service import PropertyDataService
+    await PropertyDataService.close()
+
 # Include routes
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(property_router, prefix="/api/v1")
 app.include_router(inspection_router, prefix="/api/v1")
 app.include_router(file_router, prefix="/api/v1")
 app.include_router(admin_router, prefix="/api/v1")
+app.include_router(issue_router, prefix="/api/v1")
+app.include_router(search_router, prefix="/api/v1")
+app.include_router(export_router, prefix="/api/v1")
 app.include_router(setup_router, prefix="/api/v1")  # Temporary - remove after first admin
 
 # Add legacy workflow routes if available
@@ -6,6 +6,7 @@ class Photo(BaseModel):
     image_url: HttpUrl
     room_name: Optional[str] = None
     order_index: Optional[int] = None
+    quality_passed: Optional[bool] = None  # None when the photo was never scored
 
 
 class ProcessedPhoto(BaseModel):
@@ -0,0 +1,38 @@
+"""
+Test setup: point the app at a throwaway SQLite database and upload
+directory before anything reads the settings.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_workdir = tempfile.mkdtemp(prefix="inspectiq-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["UPLOAD_DIR"] = os.path.join(_workdir, "uploads")
+os.environ["USE_S3"] = "false"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import main_full
+    
+    with TestClient(main_full.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    client.post("/api/v1/auth/register", json={"email": "inspector@example.com", "name": "Inspector", "password": "pw"})
+    token = client.post(
+        "/api/v1/auth/login/json", json={"email": "inspector@example.com", "password": "pw"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,75 @@
+"""Query-count regression tests for the inspection list endpoint."""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, insert
+
+from backend.database.database import SessionLocal, async_engine
+from backend.database.models import Inspection, InspectionType, Photo, Property, Room, User
+
+
+@contextmanager
+def count_queries():
+    """Count statements sent to the database while the block runs."""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def add_inspections(count: int) -> None:
+    """Add inspections for the test user, each with two rooms holding two photos."""
+    with SessionLocal() as session:
+        user = session.query(User).filter(User.email == "inspector@example.com").one()
+        property = Property(owner_id=user.id, address_line1="1 Main St", city="Springfield", state="IL", postal_code="62701")
+        session.add(property)
+        session.flush()
+        for _ in range(count):
+            inspection = Inspection(
+                property_id=property.id,
+                inspector_id=user.id,
+                inspection_type=InspectionType.MOVE_IN,
+                status="completed",
+                summary_stats={"issue_count": 1, "summary_severity": "low"}
+            )
+            session.add(inspection)
+            session.flush()
+            for order in range(2):
+                room = Room(inspection_id=inspection.id, room_type="bedroom", room_name=f"Bedroom {order + 1}", order_index=order)
+                session.add(room)
+                session.flush()
+                session.execute(insert(Photo), [
+                    {"room_id": room.id, "inspection_id": inspection.id, "url": f"/api/v1/files/{inspection.id}-{room.id}-{n}.jpeg"}
+                    for n in range(2)
+                ])
+        session.commit()
+
+
+def list_query_counts(client, auth_headers, params):
+    # Warm up so the authenticated principal comes from its cache
+    client.get("/api/v1/inspections", params=params, headers=auth_headers)
+    with count_queries() as statements:
+        response = client.get("/api/v1/inspections", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return len(response.json()), len(statements)
+
+
+@pytest.mark.parametrize("params, expected_queries", [
+    ({"fields": "summary"}, 1),
+    ({}, 3),
+])
+def test_list_query_count_does_not_grow_with_inspections(client, auth_headers, params, expected_queries):
+    add_inspections(5)
+    small_total, small_queries = list_query_counts(client, auth_headers, params)
+    add_inspections(5)
+    large_total, large_queries = list_query_counts(client, auth_headers, params)
+    
+    assert large_total == small_total + 5
+    assert small_queries == expected_queries
+    assert large_queries == expected_queries
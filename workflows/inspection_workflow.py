@@ -25,6 +25,7 @@ class InspectionWorkflow:
         Execute the full inspection workflow.
         
         Steps:
+        0. Quality gate (when exclude_low_quality_photos is set)
         1. Media ingestion
         2. Vision analysis
         3. Repair scope
@@ -34,9 +35,16 @@ class InspectionWorkflow:
         Returns:
             Complete inspection results
         """
+        # Step 0: Quality gate - don't pay for analyses of unusable photos
+        photos = input_data.photos
+        photos_excluded = 0
+        if self.settings.exclude_low_quality_photos:
+            photos = [p for p in input_data.photos if p.quality_passed is not False]
+            photos_excluded = len(input_data.photos) - len(photos)
+        
         # Step 1: Media Ingestion
         media_result = await self.media_agent.process(
-            photos=input_data.photos,
+            photos=photos,
             inspection_id=input_data.inspection_id
         )
         
@@ -46,7 +54,8 @@ class InspectionWorkflow:
         if not processed_photos:
             return {
                 "inspection_id": inspection_id,
-                "error": "No valid photos provided"
+                "error": "No valid photos provided",
+                "photos_excluded": photos_excluded
             }
         
         # Step 2: Vision Analysis
@@ -82,7 +91,8 @@ class InspectionWorkflow:
             "report_markdown": report_result["report_markdown"],
             "report_summary_json": report_result["report_summary_json"],
             "issues_enriched": issues_enriched,
-            "summary": summary
+            "summary": summary,
+            "photos_excluded": photos_excluded
         }
         
         await self._send_webhook(final_payload)